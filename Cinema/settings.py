@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -57,6 +58,51 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if os.environ.get("BENCHMARK_QUERY_COUNT"):
+    MIDDLEWARE.insert(0, "core.middleware.QueryCountMiddleware")
+
+# Cache des listes publiques (movies.cache) : Redis si REDIS_URL est défini,
+# sinon mémoire locale (propre à chaque processus, réservé au développement)
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Révocation des jetons JWT (core.revocation) : alias dédié, partagé par tous les processus et
+# sans éviction. REVOCATION_REDIS_URL (à défaut REDIS_URL) doit désigner un Redis configuré avec
+# "maxmemory-policy noeviction". Sans Redis, mémoire locale en DEBUG ou avec JWT_REVOCATION_LOCAL=1.
+# Requis avec JWT_STATELESS=1 (sinon l'application refuse de démarrer, voir core.apps) ; à défaut,
+# le cache "default" est utilisé.
+REVOCATION_REDIS_URL = os.environ.get("REVOCATION_REDIS_URL") or os.environ.get("REDIS_URL")
+if REVOCATION_REDIS_URL:
+    CACHES["revocation"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REVOCATION_REDIS_URL,
+        "KEY_PREFIX": "revocation",
+    }
+elif DEBUG or os.environ.get("JWT_REVOCATION_LOCAL"):
+    CACHES["revocation"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "revocation",
+        "OPTIONS": {"MAX_ENTRIES": sys.maxsize},
+    }
+
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 300))
+# Délai maximal (s) avant qu'une nouvelle note apparaisse dans les listes en cache
+NOTATIONS_CACHE_DELAY = int(os.environ.get("NOTATIONS_CACHE_DELAY", 60))
+
+# Âge maximal (s) de l'index d'autocomplétion en mémoire (popularité des titres)
+AUTOCOMPLETE_MAX_AGE = 3600
+
 ROOT_URLCONF = 'Cinema.urls'
 
 TEMPLATES = [
@@ -75,16 +121,25 @@ TEMPLATES = [
     },
 ]
 
+# JWT_STATELESS=1 : l'utilisateur est reconstruit à partir des claims du jeton
+# d'accès, sans requête SQL (voir core.authentication.StatelessJWTAuthentication)
+JWT_STATELESS = bool(os.environ.get("JWT_STATELESS"))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.StatelessJWTAuthentication" if JWT_STATELESS
+        else "core.authentication.JWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
-        "rest_framework.filters.SearchFilter",
+        "movies.search.FullTextSearchFilter",
         "rest_framework.filters.OrderingFilter",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
@@ -99,9 +154,21 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": False,
+    # Claims (rôle, profil spectateur) et révocation dans le cache "revocation" (core.revocation)
+    "TOKEN_OBTAIN_SERIALIZER": "core.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "core.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "core.serializers.TokenVerifySerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "core.serializers.TokenBlacklistSerializer",
 }
 
+# Révocation des jetons : délai (s) de prise en compte par les autres processus
+# et nombre de révocations avant reconstruction du filtre de Bloom local
+JWT_REVOCATION_SYNC = 5
+JWT_REVOCATION_CAPACITY = 100_000
+
 
+# Nombre minimal de votes "m" de la moyenne bayésienne du classement (/films/top/)
+CLASSEMENT_VOTES_MIN = 10
 
 WSGI_APPLICATION = 'Cinema.wsgi.application'
 
@@ -18,7 +18,7 @@ from django.contrib import admin
 from django.urls import path , include
 from core.views import ping
 from rest_framework.routers import DefaultRouter
-from movies.views import AuteurViewSet,FilmViewSet,SpectateurViewSet,SpectateurSignupViewSet
+from movies.views import AuteurViewSet,FilmViewSet,SpectateurViewSet,SpectateurSignupViewSet,autocomplete,export_table
 from rest_framework_simplejwt.views import (
     TokenObtainPairView, TokenRefreshView, TokenVerifyView, TokenBlacklistView
 )
@@ -35,6 +35,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
     path('ping/', ping),
+    path('autocomplete/', autocomplete, name="autocomplete"),
+    path('export/<str:table>.<str:extension>', export_table, name="export"),
     path("", include(router.urls)),
     path("auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Cinema.settings')
 
 application = get_wsgi_application()
+
+# Construit l'index d'autocomplétion avant la première requête
+from django.db import DatabaseError  # noqa: E402
+from movies.autocomplete import warm  # noqa: E402
+
+try:
+    warm()
+except DatabaseError:
+    pass
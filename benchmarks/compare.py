@@ -0,0 +1,46 @@
+"""
+Compare deux fichiers de résultats de benchmark.
+
+    python -m benchmarks.compare benchmarks/results/load-A.json benchmarks/results/load-B.json
+"""
+import argparse
+import json
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request",
+           "films_per_s", "http_rps", "queries_per_film", "duration_s")
+
+
+def delta(before, after) -> str:
+    if before in (None, 0) or after is None:
+        return ""
+    return f"{(after - before) / before * 100:+.1f} %"
+
+
+def rows(label, before: dict, after: dict):
+    for metric in METRICS:
+        if metric in before or metric in after:
+            b, a = before.get(metric), after.get(metric)
+            yield f"{label:<18} {metric:<20} {str(b):>12} {str(a):>12} {delta(b, a):>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare deux résultats de benchmark")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as fh:
+        before = json.load(fh)["results"]
+    with open(args.after) as fh:
+        after = json.load(fh)["results"]
+
+    print(f"{'':<18} {'mesure':<20} {'avant':>12} {'après':>12} {'écart':>10}")
+    for line in rows("global", before, after):
+        print(line)
+    for name in sorted(set(before.get("scenarios", {})) | set(after.get("scenarios", {}))):
+        for line in rows(name, before.get("scenarios", {}).get(name, {}), after.get("scenarios", {}).get(name, {})):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
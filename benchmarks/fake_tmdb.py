@@ -0,0 +1,162 @@
+"""
+Serveur TMDb local pour rejouer ``import_tmdb`` sans réseau.
+
+Les réponses viennent soit d'un cache enregistré par un vrai import
+(``--from-cache tmdb_cache.sqlite3``), soit d'un catalogue synthétique
+déterministe (``--pages``). ``--latency`` simule le temps de réponse de l'API.
+
+    python -m benchmarks.fake_tmdb --pages 50 --latency 80 --port 8765
+    python manage.py import_tmdb --api-base http://127.0.0.1:8765/3
+"""
+import argparse
+import json
+import random
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MOVIES_PER_PAGE = 20
+WRITERS_POOL = 5000
+
+
+class SyntheticCatalog:
+    """
+        Catalogue généré à la volée : ``pages`` pages de 20 films,
+        2 à 4 scénaristes par film tirés dans un vivier commun.
+    """
+
+    def __init__(self, pages: int, seed: int = 42):
+        self.pages = pages
+        self.seed = seed
+
+    def discover(self, page: int) -> dict:
+        results = [
+            {"id": page * 1000 + i, "title": f"Film {page}-{i}", "overview": f"Synopsis {page}-{i}",
+             "release_date": f"{1970 + (page + i) % 55}-{1 + i % 12:02d}-{1 + page % 28:02d}"}
+            for i in range(MOVIES_PER_PAGE)
+        ] if 1 <= page <= self.pages else []
+        return {"page": page, "total_pages": self.pages, "total_results": self.pages * MOVIES_PER_PAGE,
+                "results": results}
+
+    def credits(self, movie_id: int) -> dict:
+        rng = random.Random(self.seed * 1_000_003 + movie_id)
+        writers = rng.sample(range(1, WRITERS_POOL), rng.randint(2, 4))
+        crew = [{"id": w, "name": f"Scénariste {w}", "department": "Writing", "job": "Screenplay"} for w in writers]
+        crew.append({"id": WRITERS_POOL + movie_id, "name": "Ingénieur son", "department": "Sound"})
+        return {"id": movie_id, "cast": [], "crew": crew}
+
+    def person(self, person_id: int) -> dict:
+        return {"id": person_id, "name": f"Scénariste {person_id}",
+                "birthday": f"{1930 + person_id % 60}-{1 + person_id % 12:02d}-{1 + person_id % 28:02d}"}
+
+    def movie(self, movie_id: int) -> dict:
+        page, i = divmod(movie_id, 1000)
+        return {**self.discover(page)["results"][i], "id": movie_id} if 1 <= page <= self.pages else None
+
+    def search(self, query: str) -> dict:
+        results = [m for page in range(1, self.pages + 1) for m in self.discover(page)["results"]
+                   if m["title"] == query]
+        return {"page": 1, "total_pages": 1, "total_results": len(results), "results": results}
+
+    def respond(self, path: str, query: dict):
+        parts = [p for p in path.split("/") if p]
+        if parts[:1] == ["3"]:
+            parts = parts[1:]
+        if parts == ["discover", "movie"]:
+            return self.discover(int(query.get("page", ["1"])[0]))
+        if len(parts) == 3 and parts[0] == "movie" and parts[2] == "credits":
+            return self.credits(int(parts[1]))
+        if len(parts) == 2 and parts[0] == "person" and parts[1].isdigit():
+            return self.person(int(parts[1]))
+        if len(parts) == 2 and parts[0] == "movie" and parts[1].isdigit():
+            return self.movie(int(parts[1]))
+        if parts == ["search", "movie"]:
+            return self.search(query.get("query", [""])[0])
+        if len(parts) == 2 and parts[1] == "changes":
+            return {"page": 1, "total_pages": 1, "results": []}
+        return None
+
+
+class RecordedCatalog:
+    """
+        Réponses enregistrées dans le cache SQLite de ``import_tmdb`` (``--cache``),
+        indexées par chemin + paramètres.
+    """
+
+    def __init__(self, path):
+        db = sqlite3.connect(str(path))
+        self.responses = {}
+        for key, body in db.execute("SELECT key, body FROM responses WHERE status = 200"):
+            url = urlsplit(key)
+            self.responses[self.key(url.path, parse_qs(url.query))] = body
+        db.close()
+
+    @staticmethod
+    def key(path: str, query: dict) -> str:
+        path = path[path.index("/3/") + 2:] if "/3/" in path else path
+        return path + "?" + "&".join(f"{k}={v[0]}" for k, v in sorted(query.items()))
+
+    def respond(self, path: str, query: dict):
+        body = self.responses.get(self.key(path, query))
+        return json.loads(body) if body is not None else None
+
+
+def make_server(catalog, host="127.0.0.1", port=0, latency_ms: float = 0.0):
+    """
+        Crée le serveur (``port=0`` : port libre). ``server.hits`` compte les requêtes servies.
+    """
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            url = urlsplit(self.path)
+            data = catalog.respond(url.path, parse_qs(url.query))
+            with lock:
+                self.server.hits += 1
+            body = json.dumps(data if data is not None else {"status_code": 34}).encode()
+            self.send_response(200 if data is not None else 404)
+            self.send_header("Content-Type", "application/json;charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.hits = 0
+    return server
+
+
+def start_in_thread(catalog, latency_ms: float = 0.0):
+    server = make_server(catalog, latency_ms=latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/3"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur TMDb local (fixtures enregistrées ou synthétiques)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="Latence ajoutée à chaque réponse (ms)")
+    parser.add_argument("--pages", type=int, default=10, help="Pages du catalogue synthétique")
+    parser.add_argument("--from-cache", help="Cache SQLite d'un import réel à rejouer")
+    args = parser.parse_args()
+
+    catalog = RecordedCatalog(args.from_cache) if args.from_cache else SyntheticCatalog(args.pages)
+    server = make_server(catalog, args.host, args.port, args.latency)
+    print(f"TMDb local : http://{args.host}:{args.port}/3 (latence {args.latency} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
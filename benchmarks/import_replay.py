@@ -0,0 +1,82 @@
+"""
+Rejoue ``import_tmdb`` contre le serveur TMDb local, dans une base de test
+jetable (la base configurée n'est jamais modifiée).
+
+    python -m benchmarks.import_replay --pages 25 --latency 50 --workers 8
+    python -m benchmarks.import_replay --from-cache tmdb_cache.sqlite3 --latency 80
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from .fake_tmdb import RecordedCatalog, SyntheticCatalog, start_in_thread
+from .stats import save_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de import_tmdb contre un TMDb local")
+    parser.add_argument("--pages", type=int, default=10, help="Pages du catalogue synthétique")
+    parser.add_argument("--from-cache", help="Cache SQLite d'un import réel à rejouer")
+    parser.add_argument("--latency", type=float, default=50, help="Latence simulée de TMDb (ms)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=1000, help="Limite de requêtes/s (TMDb réel : 40)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--output", help="Fichier JSON de résultats (défaut benchmarks/results/)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Cinema.settings")
+    os.environ.setdefault("TMDB_BEARER_TOKEN", "benchmark")
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from movies.models import AuteurProfile, Film
+
+    catalog = RecordedCatalog(args.from_cache) if args.from_cache else SyntheticCatalog(args.pages)
+    server, api_base = start_in_thread(catalog, latency_ms=args.latency)
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+    queries = 0
+
+    def counter(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp, connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            call_command(
+                "import_tmdb", api_base=api_base, workers=args.workers, rate=args.rate,
+                batch_size=args.batch_size, no_cache=True, restart=True,
+                checkpoint=str(Path(tmp) / "checkpoint.json"), stdout=io.StringIO(),
+            )
+            duration = time.perf_counter() - start
+        films, auteurs = Film.objects.count(), AuteurProfile.objects.count()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        server.shutdown()
+
+    results = {
+        "duration_s": round(duration, 2),
+        "films": films,
+        "auteurs": auteurs,
+        "films_per_s": round(films / duration, 2),
+        "http_requests": server.hits,
+        "http_rps": round(server.hits / duration, 2),
+        "sql_queries": queries,
+        "queries_per_film": round(queries / films, 3) if films else None,
+    }
+    print(f"{films} films / {auteurs} auteurs en {results['duration_s']} s "
+          f"({results['films_per_s']} films/s) — {server.hits} requêtes TMDb ({results['http_rps']} req/s), "
+          f"{queries} requêtes SQL ({results['queries_per_film']} par film)")
+    config = {"pages": args.pages, "from_cache": args.from_cache, "latency_ms": args.latency,
+              "workers": args.workers, "rate": args.rate, "batch_size": args.batch_size}
+    print(f"Résultats : {save_results('import', config, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Test de charge de l'API (façon Locust, sans dépendance) : des utilisateurs
+virtuels enchaînent un mélange pondéré de scénarios contre un serveur local.
+
+    BENCHMARK_QUERY_COUNT=1 python manage.py runserver --noreload
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --users 20 --duration 60 \\
+        --mix login=1,browse=6,favoris=2,noter=1
+
+Avec ``BENCHMARK_QUERY_COUNT=1`` le serveur renvoie l'en-tête ``X-DB-Queries``,
+ce qui permet de mesurer le nombre de requêtes SQL par requête HTTP.
+"""
+import argparse
+import math
+import random
+import threading
+import time
+import uuid
+
+import requests
+
+from .stats import Recorder, print_summary, save_results
+
+DEFAULT_MIX = "login=1,browse=6,favoris=2,noter=1"
+PASSWORD = "Benchmark123!"
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(VirtualUser.SCENARIOS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"scénario(s) inconnu(s) : {', '.join(sorted(unknown))}")
+    return mix
+
+
+class VirtualUser(threading.Thread):
+    SCENARIOS = ("login", "browse", "favoris", "noter")
+
+    def __init__(self, number, args, recorder, film_ids, film_pages, deadline, run_id):
+        super().__init__(daemon=True)
+        self.base = args.base_url.rstrip("/")
+        self.args = args
+        self.recorder = recorder
+        self.film_ids = film_ids
+        self.film_pages = film_pages
+        self.deadline = deadline
+        self.rng = random.Random(number)
+        self.session = requests.Session()
+        self.username = f"bench-{run_id}-{number}"
+        self.names = list(args.mix)
+        self.weights = [args.mix[n] for n in self.names]
+
+    def call(self, name, method, path, auth=True, **kwargs):
+        headers = {"Authorization": f"Bearer {self.access}"} if auth else {}
+        start = time.perf_counter()
+        try:
+            resp = self.session.request(method, self.base + path, headers=headers, timeout=30, **kwargs)
+        except requests.RequestException:
+            self.recorder.add(name, (time.perf_counter() - start) * 1000, None)
+            return None
+        elapsed = (time.perf_counter() - start) * 1000
+        queries = resp.headers.get("X-DB-Queries")
+        self.recorder.add(name, elapsed, resp.status_code, int(queries) if queries else None)
+        return resp
+
+    def run(self):
+        self.access = None
+        self.call("signup", "post", "/auth/signup/", auth=False,
+                  json={"username": self.username, "password": PASSWORD})
+        self.login()
+        while time.monotonic() < self.deadline:
+            scenario = self.rng.choices(self.names, self.weights)[0]
+            getattr(self, scenario)()
+            if self.args.think_ms:
+                time.sleep(self.args.think_ms / 1000)
+
+    def login(self):
+        resp = self.call("login", "post", "/auth/token/", auth=False,
+                         json={"username": self.username, "password": PASSWORD})
+        if resp is not None and resp.status_code == 200:
+            self.access = resp.json()["access"]
+
+    def browse(self):
+        page = self.rng.randint(1, self.film_pages)
+        self.call("browse", "get", f"/films/?page={page}", auth=False)
+
+    def favoris(self):
+        film_id = self.rng.choice(self.film_ids)
+        self.call("favoris_add", "post", "/spectateurs/favoris/", json={"film_id": film_id})
+        self.call("favoris_remove", "delete", f"/spectateurs/favoris/{film_id}/")
+
+    def noter(self):
+        # Un 400 "déjà noté" est une réponse attendue une fois le film noté
+        film_id = self.rng.choice(self.film_ids)
+        self.call("noter", "post", "/spectateurs/notations/film/",
+                  json={"film": film_id, "note": self.rng.randint(1, 5)})
+
+
+def discover_films(base_url: str, limit: int = 1000):
+    """
+        Identifiants de films disponibles (curseur) et nombre de pages de ``/films/``.
+    """
+    first = requests.get(f"{base_url}/films/", timeout=30).json()
+    page_size = len(first.get("results", [])) or 1
+    pages = max(1, math.ceil(first.get("count", 0) / page_size))
+    ids, url = [], f"{base_url}/films/?pagination=cursor&page_size=100"
+    while url and len(ids) < limit:
+        data = requests.get(url, timeout=30).json()
+        ids.extend(f["id"] for f in data["results"])
+        url = data.get("next")
+    return ids, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de charge de l'API Cinema")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="Utilisateurs virtuels simultanés")
+    parser.add_argument("--duration", type=float, default=30, help="Durée du test (s)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Pondération des scénarios (défaut {DEFAULT_MIX})")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pause entre deux scénarios (ms)")
+    parser.add_argument("--output", help="Fichier JSON de résultats (défaut benchmarks/results/)")
+    args = parser.parse_args()
+
+    base = args.base_url.rstrip("/")
+    film_ids, film_pages = discover_films(base)
+    if not film_ids:
+        parser.error("aucun film sur le serveur : lancez d'abord import_tmdb (ex. contre benchmarks.fake_tmdb)")
+
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    start = time.monotonic()
+    users = [VirtualUser(i, args, recorder, film_ids, film_pages, start + args.duration, run_id)
+             for i in range(args.users)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    results = recorder.summary(time.monotonic() - start)
+
+    print_summary(results)
+    config = {"base_url": base, "users": args.users, "duration": args.duration,
+              "mix": args.mix, "think_ms": args.think_ms}
+    print(f"Résultats : {save_results('load', config, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compare la sérialisation des listes par ``.values()`` (``ValuesListMixin``) et par
+les serializers DRF, dans une base de test jetable : durée par page et égalité
+octet pour octet du JSON produit.
+
+    python -m benchmarks.serialization --films 5000 --page-size 100 --repeat 20
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+from .stats import percentile, save_results
+
+
+def seed(nb_films: int, nb_auteurs: int):
+    from django.contrib.auth import get_user_model
+    from movies.models import AuteurProfile, Film
+
+    rng = random.Random(42)
+    users = get_user_model().objects.bulk_create(
+        [get_user_model()(username=f"auteur{i}", role="auteur") for i in range(nb_auteurs // 2)]
+    )
+    AuteurProfile.objects.bulk_create([
+        AuteurProfile(nom=f"Auteur {i}", user=users[i] if i < len(users) else None,
+                      date_naissance=date(1940, 1, 1) + timedelta(days=rng.randrange(20000)))
+        for i in range(nb_auteurs)
+    ])
+    Film.objects.bulk_create([
+        Film(titre=f"Film {i}", description=f"Description du film {i}",
+             date_sortie=date(1970, 1, 1) + timedelta(days=rng.randrange(20000)),
+             statut=rng.choice(["production", "salle", "sorti"]),
+             note_moyenne=round(rng.uniform(1, 5), 2), nb_notations=rng.randrange(100))
+        for i in range(nb_films)
+    ])
+
+
+def measure(viewset, url: str, values: bool, repeat: int):
+    from django.core.cache import cache
+    from rest_framework.test import APIRequestFactory
+
+    view = viewset.as_view({"get": "list"})
+    factory = APIRequestFactory()
+    timings, content = [], None
+    with mock.patch.object(viewset, "values_serialization", values):
+        for _ in range(repeat):
+            cache.clear()
+            start = time.perf_counter()
+            response = view(factory.get(url))
+            response.render()
+            timings.append((time.perf_counter() - start) * 1000)
+            content = response.content
+    return timings, content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la sérialisation des listes")
+    parser.add_argument("--films", type=int, default=5000)
+    parser.add_argument("--auteurs", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Fichier JSON de résultats (défaut benchmarks/results/)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Cinema.settings")
+    import django
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from movies.views import AuteurViewSet, FilmViewSet
+
+    setup_test_environment()  # ALLOWED_HOSTS "testserver" pour APIRequestFactory
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+    results = {}
+    try:
+        seed(args.films, args.auteurs)
+        scenarios = {
+            "films": (FilmViewSet, f"/films/?page_size={args.page_size}&page=2"),
+            "films_curseur": (FilmViewSet, f"/films/?pagination=cursor&page_size={args.page_size}"),
+            "auteurs": (AuteurViewSet, f"/auteurs/?page_size={args.page_size}&page=2"),
+        }
+        for name, (viewset, url) in scenarios.items():
+            serializer_ms, serializer_json = measure(viewset, url, False, args.repeat)
+            values_ms, values_json = measure(viewset, url, True, args.repeat)
+            results[name] = {
+                "serializer_p50_ms": round(percentile(serializer_ms, 50), 2),
+                "values_p50_ms": round(percentile(values_ms, 50), 2),
+                "speedup": round(percentile(serializer_ms, 50) / percentile(values_ms, 50), 2),
+                "identical": serializer_json == values_json,
+                "bytes": len(values_json),
+            }
+            r = results[name]
+            print(f"{name:<14} serializer {r['serializer_p50_ms']:>8} ms  values {r['values_p50_ms']:>8} ms  "
+                  f"x{r['speedup']}  JSON identique : {'oui' if r['identical'] else 'NON'}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    config = {"films": args.films, "auteurs": args.auteurs, "page_size": args.page_size, "repeat": args.repeat}
+    print(f"Résultats : {save_results('serialization', config, results, args.output)}")
+    if not all(r["identical"] for r in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
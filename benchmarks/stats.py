@@ -0,0 +1,94 @@
+import json
+import platform
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Recorder:
+    """
+        Collecte thread-safe des mesures par scénario :
+        latence (ms), code HTTP et nombre de requêtes SQL (en-tête ``X-DB-Queries``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def add(self, name: str, elapsed_ms: float, status: int | None, queries: int | None = None):
+        with self._lock:
+            self.latencies[name].append(elapsed_ms)
+            if status is None or status >= 500:
+                self.errors[name] += 1
+            self.statuses[name][str(status)] += 1
+            if queries is not None:
+                self.queries[name].append(queries)
+
+    def summary(self, duration: float) -> dict:
+        scenarios = {}
+        for name, values in sorted(self.latencies.items()):
+            queries = self.queries.get(name)
+            scenarios[name] = {
+                "requests": len(values),
+                "rps": round(len(values) / duration, 2) if duration else 0,
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "errors": self.errors.get(name, 0),
+                "statuses": dict(self.statuses[name]),
+                "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        everything = [v for values in self.latencies.values() for v in values]
+        return {
+            "duration_s": round(duration, 2),
+            "requests": total,
+            "rps": round(total / duration, 2) if duration else 0,
+            "p50_ms": round(percentile(everything, 50), 2),
+            "p95_ms": round(percentile(everything, 95), 2),
+            "p99_ms": round(percentile(everything, 99), 2),
+            "scenarios": scenarios,
+        }
+
+
+def save_results(kind: str, config: dict, results: dict, output: str | None = None) -> Path:
+    now = datetime.now(timezone.utc)
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{kind}-{now:%Y%m%d-%H%M%S}.json"
+    payload = {
+        "kind": kind,
+        "date": now.isoformat(),
+        "python": platform.python_version(),
+        "config": config,
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+    return path
+
+
+def print_summary(results: dict):
+    print(f"{results['requests']} requêtes en {results['duration_s']} s -> {results['rps']} req/s "
+          f"(p50 {results['p50_ms']} ms, p95 {results['p95_ms']} ms, p99 {results['p99_ms']} ms)")
+    for name, s in results.get("scenarios", {}).items():
+        queries = "-" if s["queries_per_request"] is None else s["queries_per_request"]
+        print(f"  {name:<16} {s['requests']:>6} req  {s['rps']:>8} req/s  p50 {s['p50_ms']:>8} ms  "
+              f"p95 {s['p95_ms']:>8} ms  p99 {s['p99_ms']:>8} ms  SQL/req {queries}  erreurs {s['errors']}")
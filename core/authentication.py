@@ -0,0 +1,81 @@
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication as BaseJWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from movies.models import SpectateurProfile
+from .revocation import is_revoked
+
+
+class JWTAuthentication(BaseJWTAuthentication):
+    """
+        Authentification JWT qui charge l'utilisateur et son profil spectateur
+        en une seule requête (jointure) : ``request.user.spectateur_profile``
+        ne coûte plus rien pour le reste de la requête (vue et serializers).
+    """
+    related_profiles = ("spectateur_profile",)
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token is blacklisted"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        try:
+            user = (self.user_model.objects.select_related(*self.related_profiles)
+                    .get(**{api_settings.USER_ID_FIELD: user_id}))
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """
+        Utilisateur reconstruit à partir des claims du jeton d'accès
+        (voir ``core.serializers.add_claims``), sans lecture en base.
+        ``spectateur_profile`` n'a que ses clés (``id``, ``user_id``) : suffisant
+        pour les favoris et les notations, les autres champs sont lus à la demande.
+    """
+
+    @cached_property
+    def role(self) -> str:
+        return self.token.get("role", "")
+
+    @cached_property
+    def spectateur_profile(self) -> SpectateurProfile:
+        spectateur_id = self.token.get("spectateur_id")
+        if spectateur_id is None:
+            raise SpectateurProfile.DoesNotExist("Profil spectateur introuvable.")
+        return SpectateurProfile.from_db(None, ["id", "user_id"], [spectateur_id, self.id])
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+        Authentification sans état (``JWT_STATELESS``) : les claims signés du jeton
+        d'accès (id, rôle, is_staff, profil spectateur) font foi pendant sa durée de
+        vie, seule la révocation est vérifiée (``core.revocation``, sans requête SQL).
+        Un changement de rôle ou une désactivation n'est visible qu'au jeton suivant.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return ClaimsUser(validated_token)
@@ -0,0 +1,24 @@
+from django.db import connection
+
+
+class QueryCountMiddleware:
+    """
+        Ajoute l'en-tête ``X-DB-Queries`` (nombre de requêtes SQL de la réponse).
+        Activé uniquement pour les benchmarks : variable d'environnement ``BENCHMARK_QUERY_COUNT``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        response["X-DB-Queries"] = str(count)
+        return response
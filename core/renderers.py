@@ -0,0 +1,86 @@
+"""
+Encodage JSON de l'API : orjson s'il est installé (sinon le module ``json``),
+même sortie que ``rest_framework.renderers.JSONRenderer`` (compacte, UTF-8), à
+une exception près : orjson n'écrit jamais de flottant en notation ``1e-05`` /
+``1e+16`` mais ``0.00001`` / ``1e16`` (même valeur ; les notes et scores de l'API,
+entre 1 et 5, ne sont pas concernés).
+
+``streaming_json_response`` renvoie un tableau JSON produit par morceaux à
+partir d'un curseur serveur (``iterator(chunk_size=...)``) : la mémoire reste
+bornée par la taille d'un lot, quel que soit le nombre de lignes.
+"""
+import json
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_CHUNK_SIZE = 500
+
+_encoder = JSONEncoder()
+
+
+def dumps(data) -> bytes:
+    if orjson is None:
+        content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False,
+                             separators=(",", ":")).encode()
+    else:
+        # Types hors JSON (Decimal, dates, chaînes paresseuses...) : même conversion que DRF,
+        # y compris pour les dates et heures que orjson sait encoder ("Z", millisecondes)
+        content = orjson.dumps(data, default=_encoder.default,
+                               option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    # Comme JSONRenderer : U+2028 / U+2029 échappés (JSON inclus dans du JavaScript)
+    return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+        ``JSONRenderer`` encodé par orjson ; ``indent`` demandé dans l'en-tête
+        ``Accept`` : rendu standard de DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+def iter_json_array(queryset, serializer_class, chunk_size=DEFAULT_CHUNK_SIZE, context=None):
+    """
+        Tableau JSON de ``queryset`` sérialisé par ``serializer_class``, lot par lot
+        (les ``prefetch_related`` du queryset sont appliqués à chaque lot).
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    separator = b"["
+    while chunk := list(islice(rows, chunk_size)):
+        data = serializer_class(chunk, many=True, context=context or {}).data
+        yield separator + b",".join(dumps(item) for item in data)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def streaming_json_response(queryset, serializer_class, chunk_size=DEFAULT_CHUNK_SIZE, context=None):
+    return StreamingHttpResponse(iter_json_array(queryset, serializer_class, chunk_size, context),
+                                 content_type="application/json")
+
+
+class IgnoreAcceptNegotiation(BaseContentNegotiation):
+    """
+        Vues qui choisissent elles-mêmes leur format de réponse (exports) :
+        l'en-tête ``Accept`` n'est pas pris en compte.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
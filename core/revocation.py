@@ -0,0 +1,145 @@
+"""
+Révocation des jetons JWT (déconnexion) sans table en base.
+
+Chaque révocation est ajoutée à un journal dans le cache ``revocation`` (Redis sans
+éviction en production, distinct du cache des listes ; à défaut, le cache par défaut) :
+un compteur ``jwt:revoked:n`` incrémenté atomiquement et une entrée par numéro,
+qui expire avec le jeton. Chaque processus en tire un filtre de Bloom local,
+mis à jour toutes les ``JWT_REVOCATION_SYNC`` secondes : un jeton absent du
+filtre n'est pas révoqué (aucun accès au cache) ; un jeton présent est confirmé
+par sa clé ``jwt:revoked:jti:<jti>`` (faux positifs du filtre).
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework_simplejwt.settings import api_settings
+
+CACHE_ALIAS = "revocation"
+COUNTER_KEY = "jwt:revoked:n"
+ENTRY_KEY = "jwt:revoked:%d"
+JTI_KEY = "jwt:revoked:jti:%s"
+FALSE_POSITIVE_RATE = 0.001
+
+
+class BloomFilter:
+    """
+        Ensemble probabiliste : ``in`` ne renvoie jamais faux pour une clé ajoutée,
+        et vrai à tort avec une probabilité ``error_rate`` tant que ``capacity`` n'est pas dépassée.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        return self.count > self.capacity
+
+
+def check_cache() -> None:
+    """
+        Avec JWT_STATELESS, refuse de démarrer sans cache ``revocation`` : une révocation évincée
+        ou propre à un processus laisserait valide un jeton déconnecté, sans autre vérification.
+    """
+    if getattr(settings, "JWT_STATELESS", False) and CACHE_ALIAS not in settings.CACHES:
+        raise ImproperlyConfigured(
+            f'JWT_STATELESS requiert CACHES["{CACHE_ALIAS}"] pour la révocation des jetons : '
+            "définir REVOCATION_REDIS_URL ou REDIS_URL (Redis en maxmemory-policy noeviction)."
+        )
+
+
+def get_cache():
+    """
+        Cache ``revocation`` s'il est configuré, sinon le cache par défaut.
+    """
+    return caches[CACHE_ALIAS if CACHE_ALIAS in settings.CACHES else "default"]
+
+
+_lock = threading.Lock()
+_state = {"filter": None, "seen": 0, "start": 1, "synced": float("-inf")}
+
+
+def _new_filter() -> BloomFilter:
+    return BloomFilter(getattr(settings, "JWT_REVOCATION_CAPACITY", 100_000))
+
+
+def _load(first: int, last: int) -> dict:
+    """
+        Entrées ``first`` à ``last`` du journal encore présentes dans le cache (les autres ont expiré).
+    """
+    entries = {}
+    for chunk in range(first, last + 1, 1000):
+        numbers = range(chunk, min(chunk + 1000, last + 1))
+        found = get_cache().get_many([ENTRY_KEY % n for n in numbers])
+        entries.update({n: found[ENTRY_KEY % n] for n in numbers if ENTRY_KEY % n in found})
+    return entries
+
+
+def sync(force: bool = False) -> BloomFilter:
+    """
+        Filtre local, complété avec les révocations des autres processus au plus
+        toutes les ``JWT_REVOCATION_SYNC`` secondes.
+    """
+    max_age = getattr(settings, "JWT_REVOCATION_SYNC", 5)
+    if not force and _state["filter"] is not None and time.monotonic() - _state["synced"] < max_age:
+        return _state["filter"]
+    with _lock:
+        last = get_cache().get(COUNTER_KEY, 0)
+        bloom, seen = _state["filter"], _state["seen"]
+        if bloom is None or last < seen:
+            # Premier appel ou cache vidé
+            bloom, seen, _state["start"] = _new_filter(), 0, 1
+        if last > seen:
+            entries = _load(seen + 1, last)
+            if bloom.count + len(entries) > bloom.capacity:
+                # Filtre saturé : reconstruit à partir des seules révocations non expirées
+                bloom, entries = _new_filter(), _load(_state["start"], last)
+                _state["start"] = min(entries, default=last + 1)
+            for jti in entries.values():
+                bloom.add(jti)
+        _state.update(filter=bloom, seen=last, synced=time.monotonic())
+        return bloom
+
+
+def revoke(token) -> None:
+    """
+        Révoque ``token`` (jeton simplejwt) jusqu'à son expiration.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    timeout = int(token["exp"] - time.time()) + 1
+    if timeout <= 0:
+        return
+    cache = get_cache()
+    cache.set(JTI_KEY % jti, True, timeout)
+    cache.add(COUNTER_KEY, 0, None)
+    cache.set(ENTRY_KEY % cache.incr(COUNTER_KEY), jti, timeout)
+    with _lock:
+        if _state["filter"] is not None:
+            _state["filter"].add(jti)
+
+
+def is_revoked(jti: str) -> bool:
+    if jti not in sync():
+        return False
+    return get_cache().get(JTI_KEY % jti, False)
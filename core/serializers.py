@@ -1,8 +1,18 @@
 from .models import CustomUser
 
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, UntypedToken
+
+from .revocation import is_revoked, revoke
 
 User = get_user_model()
 
@@ -58,3 +68,84 @@ class CustomUserWriteSerializer(serializers.ModelSerializer):
             instance.set_password(password)
         instance.save()
         return instance
+
+
+def add_claims(token, user):
+    """
+        Claims lus par ``core.authentication.StatelessJWTAuthentication``.
+        Le profil spectateur est lu sur ``user`` (une requête, sauf s'il est déjà chargé).
+    """
+    try:
+        spectateur_id = user.spectateur_profile.id
+    except ObjectDoesNotExist:
+        spectateur_id = None
+    token["username"] = user.get_username()
+    token["role"] = user.role
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["spectateur_id"] = spectateur_id
+    return token
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+
+    @classmethod
+    def get_token(cls, user):
+        # Le jeton d'accès hérite des claims du jeton de rafraîchissement
+        return add_claims(super().get_token(user), user)
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+        Refuse les jetons révoqués et recalcule les claims du nouveau jeton d'accès
+        à partir de l'utilisateur (chargé avec son profil en une requête).
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_revoked(refresh.get(jwt_settings.JTI_CLAIM)):
+            raise TokenError(_("Token is blacklisted"))
+
+        user = (User.objects.select_related("spectateur_profile")
+                .filter(**{jwt_settings.USER_ID_FIELD: refresh.get(jwt_settings.USER_ID_CLAIM)}).first())
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(add_claims(refresh.access_token, user))}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                revoke(refresh)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(add_claims(refresh, user))
+        return data
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        if is_revoked(token.get(jwt_settings.JTI_CLAIM)):
+            raise serializers.ValidationError(_("Token is blacklisted"))
+        return {}
+
+
+class TokenBlacklistSerializer(jwt_serializers.TokenBlacklistSerializer):
+    """
+        Déconnexion : révoque le jeton de rafraîchissement et, s'il est fourni
+        dans l'en-tête ``Authorization``, le jeton d'accès courant.
+    """
+
+    def validate(self, attrs):
+        revoke(self.token_class(attrs["refresh"]))
+        request = self.context.get("request")
+        authentication = JWTAuthentication()
+        header = authentication.get_header(request) if request else None
+        raw_token = authentication.get_raw_token(header) if header else None
+        if raw_token:
+            try:
+                revoke(AccessToken(raw_token))
+            except TokenError:
+                pass
+        return {}
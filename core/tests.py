@@ -1,3 +1,118 @@
-from django.test import TestCase
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework.views import APIView
+
+from core.authentication import StatelessJWTAuthentication
+from core.renderers import ORJSONRenderer
+from core.revocation import JTI_KEY, check_cache
+from core.serializers import TokenObtainPairSerializer
+from movies.models import SpectateurProfile
+
+User = get_user_model()
+
+REVOCATION_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "revocation": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "revocation",
+                   "OPTIONS": {"MAX_ENTRIES": 1_000_000}},
+}
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AuthTestCase(APITestCase):
+    password = "Secret123!"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", cls.password)
+        cls.user = User.objects.create_user("alice", "alice@example.com", cls.password, role="spectateur")
+        cls.spectateur = SpectateurProfile.objects.create(user=cls.user, bio="cinéphile")
+
+    def authenticate(self, user):
+        self.client.credentials()
+        if user is not None:
+            access = TokenObtainPairSerializer.get_token(user).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+
+class LogoutTests(AuthTestCase):
+
+    def test_logout_revoque(self):
+        refresh = TokenObtainPairSerializer.get_token(self.user)
+        access = str(refresh.access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.client.get("/spectateurs/me/").status_code, 200)
+        self.assertEqual(self.client.post("/auth/logout/", {"refresh": str(refresh)}, format="json").status_code, 200)
+        self.assertEqual(self.client.get("/spectateurs/me/").status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.client.post("/auth/token/refresh/", {"refresh": str(refresh)}).status_code, 401)
+        self.assertEqual(self.client.post("/auth/token/verify/", {"token": access}).status_code, 400)
+
+    @override_settings(CACHES=REVOCATION_CACHES)
+    def test_revocation_non_evincee(self):
+        # Le cache des listes ("default", 300 entrées) peut évincer ses clés, pas le cache "revocation"
+        refresh = TokenObtainPairSerializer.get_token(self.user)
+        self.client.post("/auth/logout/", {"refresh": str(refresh)}, format="json")
+        cache.set_many({f"liste:{i}": i for i in range(1000)})
+        self.assertIsNone(cache.get(JTI_KEY % refresh["jti"]))
+        self.assertEqual(self.client.post("/auth/token/refresh/", {"refresh": str(refresh)}).status_code, 401)
+
+    def test_cache_requis(self):
+        # Requis seulement avec JWT_STATELESS (sinon cache par défaut : migrate, etc. sans Redis)
+        with override_settings(CACHES={"default": settings.CACHES["default"]}):
+            check_cache()
+            with override_settings(JWT_STATELESS=True), self.assertRaises(ImproperlyConfigured):
+                check_cache()
+        with override_settings(CACHES=REVOCATION_CACHES, JWT_STATELESS=True):
+            check_cache()
+
+
+@mock.patch.object(APIView, "authentication_classes", [StatelessJWTAuthentication])
+class StatelessAuthTests(AuthTestCase):
+    """
+        JWT_STATELESS : l'utilisateur est reconstruit à partir des claims du jeton.
+    """
+
+    def test_me(self):
+        self.authenticate(self.user)
+        response = self.client.get("/spectateurs/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["bio"], "cinéphile")
+        self.assertEqual(response.data["user"]["username"], "alice")
+
+    def test_admin(self):
+        self.authenticate(self.admin)
+        response = self.client.get("/spectateurs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["username"] for row in response.data["results"]], ["alice"])
+        self.authenticate(self.user)
+        self.assertEqual(self.client.get("/spectateurs/").status_code, 403)
+
+
+class RendererTests(SimpleTestCase):
+
+    def test_sortie_identique(self):
+        data = {
+            "titre": "Amélie \u2028 ligne", 2024: [1.5, None, True], "date": date(2001, 4, 25),
+            "updated_at": datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+            "heures": [datetime(2024, 1, 2, 3, 4, 5), time(20, 30, 0, 500)],
+            "note": Decimal("4.50"), "statut": gettext_lazy("Sorti"),
+            "results": [{"id": i, "nom": f"Auteur {i}", "note_moyenne": i / 3} for i in range(50)],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_notation_des_flottants(self):
+        # Seule différence assumée : notation des flottants très petits ou très grands, même valeur
+        content = ORJSONRenderer().render({"note": 1e-05})
+        self.assertIn(content, (b'{"note":1e-05}', b'{"note":0.00001}'))
+        self.assertEqual(json.loads(content), {"note": 1e-05})
@@ -1,14 +1,16 @@
 from django.contrib import admin, messages
-from django.db.models import Count,Avg
+from django.db.models import Count, Q
 from django.utils.translation import gettext_lazy as _
-from django.db.models.functions import ExtractYear
 
 from django.utils.html import format_html, format_html_join
 from django.urls import reverse
 
 from .models import (
-     AuteurProfile,Film,SpectateurProfile,NotationFilm,NotationAuteur
+     AuteurProfile,Film,SpectateurProfile,NotationFilm,NotationAuteur,TMDbSync,FacetteFilm,SOURCE_CHOICES
 )
+from .notations import refresh_notation_stats
+from .search import search
+from .autocomplete import matching_ids
 
 class AvoirFilmsFilter(admin.SimpleListFilter):
     title = _("a au moins un film")
@@ -25,24 +27,45 @@ class AvoirFilmsFilter(admin.SimpleListFilter):
             return qs.filter(film_count=0)
         return queryset
 
-class AnneDeSortiFilter(admin.SimpleListFilter):
-    title = _("année de sortie")
-    parameter_name = "release_year"
+class FacetteFilter(admin.SimpleListFilter):
+    """
+        Filtre dont les valeurs et les effectifs sont lus dans ``FacetteFilm``
+        (une requête sur la table des facettes, pas sur les films).
+    """
+    dimension = None
+    field = None
+    # Libellés des valeurs (``choices`` est une méthode de SimpleListFilter)
+    labels = ()
 
     def lookups(self, request, model_admin):
-        years = (
-            Film.objects.annotate(year=ExtractYear("date_sortie"))
-            .values_list("year", flat=True)
-            .distinct()
-            .order_by("-year")
-        )
-        return [(year, str(year)) for year in years if year is not None]
+        labels = dict(self.labels)
+        rows = (FacetteFilm.objects.filter(dimension=self.dimension, nb_films__gt=0).exclude(valeur="")
+                .order_by("-valeur").values_list("valeur", "nb_films"))
+        return [(valeur, f"{labels.get(valeur, valeur)} ({nb_films})") for valeur, nb_films in rows]
 
     def queryset(self, request, queryset):
         if self.value():
-            return queryset.filter(date_sortie__year=self.value())
+            return queryset.filter(**{self.field: self.value()})
         return queryset
 
+class AnneDeSortiFilter(FacetteFilter):
+    title = _("année de sortie")
+    parameter_name = "release_year"
+    dimension = "annee"
+    field = "date_sortie__year"
+
+class StatutFilter(FacetteFilter):
+    title = _("statut")
+    parameter_name = "statut__exact"
+    dimension = field = "statut"
+    labels = Film.STATUT_CHOICES
+
+class SourceFilter(FacetteFilter):
+    title = _("source")
+    parameter_name = "source__exact"
+    dimension = field = "source"
+    labels = SOURCE_CHOICES
+
 class EvaluationFilter(admin.SimpleListFilter):
     title = _("évaluation")
     parameter_name = "eval_cat"
@@ -60,18 +83,17 @@ class EvaluationFilter(admin.SimpleListFilter):
         v = self.value()
         if not v:
             return queryset
-        qs = queryset.annotate(_avg=Avg('notations__note'))
         if v == 'sans_note':
-            return qs.filter(_avg__isnull=True)
+            return queryset.filter(note_moyenne__isnull=True)
         if v == 'excellent':
-            return qs.filter(_avg__gte=4.5)
+            return queryset.filter(note_moyenne__gte=4.5)
         if v == 'bon':
-            return qs.filter(_avg__gte=3.5, _avg__lt=4.5)
+            return queryset.filter(note_moyenne__gte=3.5, note_moyenne__lt=4.5)
         if v == 'moyen':
-            return qs.filter(_avg__gte=2.5, _avg__lt=3.5)
+            return queryset.filter(note_moyenne__gte=2.5, note_moyenne__lt=3.5)
         if v == 'mauvais':
-            return qs.filter(_avg__lt=2.5)
-        return qs
+            return queryset.filter(note_moyenne__lt=2.5)
+        return queryset
 
 class FilmAuteurInline(admin.TabularInline):
     model = Film.auteurs.through
@@ -103,9 +125,21 @@ class FavoriAuteurInline(admin.TabularInline):
     extra = 0
     autocomplete_fields = ['auteurprofile']
 
+class PrefixAutocompleteAdminMixin:
+    """
+        Les champs ``autocomplete_fields`` qui pointent vers ce modèle interrogent
+        l'index de préfixes en mémoire (``movies/autocomplete.py``) au lieu d'``icontains``.
+    """
+    autocomplete_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term.strip() and request.path == reverse("admin:autocomplete"):
+            return queryset.filter(pk__in=matching_ids(self.autocomplete_index, search_term)), False
+        return super().get_search_results(request, queryset, search_term)
+
 @admin.register(AuteurProfile)
-class AuteurProfileAdmin(admin.ModelAdmin):
-    list_display = ('display_name', 'date_naissance', 'source', 'films_count',)
+class AuteurProfileAdmin(PrefixAutocompleteAdminMixin, admin.ModelAdmin):
+    list_display = ('display_name', 'date_naissance', 'source', 'films_count', 'note_moyenne', 'nb_notations')
     list_filter = ('source', AvoirFilmsFilter)
     search_fields = (
         'user__username', 'user__first_name', 'user__last_name', 'user__email',
@@ -113,6 +147,7 @@ class AuteurProfileAdmin(admin.ModelAdmin):
     )
 
     autocomplete_fields = ['user']
+    autocomplete_index = "auteurs"
 
     readonly_fields = ('films_list_display',)
     fieldsets = (
@@ -170,11 +205,19 @@ class AuteurProfileAdmin(admin.ModelAdmin):
             del actions['delete_selected']
         return actions
 
+    def save_formset(self, request, form, formset, change):
+        super().save_formset(request, form, formset, change)
+        if formset.model is NotationAuteur:
+            refresh_notation_stats(form.instance)
+
 @admin.register(Film)
-class FilmAdmin(admin.ModelAdmin):
+class FilmAdmin(PrefixAutocompleteAdminMixin, admin.ModelAdmin):
     list_display = ('titre', 'date_sortie', 'evaluation', 'statut', 'source', 'avg_note', 'auteurs_list')
-    list_filter = (AnneDeSortiFilter, EvaluationFilter, 'statut', 'source')
+    list_filter = (AnneDeSortiFilter, EvaluationFilter, StatutFilter, SourceFilter)
     search_fields = ('titre', 'description', 'auteurs__user__username', 'auteurs__user__first_name', 'auteurs__user__last_name')
+    # Couverts par l'index plein texte (movies/search.py), les autres champs par icontains
+    full_text_fields = ('titre', 'description')
+    autocomplete_index = "films"
     # Edition des auteurs directement dans la fiche du film
     filter_horizontal = ('auteurs',)
     inlines = [NotationFilmInline]
@@ -184,13 +227,26 @@ class FilmAdmin(admin.ModelAdmin):
         ("Aperçu", {'fields': ('auteurs_list_display', 'notations_list_display')}),
     )
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(_avg_note=Avg('notations__note'))
-
-    @admin.display(ordering='_avg_note', description="Note moyenne")
+    def get_search_results(self, request, queryset, search_term):
+        # Index plein texte (voir movies/search.py) plutôt que des icontains non indexés
+        # sur titre / description ; chaque mot peut aussi désigner un auteur
+        if not search_term.strip() or request.path == reverse("admin:autocomplete"):
+            return super().get_search_results(request, queryset, search_term)
+        par_auteur = Q()
+        for word in search_term.split():
+            par_auteur &= Q(*[Q(**{f"{field}__icontains": word}) for field in self.search_fields
+                              if field not in self.full_text_fields], _connector=Q.OR)
+        matches = Q(pk__in=search(queryset, search_term).values("pk")) | Q(pk__in=queryset.filter(par_auteur).values("pk"))
+        return queryset.filter(matches), False
+
+    @admin.display(ordering='note_moyenne', description="Note moyenne")
     def avg_note(self, obj):
-        return round(obj._avg_note, 2) if obj._avg_note is not None else "-"
+        return round(obj.note_moyenne, 2) if obj.note_moyenne is not None else "-"
+
+    def save_formset(self, request, form, formset, change):
+        super().save_formset(request, form, formset, change)
+        if formset.model is NotationFilm:
+            refresh_notation_stats(form.instance)
 
     @admin.display(description="Auteurs")
     def auteurs_list(self, obj):
@@ -289,16 +345,51 @@ class SpectateurProfileAdmin(admin.ModelAdmin):
         return format_html('<ul style="margin-left:1em;">{}</ul>',
                            format_html_join("", "<li>{}</li>", ((a,) for a in auteurs)))
 
+class NotationStatsAdminMixin:
+    """
+        Garde à jour les agrégats (note moyenne, histogramme) du film/auteur
+        noté lorsqu'une notation est modifiée depuis l'admin.
+    """
+    target_field = None
+
+    def _refresh(self, objs):
+        for target in {getattr(o, self.target_field) for o in objs}:
+            refresh_notation_stats(target)
+
+    def save_model(self, request, obj, form, change):
+        previous = None
+        if change and self.target_field in form.changed_data:
+            previous = form.initial.get(self.target_field)
+        super().save_model(request, obj, form, change)
+        self._refresh([obj])
+        if previous:
+            refresh_notation_stats(obj._meta.get_field(self.target_field).related_model.objects.get(pk=previous))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._refresh([obj])
+
+    def delete_queryset(self, request, queryset):
+        objs = list(queryset.select_related(self.target_field))
+        super().delete_queryset(request, queryset)
+        self._refresh(objs)
+
 @admin.register(NotationFilm)
-class NotationFilmAdmin(admin.ModelAdmin):
+class NotationFilmAdmin(NotationStatsAdminMixin, admin.ModelAdmin):
     list_display = ('spectateur', 'film', 'note', 'commentaire')
     list_filter = ('note',)
     search_fields = ('spectateur__user__username', 'film__titre', 'commentaire')
     autocomplete_fields = ['spectateur', 'film']
+    target_field = 'film'
 
 @admin.register(NotationAuteur)
-class NotationAuteurAdmin(admin.ModelAdmin):
+class NotationAuteurAdmin(NotationStatsAdminMixin, admin.ModelAdmin):
     list_display = ('spectateur', 'auteur', 'note', 'commentaire')
     list_filter = ('note',)
     search_fields = ('spectateur__user__username', 'auteur__user__username', 'commentaire')
     autocomplete_fields = ['spectateur', 'auteur']
+    target_field = 'auteur'
+
+@admin.register(TMDbSync)
+class TMDbSyncAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'date_synchro')
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movies'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import signals  # noqa: F401
+        from .search import ensure_sqlite_indexes
+        post_migrate.connect(ensure_sqlite_indexes, sender=self)
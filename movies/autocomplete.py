@@ -0,0 +1,175 @@
+"""
+Autocomplétion des titres de films et des noms d'auteurs (``GET /autocomplete/``
+et autocomplete de l'admin).
+
+Index de préfixes en mémoire : chaque mot (sans accents, en minuscules) des
+titres / noms est rangé dans une liste triée, une recherche est une dichotomie
+suivie d'un court parcours. L'index est construit au démarrage (``warm``) et
+reconstruit quand la version ``autocomplete`` du cache change (voir
+``movies/cache.py`` et ``movies/signals.py``) ou après ``AUTOCOMPLETE_MAX_AGE``.
+La reconstruction se fait dans un thread, à la première recherche qui la
+constate : l'index précédent reste servi en attendant, aucune requête (ni
+enregistrement) n'attend la construction, sauf la toute première.
+"""
+import logging
+import re
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connection
+
+from .cache import AUTOCOMPLETE, get_version
+from .models import AuteurProfile, Film
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Nombre maximal d'entrées parcourues pour un préfixe très court ("l", "le", ...)
+MAX_CANDIDATES = 2000
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def words(text: str) -> list[str]:
+    return re.findall(r"\w+", normalize(text))
+
+
+class PrefixIndex:
+    """
+        Index immuable : ``keys`` (mots triés) et ``ids`` (objet de chaque mot),
+        ``items`` : id -> (libellé normalisé, ses mots, popularité, données renvoyées).
+    """
+
+    def __init__(self, rows):
+        entries = []
+        self.items = {}
+        for pk, label, popularity, data in rows:
+            label_words = tuple(sys.intern(word) for word in words(label))
+            self.items[pk] = (" ".join(label_words), label_words, popularity, data)
+            entries.extend((word, pk) for word in set(label_words))
+        entries.sort()
+        self.keys = [word for word, _ in entries]
+        self.ids = [pk for _, pk in entries]
+
+    def __len__(self):
+        return len(self.items)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list:
+        terms = words(query)
+        if not terms:
+            return []
+        # Le terme au plus petit intervalle de préfixe est parcouru, les autres sont vérifiés sur le libellé
+        probe, start, end = min(
+            ((t, bisect_left(self.keys, t), bisect_left(self.keys, t + "\uffff")) for t in terms),
+            key=lambda r: r[2] - r[1],
+        )
+        candidates = set(self.ids[start:min(end, start + MAX_CANDIDATES)])
+
+        others = [t for t in terms if t != probe]
+        normalized_query = " ".join(terms)
+        matches = []
+        for pk in candidates:
+            label, label_words, popularity, data = self.items[pk]
+            if all(any(w.startswith(t) for w in label_words) for t in others):
+                # Libellé identique, puis commençant par la saisie, puis les plus notés, puis les plus courts
+                matches.append((label != normalized_query, not label.startswith(normalized_query),
+                                -popularity, len(label), pk, data))
+        matches.sort(key=lambda m: m[:5])
+        return [m[5] for m in matches[:limit]]
+
+
+def film_rows():
+    for film in Film.objects.values("id", "titre", "date_sortie", "nb_notations").iterator(chunk_size=5000):
+        yield film["id"], film["titre"], film["nb_notations"], {
+            "id": film["id"], "titre": film["titre"],
+            "annee": film["date_sortie"].year if film["date_sortie"] else None,
+        }
+
+
+def auteur_rows():
+    rows = AuteurProfile.objects.values("id", "nom", "user__username", "nb_notations").iterator(chunk_size=5000)
+    for auteur in rows:
+        nom = auteur["nom"] or auteur["user__username"] or ""
+        yield auteur["id"], nom, auteur["nb_notations"], {"id": auteur["id"], "nom": nom}
+
+
+SOURCES = {
+    "films": film_rows,
+    "auteurs": auteur_rows,
+}
+
+logger = logging.getLogger(__name__)
+
+_indexes = {}
+_built = {}
+_rebuilding = set()
+_lock = threading.Lock()
+
+
+def _is_stale(name: str, version) -> bool:
+    built = _built.get(name)
+    max_age = getattr(settings, "AUTOCOMPLETE_MAX_AGE", 3600)
+    return built is None or built[0] != version or time.monotonic() - built[1] > max_age
+
+
+def rebuild(name: str, version) -> None:
+    try:
+        index = PrefixIndex(SOURCES[name]())
+        _indexes[name] = index
+        _built[name] = (version, time.monotonic())
+    finally:
+        _rebuilding.discard(name)
+
+
+def _rebuild_thread(name: str, version) -> None:
+    try:
+        rebuild(name, version)
+    except Exception:
+        logger.exception("Reconstruction de l'index d'autocomplétion %s impossible", name)
+    finally:
+        # Connexion propre à ce thread
+        connection.close()
+
+
+def rebuild_later(name: str, version) -> None:
+    threading.Thread(target=_rebuild_thread, args=(name, version), name=f"autocomplete-{name}", daemon=True).start()
+
+
+def get_index(name: str) -> PrefixIndex:
+    """
+        Index courant. S'il est périmé (version du cache changée ou trop ancien),
+        une seule reconstruction est lancée en arrière-plan et l'index actuel est renvoyé.
+    """
+    version, _ = get_version(AUTOCOMPLETE)
+    if name not in _indexes:
+        with _lock:
+            if name not in _indexes:
+                _rebuilding.add(name)
+                rebuild(name, version)
+    elif _is_stale(name, version) and name not in _rebuilding:
+        with _lock:
+            if name in _rebuilding:
+                return _indexes[name]
+            _rebuilding.add(name)
+        rebuild_later(name, version)
+    return _indexes[name]
+
+
+def warm() -> None:
+    for name in SOURCES:
+        get_index(name)
+
+
+def autocomplete(query: str, limit: int = DEFAULT_LIMIT, types=SOURCES) -> dict:
+    limit = max(1, min(limit, MAX_LIMIT))
+    return {name: get_index(name).search(query, limit) for name in types}
+
+
+def matching_ids(name: str, query: str, limit: int = MAX_LIMIT) -> list:
+    return [data["id"] for data in get_index(name).search(query, limit)]
@@ -0,0 +1,189 @@
+"""
+Cache des réponses publiques ``GET /films/`` et ``GET /auteurs/``.
+
+Chaque portée (``films``, ``auteurs``) a un numéro de version inclus dans les
+clés de cache : toute modification incrémente la version (après le commit),
+les anciennes entrées ne sont plus jamais lues et expirent d'elles-mêmes.
+
+Les agrégats des notations affichés dans les listes ont leur propre portée
+(``films_notations``, ``auteurs_notations``) : une nouvelle note n'invalide pas
+la liste entière à chaque fois, elle y apparaît au plus tard après
+``NOTATIONS_CACHE_DELAY`` secondes (``get_published_version``).
+
+Les fiches détaillées (``retrieve``) sont versionnées par la colonne
+``updated_at`` de l'objet et de ses objets liés (auteurs d'un film, films
+d'un auteur) : un ``304`` ne coûte qu'une requête indexée, sans sérialisation.
+"""
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+FILMS = "films"
+AUTEURS = "auteurs"
+FILMS_NOTATIONS = "films_notations"
+AUTEURS_NOTATIONS = "auteurs_notations"
+# Titres et noms seulement (index d'autocomplétion), pas les notations
+AUTOCOMPLETE = "autocomplete"
+
+
+def _version_key(scope):
+    return f"api:{scope}:version"
+
+
+def _modified_key(scope):
+    return f"api:{scope}:modified"
+
+
+def _initial_version() -> int:
+    # Horodatage plutôt que 1 : après un vidage du cache, les versions ne
+    # retombent pas sur une valeur déjà vue par un processus (index en mémoire)
+    return time.time_ns() // 1000
+
+
+def get_version(scope: str) -> tuple[int, float]:
+    """
+        (version, date de dernière modification) de la portée.
+    """
+    values = cache.get_many([_version_key(scope), _modified_key(scope)])
+    if len(values) < 2:
+        cache.add(_version_key(scope), _initial_version(), None)
+        cache.add(_modified_key(scope), time.time(), None)
+        values = cache.get_many([_version_key(scope), _modified_key(scope)])
+    return values.get(_version_key(scope), 1), values.get(_modified_key(scope), time.time())
+
+
+def get_published_version(scope: str) -> tuple[int, float]:
+    """
+        Comme ``get_version``, mais un changement n'est publié que si le précédent
+        l'a été il y a plus de ``NOTATIONS_CACHE_DELAY`` secondes : une rafale de
+        modifications ne reconstruit les réponses en cache qu'une fois par délai.
+    """
+    version, modified = get_version(scope)
+    key = f"api:{scope}:published"
+    published = cache.get(key)
+    delay = getattr(settings, "NOTATIONS_CACHE_DELAY", 60)
+    if published is None or (published[0] != version and time.time() - published[2] >= delay):
+        published = (version, modified, time.time())
+        cache.set(key, published, None)
+    return published[0], published[1]
+
+
+def bump(*scopes: str) -> None:
+    now = time.time()
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.add(_version_key(scope), _initial_version(), None)
+        cache.set(_modified_key(scope), now, None)
+
+
+def invalidate(*scopes: str) -> None:
+    """
+        Invalide les portées une fois la transaction courante validée, pour
+        qu'aucune lecture concurrente ne remette en cache l'état précédent.
+    """
+    transaction.on_commit(partial(bump, *scopes))
+
+
+def is_not_modified(request, etag: str, modified: float) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return "*" in etags or etag in etags or etag.removeprefix("W/") in etags
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    return if_modified_since is not None and int(modified) <= if_modified_since
+
+
+class CachedListMixin:
+    """
+        Sert l'action ``list`` depuis le cache Django (clé : portée, version, URL complète)
+        et répond ``304`` aux requêtes conditionnelles (``ETag`` / ``Last-Modified``).
+        ``notations_scope`` : portée des agrégats de notation, publiée avec retard.
+    """
+    cache_scope = None
+    notations_scope = None
+
+    def list(self, request, *args, **kwargs):
+        version, modified = get_version(self.cache_scope)
+        if self.notations_scope:
+            notations_version, notations_modified = get_published_version(self.notations_scope)
+            version, modified = f"{version}.{notations_version}", max(modified, notations_modified)
+        url_hash = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+        etag = quote_etag(f"{self.cache_scope}-{version}-{url_hash[:16]}")
+
+        if is_not_modified(request, etag, modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = f"api:{self.cache_scope}:{version}:{url_hash}"
+            data = cache.get(key)
+            if data is None:
+                response = super().list(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, getattr(settings, "API_CACHE_TIMEOUT", 300))
+            else:
+                response = Response(data)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(modified)
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+class ConditionalRetrieveMixin:
+    """
+        ``retrieve`` avec ``ETag`` / ``Last-Modified`` calculés à partir de
+        ``updated_at`` (l'objet et ses objets liés par ``conditional_related``).
+    """
+    conditional_related = None
+
+    def get_last_modified(self, pk):
+        last_modified = F("updated_at")
+        if self.conditional_related:
+            related = Max(f"{self.conditional_related}__updated_at")
+            last_modified = Greatest(last_modified, Coalesce(related, last_modified))
+        try:
+            return (self.get_queryset().model.objects.filter(pk=pk)
+                    .annotate(last_modified=last_modified)
+                    .values_list("last_modified", flat=True)
+                    .first())
+        except (TypeError, ValueError):
+            return None
+
+    def get_representation_hash(self) -> str:
+        """
+            Empreinte de ``?fields=`` / ``?expand=`` normalisés (ordre, espaces, doublons) :
+            chaque représentation de la fiche a son propre ``ETag``.
+        """
+        fields = sorted(self.get_fields() or ()) if hasattr(self, "get_fields") else []
+        expand = sorted(self.get_expand()) if hasattr(self, "get_expand") else []
+        params = f"{','.join(fields)}|{','.join(expand)}"
+        return hashlib.sha1(params.encode()).hexdigest()[:16]
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        last_modified = self.get_last_modified(pk)
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        modified = last_modified.timestamp()
+        etag = quote_etag(f"{self.basename}-{pk}-{int(modified * 1e6)}-{self.get_representation_hash()}")
+        if is_not_modified(request, etag, modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().retrieve(request, *args, **kwargs)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
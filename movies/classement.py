@@ -0,0 +1,93 @@
+"""
+Classement des films par moyenne bayésienne (formule IMDb) :
+
+    score = v / (v + m) * R + m / (v + m) * C
+
+R : note moyenne du film, v : nombre de notations,
+C : moyenne de toutes les notations, m : nombre minimal de votes
+(``CLASSEMENT_VOTES_MIN``). Les scores sont stockés dans ``ClassementFilm``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Film, ClassementFilm
+
+MOYENNE_GLOBALE_KEY = "classement:moyenne_globale"
+MOYENNE_GLOBALE_TIMEOUT = 3600
+
+
+def votes_min() -> int:
+    return getattr(settings, "CLASSEMENT_VOTES_MIN", 10)
+
+
+def compute_moyenne_globale() -> float:
+    # Somme des notes reconstituée depuis les agrégats de Film : pas de scan de NotationFilm
+    row = Film.objects.filter(nb_notations__gt=0).aggregate(
+        total=Sum(F("note_moyenne") * F("nb_notations")), votes=Sum("nb_notations"),
+    )
+    return row["total"] / row["votes"] if row["votes"] else 0.0
+
+
+def moyenne_globale() -> float:
+    return cache.get_or_set(MOYENNE_GLOBALE_KEY, compute_moyenne_globale, MOYENNE_GLOBALE_TIMEOUT)
+
+
+def bayesian_score(moyenne: float, votes: int, C: float, m: int) -> float:
+    return (votes * moyenne + m * C) / (votes + m)
+
+
+def refresh_film_score(film_id) -> None:
+    """
+        Mise à jour incrémentale du score d'un film après une nouvelle notation.
+    """
+    refresh_film_scores([film_id])
+
+
+def refresh_film_scores(film_ids) -> None:
+    """
+        Idem pour plusieurs films : une lecture et un upsert pour tout le lot.
+    """
+    rows = Film.objects.filter(pk__in=film_ids).values_list("id", "note_moyenne", "nb_notations")
+    C, m = None, votes_min()
+    objs, sans_notes = [], []
+    for film_id, moyenne, votes in rows:
+        if not votes:
+            sans_notes.append(film_id)
+            continue
+        if C is None:
+            C = moyenne_globale()
+        objs.append(ClassementFilm(film_id=film_id, score=bayesian_score(moyenne, votes, C, m)))
+    if sans_notes:
+        ClassementFilm.objects.filter(film_id__in=sans_notes).delete()
+    _upsert(objs)
+
+
+@transaction.atomic
+def rebuild_classement(batch_size: int = 1000) -> int:
+    """
+        Recalcule tous les scores (à lancer périodiquement : la moyenne globale C dérive).
+    """
+    C = compute_moyenne_globale()
+    cache.set(MOYENNE_GLOBALE_KEY, C, MOYENNE_GLOBALE_TIMEOUT)
+    m = votes_min()
+
+    ClassementFilm.objects.filter(film__nb_notations=0).delete()
+    rows = Film.objects.filter(nb_notations__gt=0).values_list("id", "note_moyenne", "nb_notations")
+    count = 0
+    objs = []
+    for film_id, moyenne, votes in rows.iterator(chunk_size=batch_size):
+        objs.append(ClassementFilm(film_id=film_id, score=bayesian_score(moyenne, votes, C, m)))
+        if len(objs) >= batch_size:
+            count += _upsert(objs)
+            objs = []
+    return count + _upsert(objs)
+
+
+def _upsert(objs) -> int:
+    if not objs:
+        return 0
+    ClassementFilm.objects.bulk_create(objs, update_conflicts=True, unique_fields=["film"],
+                                       update_fields=["score"])
+    return len(objs)
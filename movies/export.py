@@ -0,0 +1,182 @@
+"""
+Export du catalogue (films, auteurs, liens film/auteur, notations) en NDJSON,
+CSV ou Parquet : ``python manage.py export_catalog`` et ``GET /export/<table>.<format>``.
+
+Les lignes sont lues par ``values_list().iterator(chunk_size=...)`` (curseur
+serveur sous PostgreSQL) et écrites lot par lot : la mémoire ne dépend que de
+la taille d'un lot. Export incrémental (``since``) : films et auteurs modifiés
+depuis la date, avec tous leurs liens et toutes leurs notations (``updated_at``
+est mis à jour par les notations et les changements de filmographie) ;
+les suppressions ne sont pas exportées.
+"""
+import csv
+import io
+from dataclasses import dataclass
+from itertools import islice
+
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.renderers import dumps
+from .models import AuteurProfile, Film, NotationAuteur, NotationFilm
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    model: type
+    columns: tuple  # (nom de colonne, lookup)
+    since: str      # champ updated_at qui date la ligne
+
+    def queryset(self, since=None):
+        queryset = self.model.objects.all()
+        if since is not None:
+            queryset = queryset.filter(**{f"{self.since}__gte": since})
+        return queryset.order_by("pk").values_list(*(lookup for _, lookup in self.columns))
+
+    def field(self, lookup):
+        model, *path = self.model, *lookup.split("__")
+        for name in path[:-1]:
+            model = model._meta.get_field(name).related_model
+        return model._meta.get_field(path[-1])
+
+
+TABLES = {
+    "films": ExportTable(Film, (
+        ("id", "id"), ("tmdb_id", "tmdb_id"), ("titre", "titre"), ("description", "description"),
+        ("date_sortie", "date_sortie"), ("statut", "statut"), ("evaluation", "evaluation"),
+        ("source", "source"), ("note_moyenne", "note_moyenne"), ("nb_notations", "nb_notations"),
+        ("updated_at", "updated_at"),
+    ), "updated_at"),
+    "auteurs": ExportTable(AuteurProfile, (
+        ("id", "id"), ("tmdb_id", "tmdb_id"), ("nom", "nom"), ("user_id", "user_id"),
+        ("date_naissance", "date_naissance"), ("source", "source"), ("note_moyenne", "note_moyenne"),
+        ("nb_notations", "nb_notations"), ("updated_at", "updated_at"),
+    ), "updated_at"),
+    "film_auteurs": ExportTable(Film.auteurs.through, (
+        ("film_id", "film_id"), ("auteur_id", "auteurprofile_id"),
+    ), "film__updated_at"),
+    "notations_films": ExportTable(NotationFilm, (
+        ("id", "id"), ("spectateur_id", "spectateur_id"), ("film_id", "film_id"),
+        ("note", "note"), ("commentaire", "commentaire"),
+    ), "film__updated_at"),
+    "notations_auteurs": ExportTable(NotationAuteur, (
+        ("id", "id"), ("spectateur_id", "spectateur_id"), ("auteur_id", "auteur_id"),
+        ("note", "note"), ("commentaire", "commentaire"),
+    ), "auteur__updated_at"),
+}
+
+
+def batches(table: ExportTable, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = table.queryset(since).iterator(chunk_size=chunk_size)
+    while batch := list(islice(rows, chunk_size)):
+        yield batch
+
+
+def iter_ndjson(table, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    names = [name for name, _ in table.columns]
+    for batch in batches(table, since, chunk_size):
+        yield b"".join(dumps(dict(zip(names, row))) + b"\n" for row in batch)
+
+
+def iter_csv(table, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(name for name, _ in table.columns)
+    for batch in batches(table, since, chunk_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def arrow_type(field):
+    if isinstance(field, models.ForeignKey):
+        field = field.target_field
+    if isinstance(field, models.DateTimeField):
+        return pyarrow.timestamp("us", tz="UTC")
+    if isinstance(field, models.DateField):
+        return pyarrow.date32()
+    if isinstance(field, models.FloatField):
+        return pyarrow.float64()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pyarrow.int64()
+    return pyarrow.string()
+
+
+class _Sink(io.RawIOBase):
+    """
+        Fichier en écriture seule dont le contenu est vidé après chaque groupe de lignes.
+    """
+
+    def __init__(self):
+        self.chunks, self.position = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def iter_parquet(table, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    if pyarrow is None:
+        raise ImportError("L'export Parquet nécessite pyarrow (pip install pyarrow).")
+    schema = pyarrow.schema([(name, arrow_type(table.field(lookup))) for name, lookup in table.columns])
+    sink = _Sink()
+    # Un groupe de lignes Parquet par lot
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for batch in batches(table, since, chunk_size):
+            writer.write_table(pyarrow.Table.from_pylist(
+                [dict(zip(schema.names, row)) for row in batch], schema=schema,
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "parquet": (iter_parquet, "application/vnd.apache.parquet"),
+}
+
+
+def export(name: str, fmt: str, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Contenu de la table ``name`` au format ``fmt``, en morceaux d'octets.
+    """
+    writer, _ = FORMATS[fmt]
+    return writer(TABLES[name], since, chunk_size)
+
+
+def parse_since(value: str):
+    """
+        Date ``since`` (ISO 8601, date seule acceptée), rendue « aware » ;
+        ``None`` si elle est mal formée ou impossible (``2024-13-45``).
+    """
+    try:
+        since = parse_datetime(value) or parse_datetime(f"{value}T00:00:00")
+    except ValueError:
+        return None
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
@@ -0,0 +1,95 @@
+"""
+Facettes des films : nombre de films par année de sortie, statut, source et
+évaluation (``FacetteFilm``), lues par ``/films/facets/`` et les filtres de l'admin.
+
+Mises à jour par différence à chaque écriture (signaux de ``Film``, lots de
+``import_tmdb``) ; ``rebuild_facettes`` recalcule tout en un GROUP BY par dimension.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import ExtractYear
+
+from .models import Film, FacetteFilm
+
+FACETTE_FIELDS = ("date_sortie", "statut", "source", "evaluation")
+
+
+def facettes(values: dict) -> list:
+    """
+        (dimension, valeur) d'un film, à partir de ses champs ``FACETTE_FIELDS``.
+    """
+    # date ou chaîne ISO (lots de import_tmdb)
+    date_sortie = values.get("date_sortie")
+    return [
+        ("annee", str(date_sortie)[:4] if date_sortie else ""),
+        ("statut", values.get("statut") or ""),
+        ("source", values.get("source") or ""),
+        ("evaluation", values.get("evaluation") or ""),
+    ]
+
+
+def film_values(film) -> dict:
+    return {field: getattr(film, field) for field in FACETTE_FIELDS}
+
+
+def diff(old: dict | None, new: dict | None) -> Counter:
+    """
+        Variation des compteurs quand un film passe de ``old`` à ``new`` (``None`` : absent).
+    """
+    deltas = Counter()
+    for key in facettes(old) if old else []:
+        deltas[key] -= 1
+    for key in facettes(new) if new else []:
+        deltas[key] += 1
+    return deltas
+
+
+def apply_deltas(deltas: Counter) -> None:
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        for (dimension, valeur), delta in deltas.items():
+            updated = (FacetteFilm.objects.filter(dimension=dimension, valeur=valeur)
+                       .update(nb_films=F("nb_films") + delta))
+            if not updated:
+                # Première occurrence de la valeur (ignore_conflicts : création concurrente)
+                FacetteFilm.objects.bulk_create(
+                    [FacetteFilm(dimension=dimension, valeur=valeur)], ignore_conflicts=True
+                )
+                FacetteFilm.objects.filter(dimension=dimension, valeur=valeur).update(
+                    nb_films=F("nb_films") + delta
+                )
+
+
+def get_facettes() -> dict:
+    """
+        {dimension: {valeur: nb_films}} ; années les plus récentes d'abord.
+    """
+    result = {dimension: {} for dimension, _ in FacetteFilm.DIMENSION_CHOICES}
+    rows = (FacetteFilm.objects.filter(nb_films__gt=0)
+            .order_by("dimension", "-valeur")
+            .values_list("dimension", "valeur", "nb_films"))
+    for dimension, valeur, nb_films in rows:
+        result[dimension][valeur] = nb_films
+    return result
+
+
+@transaction.atomic
+def rebuild_facettes() -> int:
+    groups = {
+        "annee": Film.objects.annotate(valeur=ExtractYear("date_sortie")),
+        "statut": Film.objects.annotate(valeur=F("statut")),
+        "source": Film.objects.annotate(valeur=F("source")),
+        "evaluation": Film.objects.annotate(valeur=F("evaluation")),
+    }
+    objs = []
+    for dimension, qs in groups.items():
+        for row in qs.values("valeur").annotate(nb_films=Count("id")).order_by():
+            valeur = "" if row["valeur"] is None else str(row["valeur"])
+            objs.append(FacetteFilm(dimension=dimension, valeur=valeur, nb_films=row["nb_films"]))
+    FacetteFilm.objects.all().delete()
+    FacetteFilm.objects.bulk_create(objs)
+    return len(objs)
@@ -0,0 +1,92 @@
+import datetime
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models.functions import ExtractYear
+
+from movies.models import AuteurProfile, Film, NotationFilm, SpectateurProfile
+from movies.paginations import KeysetPagination
+from movies.views import FilmViewSet
+
+# Lignes de plan signalant un parcours complet de table
+SEQ_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)\s*$", re.MULTILINE),
+}
+
+# Lignes de plan d'une recherche dans un index (et non d'un parcours depuis son début)
+INDEX_SEEK = {
+    "postgresql": re.compile(r"Index Cond"),
+    "sqlite": re.compile(r"\bSEARCH \w+ USING (?:COVERING )?INDEX"),
+}
+
+# Requêtes qui doivent se positionner dans l'index : un parcours ordonné de tout l'index
+# (SQLite ``SCAN ... USING INDEX``) coûte autant qu'un parcours complet
+SEEK_REQUIRED = {"films par curseur"}
+
+
+def hot_queries():
+    """
+        Requêtes des routes et écrans les plus sollicités, avec des paramètres
+        représentatifs lus dans la base.
+    """
+    film = Film.objects.order_by("id").values("id", "date_sortie", "tmdb_id").first() or {}
+    date_sortie = film.get("date_sortie")
+    year = date_sortie.year if date_sortie else 2000
+    spectateur_id = SpectateurProfile.objects.values_list("id", flat=True).first() or 0
+
+    yield "films ?anne_sortie=", Film.objects.filter(date_sortie__year=year)[:20]
+    # Requête de la page suivante telle que l'envoie KeysetPagination (films : tri date_sortie, id)
+    paginator = KeysetPagination()
+    paginator.ordering = FilmViewSet.keyset_ordering
+    position = [date_sortie or datetime.date(2000, 1, 1), film.get("id", 0)]
+    yield "films par curseur", Film.objects.filter(paginator.after(position)).order_by(*paginator.ordering)[:20]
+    yield "films année (ExtractYear)", (Film.objects.annotate(annee=ExtractYear("date_sortie"))
+                                        .filter(annee=year)[:20])
+    yield "films /top/", Film.objects.filter(classement__isnull=False).order_by("-classement__score", "id")[:20]
+    yield "films par statut (admin)", Film.objects.filter(statut="sorti").order_by("-date_sortie")[:100]
+    yield "films par source (admin)", Film.objects.filter(source="tmdb").order_by("-date_sortie")[:100]
+    yield "films par évaluation (admin)", Film.objects.filter(note_moyenne__gte=4.5)[:100]
+    yield "films par tmdb_id (import)", Film.objects.filter(tmdb_id__in=[film.get("tmdb_id") or 0])
+    yield "auteurs par source (admin)", AuteurProfile.objects.filter(source="tmdb")[:100]
+    yield "notations d'un film", NotationFilm.objects.filter(film_id=film.get("id", 0))
+    yield "favoris d'un spectateur", Film.objects.filter(favoris_spectateurs=spectateur_id)
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN des requêtes les plus fréquentes ; signale les parcours complets de table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Affiche les plans complets")
+        parser.add_argument("--fail", action="store_true",
+                            help="Code de sortie non nul si un parcours complet est détecté (CI)")
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"Base non prise en charge : {connection.vendor}")
+
+        flagged = []
+        for label, queryset in hot_queries():
+            plan = queryset.explain()
+            scans = sorted(set(pattern.findall(plan)) - {""})
+            if label in SEEK_REQUIRED and not INDEX_SEEK[connection.vendor].search(plan):
+                scans.append(f"{queryset.model._meta.db_table} (index parcouru depuis le début)")
+            if scans:
+                flagged.append(label)
+                self.stdout.write(self.style.WARNING(f"SCAN  {label} : parcours complet de {', '.join(scans)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK    {label}"))
+            if options["verbose_plans"] or scans:
+                for line in plan.splitlines():
+                    self.stdout.write(f"        {line}")
+
+        if flagged:
+            message = (f"{len(flagged)} requête(s) avec parcours complet "
+                       f"(normal sur une petite table : le planificateur préfère alors le parcours)")
+            if options["fail"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("Aucun parcours complet détecté"))
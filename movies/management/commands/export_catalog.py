@@ -0,0 +1,60 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from movies.export import DEFAULT_CHUNK_SIZE, FORMATS, TABLES, export, parse_since
+
+STATE_FILE = "export_state.json"
+
+
+class Command(BaseCommand):
+    help = "Export du catalogue (films, auteurs, liens, notations) en NDJSON, CSV ou Parquet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Dossier de destination (un fichier par table).")
+        parser.add_argument("--format", dest="fmt", choices=FORMATS, default="ndjson")
+        parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES),
+                            help="Tables à exporter (défaut : toutes).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Nombre de lignes lues par aller-retour avec la base.")
+        parser.add_argument("--since",
+                            help="Export incrémental : lignes modifiées depuis cette date (ISO 8601).")
+        parser.add_argument("--incremental", action="store_true",
+                            help=f"Reprend depuis le dernier export réussi ({STATE_FILE} du dossier).")
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        state_path = output_dir / STATE_FILE
+
+        since = None
+        if options["since"]:
+            since = parse_since(options["since"])
+            if since is None:
+                raise CommandError(f"Date invalide : {options['since']}")
+        elif options["incremental"] and state_path.exists():
+            since = parse_datetime(json.loads(state_path.read_text())["started"])
+
+        # Date relevée avant la lecture : les écritures concurrentes seront reprises au prochain export
+        started = timezone.now()
+        fmt = options["fmt"]
+        for name in options["tables"]:
+            path = output_dir / f"{name}.{fmt}"
+            start = time.perf_counter()
+            try:
+                with open(path, "wb") as f:
+                    for chunk in export(name, fmt, since, options["chunk_size"]):
+                        f.write(chunk)
+            except ImportError as exc:
+                path.unlink(missing_ok=True)
+                raise CommandError(str(exc))
+            self.stdout.write(f"{name} -> {path} ({path.stat().st_size} octets, "
+                              f"{time.perf_counter() - start:.1f} s)")
+
+        state_path.write_text(json.dumps({"started": started.isoformat(), "since": since and since.isoformat()}))
+        label = f"depuis {since:%Y-%m-%d %H:%M}" if since else "complet"
+        self.stdout.write(self.style.SUCCESS(f"Export {label} terminé : {output_dir}"))
@@ -1,89 +1,243 @@
 import os
-import time
-import requests
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from movies.models import Film,AuteurProfile
-API_BASE = "https://api.themoviedb.org/3"
-from dateutil import parser
-
-from datetime import datetime
-
-def to_iso_date(date_str: str) -> str | None:
-    """
-        Convert a date string to YYYY-MM-DD format.
-        Return None if parsing is not possible.
-    """
-    if not date_str or not isinstance(date_str, str):
-        return None
-    try:
-        dt = parser.parse(date_str, dayfirst=False, yearfirst=False)
-        return dt.strftime("%Y-%m-%d")
-    except (ValueError, OverflowError):
-        return None
+from django.utils import timezone
+from movies.models import Film, AuteurProfile, TMDbSync
+from movies.tmdb.cache import SQLiteCache, DAY, DEFAULT_TTL, DEFAULT_MAX_SIZE
+from movies.tmdb.client import TMDbClient, API_BASE, DEFAULT_RATE, DEFAULT_WORKERS
+from movies.tmdb.checkpoint import ImportCheckpoint
+from movies.tmdb.dumps import read_dump, filter_rows, batched
+from movies.tmdb.writer import BulkWriter, DEFAULT_BATCH_SIZE
+
+SYNC_NAME = "tmdb"
+LOOKUP_CHUNK = 1000
+
+
 class Command(BaseCommand):
     help = "Export des Film depuis api TMDB "
 
+    def add_arguments(self, parser):
+        parser.add_argument("--api-base", default=os.getenv("TMDB_API_BASE", API_BASE),
+                            help="URL de l'API TMDb (ex. serveur TMDb local des benchmarks).")
+        parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                            help="Nombre de requêtes TMDb exécutées en parallèle.")
+        parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                            help="Nombre maximal de requêtes TMDb par seconde.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Nombre de films écrits en base par transaction.")
+        parser.add_argument("--checkpoint", default=str(settings.BASE_DIR / "tmdb_checkpoint.json"),
+                            help="Fichier de reprise (dernière page importée).")
+        parser.add_argument("--restart", action="store_true",
+                            help="Ignore le point de reprise et repart de la page 1.")
+        parser.add_argument("--cache", default=str(settings.BASE_DIR / "tmdb_cache.sqlite3"),
+                            help="Fichier SQLite de cache des réponses TMDb.")
+        parser.add_argument("--no-cache", action="store_true",
+                            help="Désactive le cache des réponses TMDb.")
+        parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL / DAY,
+                            help="Durée (jours) avant revalidation d'une réponse en cache.")
+        parser.add_argument("--cache-max-size", type=int, default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                            help="Taille maximale du cache (Mo), les entrées les moins utilisées sont évincées.")
+        parser.add_argument("--offline", action="store_true",
+                            help="Rejoue un import à partir du cache uniquement, sans accès réseau.")
+        parser.add_argument("--dump",
+                            help="Export quotidien TMDb (movie_ids_*.json.gz) à importer "
+                                 "à la place de /discover/movie.")
+        parser.add_argument("--min-popularity", type=float, default=0,
+                            help="Ignore les films de l'export sous cette popularité.")
+        parser.add_argument("--changes", action="store_true",
+                            help="Import incrémental : ne met à jour que les films et auteurs "
+                                 "modifiés sur TMDb depuis le dernier import réussi.")
+        parser.add_argument("--since", type=date.fromisoformat,
+                            help="Date de départ (YYYY-MM-DD) de l'import incrémental.")
+        parser.add_argument("--match-legacy", action="store_true",
+                            help="Étape unique : retrouve sur TMDb (titre et date de sortie) les films "
+                                 "importés avant l'ajout de tmdb_id, puis leurs auteurs.")
+
     def handle(self, *args, **options):
         # Récupération du token
         token = os.getenv("TMDB_BEARER_TOKEN")
-        if not token:
+        if not token and not options["offline"]:
             raise CommandError("veuillez definir la variable TMDB_BEARER_TOKEN   d'environnement dans le fichier .env")
+        if options["offline"] and options["no_cache"]:
+            raise CommandError("--offline nécessite le cache des réponses.")
+
+        cache = None
+        if not options["no_cache"]:
+            cache = SQLiteCache(options["cache"], max_size=options["cache_max_size"] * 1024 * 1024)
+
+        started = timezone.now()
+        workers = max(1, options["workers"])
+        self.client = TMDbClient(token or "", rate=options["rate"], pool_size=workers, cache=cache,
+                                 cache_ttl=int(options["cache_ttl"] * DAY), offline=options["offline"],
+                                 api_base=options["api_base"])
+        self.writer = BulkWriter(batch_size=options["batch_size"])
+        self.people = {}
+        # Identifiants absents de TMDb (404), par type
+        self.gone = defaultdict(set)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            self.pool = pool
+            if options["match_legacy"]:
+                self.match_legacy()
+            elif options["changes"]:
+                self.import_changes(options["since"])
+            else:
+                source = f"dump:{options['dump']}" if options["dump"] else "discover"
+                checkpoint = ImportCheckpoint(options["checkpoint"], source=source)
+                if options["restart"]:
+                    checkpoint.clear()
+                if options["dump"]:
+                    self.import_dump(options["dump"], checkpoint, options["min_popularity"])
+                else:
+                    self.import_discover(checkpoint, workers)
+                checkpoint.clear()
+
+        if not options["offline"] and not options["match_legacy"]:
+            TMDbSync.objects.update_or_create(nom=SYNC_NAME, defaults={"date_synchro": started})
+        if self.writer.skipped:
+            self.stdout.write(f"{self.writer.skipped} film(s) ignorés (sans date de sortie)")
+        for kind, ids in self.gone.items():
+            self.stdout.write(f"{len(ids)} {kind}(s) introuvable(s) sur TMDb (supprimés)")
+        self.stdout.write(self.style.SUCCESS("Import TMDb terminé"))
+
+    def add_movies(self, movies):
+        """
+            Récupère en parallèle les scénaristes des films puis les place dans le tampon d'écriture.
+        """
+        credits = {m["id"]: self.pool.submit(self.client.credits, m["id"]) for m in movies}
+        for m in movies:
+            authors = [c for c in (credits[m["id"]].result() or {}).get("crew", [])
+                       if c.get("department") == "Writing"]
+            for a in authors:
+                if a.get("id") not in self.people:
+                    self.people[a.get("id")] = self.pool.submit(self.client.person, a.get("id"))
+            self.writer.add(m, [(a, self.person(a)) for a in authors])
 
-        headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
-        session = requests.Session()
-        session.headers.update(headers)
-
-
-        url = f"{API_BASE}/discover/movie"
-        resp = session.get(url, params={"language": "fr-FR", "page": 1})
-        resp.raise_for_status()
-        total_pages = resp.json().get("total_pages")
-
-        for page in range(1, total_pages + 1):
-            resp = session.get(url, params={"language": "fr-FR", "page": str(page)})
-            resp.raise_for_status()
-
-            movies = resp.json().get("results", [])
-
-            for m in movies:
-
-                movie_id = m.get("id")
-                title = m.get("title")
-                release_date = m.get("release_date") or "n/a"
-                description = m.get("overview") or "n/a"
-
-                print(f"filme : {title} date : {release_date} , description : {description}")
-                cred_url = f"{API_BASE}/movie/{movie_id}/credits"
-                cred_resp = session.get(cred_url)
-                cred_resp.raise_for_status()
-                credits = cred_resp.json()
-
-
-                authors = [c for c in credits.get("crew", []) if c.get("department") == "Writing"]
-                film_data = {
-                    'titre':title,
-                    'description':description,
-                    'date_sortie':release_date,
-                    'source':'tmdb',
-                }
-                OFilm ,_= Film.objects.get_or_create(**film_data)
-                if authors:
-                    for a in authors:
-                        persone_url = f"{API_BASE}/person/{movie_id}"
-                        auteur_deail = session.get(persone_url)
-                        date_naissance = auteur_deail.json().get("birthday")
-                        date_naissance = to_iso_date(date_naissance)
-
-                        nom = a.get("name")
-                        auteur_data = {
-                            'nom': nom[:9],
-                            'date_naissance': date_naissance if date_naissance else None,
-                            'source': 'tmdb',
-                        }
-                        OAuteur ,_= AuteurProfile.objects.get_or_create(**auteur_data)
-                        OFilm.auteurs.add(OAuteur)
+    def person(self, crew: dict) -> dict:
+        """
+            Détail d'un scénariste ; fiche supprimée de TMDb : l'auteur est gardé
+            avec le nom du générique, sans date de naissance.
+        """
+        person = self.people[crew.get("id")].result()
+        if person is None:
+            self.gone["auteur"].add(crew.get("id"))
+            return {}
+        return person
+
+    def import_discover(self, checkpoint, workers):
+        total_pages = self.client.discover(1).get("total_pages") or 0
+        if checkpoint.next_page > 1:
+            self.stdout.write(f"Reprise à la page {checkpoint.next_page}/{total_pages}")
+
+        # Les pages suivantes sont demandées pendant le traitement de la page courante
+        pages = deque()
+        next_page = checkpoint.next_page
+        while pages or next_page <= total_pages:
+            while next_page <= total_pages and len(pages) < workers:
+                pages.append((next_page, self.pool.submit(self.client.discover, next_page)))
+                next_page += 1
+            page, page_future = pages.popleft()
+            self.add_movies(page_future.result().get("results", []))
+
+            # Le point de reprise n'avance qu'une fois le lot écrit en base
+            if self.writer.full or page == total_pages:
+                count = self.writer.flush()
+                checkpoint.complete_page(page)
+                self.stdout.write(f"page {page}/{total_pages} : {count} film(s) enregistrés")
+
+    def import_dump(self, path, checkpoint, min_popularity):
+        """
+            Import depuis un export TMDb déjà sur disque, lu en flux et écrit par lots.
+            Les lignes de l'export ne contiennent que l'id et le titre original :
+            le détail du film n'est demandé que s'il manque la date de sortie.
+        """
+        if checkpoint.next_page > 1:
+            self.stdout.write(f"Reprise au lot {checkpoint.next_page}")
+        rows = filter_rows(read_dump(path), min_popularity=min_popularity)
+        for number, batch in enumerate(batched(rows, self.writer.batch_size), start=1):
+            if number < checkpoint.next_page:
+                continue
+            missing = [r["id"] for r in batch if not r.get("release_date")]
+            movies = [r for r in batch if r.get("release_date")]
+            movies.extend(self.fetch_movies(missing))
+            self.add_movies(movies)
+            count = self.writer.flush()
+            checkpoint.complete_page(number)
+            # Les auteurs déjà vus restent servis par le cache HTTP : mémoire constante
+            self.people.clear()
+            self.stdout.write(f"lot {number} : {count} film(s) enregistrés")
+
+    def fetch_movies(self, movie_ids):
+        """
+            Détail des films ``movie_ids`` ; ceux supprimés de TMDb (404) sont comptés et ignorés.
+        """
+        movies = []
+        for movie_id, movie in zip(movie_ids, self.pool.map(self.client.movie, movie_ids)):
+            if movie is None:
+                self.gone["film"].add(movie_id)
+            else:
+                movies.append(movie)
+        return movies
+
+    def import_changes(self, since):
+        if since is None:
+            last = TMDbSync.objects.filter(nom=SYNC_NAME).first()
+            if last is None:
+                raise CommandError("Aucun import précédent : lancez un import complet ou précisez --since.")
+            since = last.date_synchro.date()
+        today = timezone.now().date()
+
+        # Seuls les films et auteurs déjà présents au catalogue sont rafraîchis
+        # (les fiches supprimées de TMDb sont comptées et laissées telles quelles)
+        movie_ids = self.known_ids(Film, self.client.changes("movie", since, today))
+        batch = self.writer.batch_size
+        for i in range(0, len(movie_ids), batch):
+            self.add_movies(self.fetch_movies(movie_ids[i:i + batch]))
+            self.writer.flush()
+
+        person_ids = [p for p in self.known_ids(AuteurProfile, self.client.changes("person", since, today))
+                      if p not in self.people]
+        for i in range(0, len(person_ids), batch):
+            chunk = person_ids[i:i + batch]
+            for person_id, person in zip(chunk, self.pool.map(self.client.person, chunk)):
+                if person is None:
+                    self.gone["auteur"].add(person_id)
                 else:
-                    print("  Aucun auteur trouvé")
+                    self.writer.add_auteur(person)
+            self.writer.flush()
+
+        self.stdout.write(f"Depuis le {since} : {len(movie_ids)} film(s) et "
+                          f"{len(person_ids) + len(self.people)} auteur(s) mis à jour")
+
+    def match_legacy(self):
+        """
+            Films importés avant l'ajout de ``tmdb_id`` (``source="tmdb"``, ``tmdb_id`` vide) :
+            recherchés sur TMDb par titre et année, puis repassés par le tampon d'écriture,
+            qui les rattache à leur identifiant avec leurs auteurs (``BulkWriter.adopt_legacy``).
+        """
+        films = list(Film.objects.filter(source="tmdb", tmdb_id__isnull=True)
+                     .order_by("pk").values_list("titre", "date_sortie"))
+        matched = 0
+        for chunk in batched(films, self.writer.batch_size):
+            results = self.pool.map(lambda film: self.client.search_movie(film[0], film[1].year), chunk)
+            movies = []
+            for (titre, date_sortie), data in zip(chunk, results):
+                movie = next((m for m in data.get("results", []) if m.get("title") == titre
+                              and m.get("release_date") == date_sortie.isoformat()), None)
+                if movie is not None:
+                    movies.append(movie)
+            self.add_movies(movies)
+            self.writer.flush()
+            matched += len(movies)
+        self.stdout.write(f"{matched}/{len(films)} film(s) rattachés à TMDb")
 
-                time.sleep(0.25)
+    @staticmethod
+    def known_ids(model, tmdb_ids):
+        known = []
+        for i in range(0, len(tmdb_ids), LOOKUP_CHUNK):
+            chunk = tmdb_ids[i:i + LOOKUP_CHUNK]
+            known.extend(model.objects.filter(tmdb_id__in=chunk).values_list("tmdb_id", flat=True))
+        return known
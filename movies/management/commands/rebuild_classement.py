@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from movies.classement import rebuild_classement
+
+
+class Command(BaseCommand):
+    help = "Recalcule le classement bayésien des films (à planifier, ex. toutes les heures)"
+
+    def handle(self, *args, **options):
+        count = rebuild_classement()
+        self.stdout.write(self.style.SUCCESS(f"Classement recalculé : {count} film(s)"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from movies.facettes import rebuild_facettes
+
+
+class Command(BaseCommand):
+    help = "Recalcule les facettes des films (année, statut, source, évaluation)"
+
+    def handle(self, *args, **options):
+        count = rebuild_facettes()
+        self.stdout.write(self.style.SUCCESS(f"Facettes recalculées : {count} valeur(s)"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from movies.models import Film, AuteurProfile
+from movies.classement import rebuild_classement
+from movies.notations import rebuild_notation_stats
+
+
+class Command(BaseCommand):
+    help = "Recalcule la note moyenne, le nombre de notations et l'histogramme des films et auteurs"
+
+    def handle(self, *args, **options):
+        for model in (Film, AuteurProfile):
+            count = rebuild_notation_stats(model)
+            self.stdout.write(f"{model._meta.verbose_name_plural} : {count} objet(s) noté(s)")
+        # Les scores du classement dépendent des moyennes recalculées
+        rebuild_classement()
+        self.stdout.write(self.style.SUCCESS("Agrégats des notations recalculés"))
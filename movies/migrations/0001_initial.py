@@ -0,0 +1,79 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:15
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuteurProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(blank=True, max_length=250, null=True)),
+                ('email', models.CharField(blank=True, max_length=100, null=True)),
+                ('date_naissance', models.DateField(blank=True, null=True)),
+                ('source', models.CharField(choices=[('admin', 'Créé via Admin'), ('tmdb', 'Importé depuis TMDb')], default='admin', max_length=250)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='auteur_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Film',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titre', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('date_sortie', models.DateField()),
+                ('evaluation', models.CharField(blank=True, choices=[('excellent', 'Excellent'), ('bon', 'Bon'), ('moyen', 'Moyen'), ('mauvais', 'Mauvais')], max_length=20, null=True)),
+                ('statut', models.CharField(choices=[('production', 'En production'), ('salle', 'En salle'), ('sorti', 'Sorti')], default='production', max_length=20)),
+                ('source', models.CharField(choices=[('admin', 'Créé via Admin'), ('tmdb', 'Importé depuis TMDb')], default='admin', max_length=10)),
+                ('auteurs', models.ManyToManyField(related_name='films', to='movies.auteurprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SpectateurProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bio', models.TextField(blank=True, null=True)),
+                ('avatar', models.ImageField(blank=True, null=True, upload_to='avatars/')),
+                ('favoris_auteurs', models.ManyToManyField(blank=True, related_name='favoris_spectateurs', to='movies.auteurprofile')),
+                ('favoris_films', models.ManyToManyField(blank=True, related_name='favoris_spectateurs', to='movies.film')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='spectateur_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NotationFilm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('commentaire', models.TextField(blank=True, null=True)),
+                ('film', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notations', to='movies.film')),
+                ('spectateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notations_films', to='movies.spectateurprofile')),
+            ],
+            options={
+                'unique_together': {('spectateur', 'film')},
+            },
+        ),
+        migrations.CreateModel(
+            name='NotationAuteur',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('commentaire', models.TextField(blank=True, null=True)),
+                ('auteur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notations', to='movies.auteurprofile')),
+                ('spectateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notations_auteurs', to='movies.spectateurprofile')),
+            ],
+            options={
+                'unique_together': {('spectateur', 'auteur')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='tmdb_id',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='tmdb_id',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_tmdb_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TMDbSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=50, unique=True)),
+                ('date_synchro', models.DateTimeField()),
+            ],
+        ),
+    ]
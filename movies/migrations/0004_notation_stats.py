@@ -0,0 +1,103 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:21
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+NOTES = range(1, 6)
+
+
+def populate_notation_stats(apps, schema_editor):
+    # Agrégats des notes déjà saisies (équivalent de ``rebuild_notations``)
+    for model_name, notation_name, fk in [("Film", "NotationFilm", "film"),
+                                          ("AuteurProfile", "NotationAuteur", "auteur")]:
+        model = apps.get_model("movies", model_name)
+        rows = (apps.get_model("movies", notation_name).objects.values(fk)
+                .annotate(nb_notations=Count("id"), **{f"nb_notes_{i}": Count("id", filter=Q(note=i)) for i in NOTES})
+                .order_by(fk))
+        objs = []
+        for row in rows:
+            total = sum(row[f"nb_notes_{i}"] * i for i in NOTES)
+            objs.append(model(pk=row.pop(fk), note_moyenne=total / row["nb_notations"], **row))
+        model.objects.bulk_update(objs, ["note_moyenne", "nb_notations", *(f"nb_notes_{i}" for i in NOTES)],
+                                  batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_tmdbsync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='note_moyenne',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='nb_notations',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='nb_notes_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='nb_notes_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='nb_notes_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='nb_notes_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='nb_notes_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='note_moyenne',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='nb_notations',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='nb_notes_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='nb_notes_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='nb_notes_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='nb_notes_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='nb_notes_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_notation_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def populate_classement(apps, schema_editor):
+    # Scores des films déjà notés (équivalent de ``rebuild_classement``)
+    Film = apps.get_model("movies", "Film")
+    ClassementFilm = apps.get_model("movies", "ClassementFilm")
+    notes = Film.objects.filter(nb_notations__gt=0)
+    row = notes.aggregate(total=Sum(F("note_moyenne") * F("nb_notations")), votes=Sum("nb_notations"))
+    if not row["votes"]:
+        return
+    C, m = row["total"] / row["votes"], getattr(settings, "CLASSEMENT_VOTES_MIN", 10)
+    ClassementFilm.objects.bulk_create(
+        [ClassementFilm(film_id=film_id, score=(votes * moyenne + m * C) / (votes + m))
+         for film_id, moyenne, votes in notes.values_list("id", "note_moyenne", "nb_notations")],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_notation_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassementFilm',
+            fields=[
+                ('film', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='classement', serialize=False, to='movies.film')),
+                ('score', models.FloatField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(populate_classement, migrations.RunPython.noop),
+    ]
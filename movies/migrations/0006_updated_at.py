@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_classementfilm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auteurprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
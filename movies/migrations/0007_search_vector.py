@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Colonnes tsvector générées + index GIN (PostgreSQL uniquement).
+# Sous SQLite, l'index plein texte est une table FTS5 créée après migrate
+# (voir movies.search.ensure_sqlite_indexes).
+SEARCH_VECTORS = {
+    "movies_film": "setweight(to_tsvector('french', coalesce(titre, '')), 'A') || "
+                   "setweight(to_tsvector('french', coalesce(description, '')), 'B')",
+    "movies_auteurprofile": "to_tsvector('simple', coalesce(nom, ''))",
+}
+
+
+def add_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, expression in SEARCH_VECTORS.items():
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        schema_editor.execute(f"CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)")
+
+
+def remove_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in SEARCH_VECTORS:
+        schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vectors, remove_search_vectors),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Index d'expression pour ExtractYear("date_sortie") (PostgreSQL) ; sous SQLite,
+# ExtractYear passe par une fonction Python et ne peut pas être indexé.
+def add_year_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            'CREATE INDEX film_annee_sortie_idx ON movies_film ((EXTRACT(YEAR FROM "date_sortie")))'
+        )
+
+
+def remove_year_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS film_annee_sortie_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(add_year_index, remove_year_index),
+        migrations.AddIndex(
+            model_name='auteurprofile',
+            index=models.Index(fields=['source'], name='auteur_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['date_sortie', 'id'], name='film_date_sortie_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['statut', 'date_sortie'], name='film_statut_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['source', 'date_sortie'], name='film_source_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['evaluation'], name='film_evaluation_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='notationauteur',
+            constraint=models.CheckConstraint(condition=models.Q(('note__gte', 1), ('note__lte', 5)), name='notationauteur_note_1_5'),
+        ),
+        migrations.AddConstraint(
+            model_name='notationfilm',
+            constraint=models.CheckConstraint(condition=models.Q(('note__gte', 1), ('note__lte', 5)), name='notationfilm_note_1_5'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:33
+
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import ExtractYear
+
+
+def populate_facettes(apps, schema_editor):
+    Film = apps.get_model("movies", "Film")
+    FacetteFilm = apps.get_model("movies", "FacetteFilm")
+    groups = {
+        "annee": Film.objects.annotate(valeur=ExtractYear("date_sortie")),
+        "statut": Film.objects.annotate(valeur=F("statut")),
+        "source": Film.objects.annotate(valeur=F("source")),
+        "evaluation": Film.objects.annotate(valeur=F("evaluation")),
+    }
+    FacetteFilm.objects.bulk_create([
+        FacetteFilm(dimension=dimension, valeur="" if row["valeur"] is None else str(row["valeur"]),
+                    nb_films=row["nb_films"])
+        for dimension, qs in groups.items()
+        for row in qs.values("valeur").annotate(nb_films=Count("id")).order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetteFilm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('annee', 'Année de sortie'), ('statut', 'Statut'), ('source', 'Source'), ('evaluation', 'Évaluation')], max_length=20)),
+                ('valeur', models.CharField(blank=True, max_length=20)),
+                ('nb_films', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('dimension', 'valeur')},
+            },
+        ),
+        migrations.RunPython(populate_facettes, migrations.RunPython.noop),
+    ]
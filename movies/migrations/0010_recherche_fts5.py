@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:01
+
+import django.db.models.deletion
+import movies.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0009_facettes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuteurRecherche',
+            fields=[
+                ('rank', models.FloatField()),
+                ('auteur', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='recherche', serialize=False, to='movies.auteurprofile')),
+                ('document', movies.models.FTS5Field(db_column='movies_auteurprofile_fts')),
+            ],
+            options={
+                'db_table': 'movies_auteurprofile_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='FilmRecherche',
+            fields=[
+                ('rank', models.FloatField()),
+                ('film', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='recherche', serialize=False, to='movies.film')),
+                ('document', movies.models.FTS5Field(db_column='movies_film_fts')),
+            ],
+            options={
+                'db_table': 'movies_film_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
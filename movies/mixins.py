@@ -0,0 +1,138 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404
+from rest_framework.fields import SerializerMethodField, empty
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+
+class RelatedQuerysetMixin:
+    """
+        Applique au queryset les relations déclarées par le serializer de l'action
+        (``select_related_fields`` / ``prefetch_related_fields``, et celles des
+        relations demandées par ``?expand=``) : le nombre de requêtes SQL ne
+        dépend plus du nombre d'objets sérialisés.
+        ``?fields=id,titre`` (lecture seule) : seuls ces champs sont sérialisés,
+        et seules leurs colonnes et relations sont lues.
+    """
+    expand_query_param = "expand"
+    fields_query_param = "fields"
+
+    def _query_names(self, param) -> set:
+        value = self.request.query_params.get(param, "") if self.request else ""
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    def get_expand(self) -> set:
+        return self._query_names(self.expand_query_param)
+
+    def get_fields(self):
+        """
+            Champs demandés par ``?fields=`` ; ``None`` : tous (et toujours pour une écriture).
+        """
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        return self._query_names(self.fields_query_param) or None
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "expand": self.get_expand(), "fields": self.get_fields()}
+
+    def optimize_queryset(self, queryset, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        expand, fields = self.get_expand(), self.get_fields()
+        if hasattr(serializer_class, "related_lookups"):
+            select, prefetch = serializer_class.related_lookups(expand, fields)
+            columns = serializer_class.only_fields(expand, fields) if fields else None
+            if columns:
+                # Champs du curseur de KeysetPagination
+                columns.update(field.lstrip("-") for field in getattr(self, "keyset_ordering", ()))
+                queryset = queryset.only(*columns)
+        else:
+            select = getattr(serializer_class, "select_related_fields", ())
+            prefetch = getattr(serializer_class, "prefetch_related_fields", ())
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def get_queryset(self):
+        return self.optimize_queryset(super().get_queryset())
+
+
+class SpectateurMixin:
+    """
+        Profil spectateur de l'utilisateur courant, déjà chargé avec l'utilisateur
+        par ``core.authentication.JWTAuthentication`` (aucune requête supplémentaire).
+    """
+
+    def get_spectateur(self):
+        try:
+            return self.request.user.spectateur_profile
+        except (ObjectDoesNotExist, AttributeError):
+            raise Http404("Profil spectateur introuvable.")
+
+
+def values_plan(serializer):
+    """
+        Pour chaque champ lisible du serializer : (nom, lookup ``.values()``,
+        lookups des relations intermédiaires, champ) ; ``None`` si un champ
+        n'est pas un simple attribut (serializer imbriqué, ``source="*"``, méthode).
+    """
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if (isinstance(field, (BaseSerializer, ManyRelatedField, RelatedField, SerializerMethodField))
+                or field.source == "*"):
+            return None
+        attrs = field.source_attrs
+        parents = tuple("__".join(attrs[:i]) for i in range(1, len(attrs)))
+        plan.append((name, "__".join(attrs), parents, field))
+    return plan
+
+
+def represent(row, plan):
+    """
+        Équivalent de ``Serializer.to_representation`` sur une ligne de ``.values()``.
+    """
+    ret = {}
+    for name, lookup, parents, field in plan:
+        value = row[lookup]
+        if value is None and any(row[parent] is None for parent in parents):
+            # Relation absente : même traitement que Field.get_attribute
+            if field.default is not empty:
+                value = field.get_default()
+            elif not field.allow_null and not field.required:
+                continue
+        ret[name] = None if value is None else field.to_representation(value)
+    return ret
+
+
+class ValuesListMixin:
+    """
+        Action ``list`` sérialisée sans instancier de modèle : les lignes sont lues
+        par ``.values()`` avec les seuls champs du serializer (``user.username`` ->
+        ``user__username``) et chaque valeur passe par le ``to_representation`` de
+        son champ ; le JSON produit est identique à celui du serializer.
+        ``values_serialization = False`` (ou un champ non pris en charge) : ``list`` standard.
+    """
+    values_serialization = True
+
+    def list(self, request, *args, **kwargs):
+        plan = values_plan(self.get_serializer()) if self.values_serialization else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        lookups = {lookup for _, lookup, _, _ in plan}
+        lookups.update(parent for _, _, parents, _ in plan for parent in parents)
+        # Champs du curseur de KeysetPagination
+        lookups.update(field.lstrip("-") for field in getattr(self, "keyset_ordering", ()))
+        queryset = self.filter_queryset(self.get_queryset()).values(*lookups)
+
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        data = [represent(row, plan) for row in rows]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
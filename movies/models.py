@@ -9,15 +9,45 @@ SOURCE_CHOICES = \
         ("tmdb", "Importé depuis TMDb")
     ]
 
-class AuteurProfile(models.Model):
+class NotationStats(models.Model):
+    """
+        Agrégats des notations reçues, tenus à jour à chaque nouvelle note
+        (voir ``movies/notations.py``) et recalculés par ``rebuild_notations``.
+    """
+    note_moyenne = models.FloatField(null=True, blank=True, db_index=True, editable=False)
+    nb_notations = models.PositiveIntegerField(default=0, editable=False)
+    nb_notes_1 = models.PositiveIntegerField(default=0, editable=False)
+    nb_notes_2 = models.PositiveIntegerField(default=0, editable=False)
+    nb_notes_3 = models.PositiveIntegerField(default=0, editable=False)
+    nb_notes_4 = models.PositiveIntegerField(default=0, editable=False)
+    nb_notes_5 = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def histogramme(self):
+        return {str(i): getattr(self, f"nb_notes_{i}") for i in range(1, 6)}
+
+
+class AuteurProfile(NotationStats):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="auteur_profile", null=True, blank=True)
     nom = models.CharField(max_length=250, null=True, blank=True)
     email = models.CharField(max_length=100, null=True, blank=True)
     date_naissance = models.DateField(blank=True, null=True)
     source = models.CharField(max_length=250, choices=SOURCE_CHOICES, default="admin")
+    tmdb_id = models.PositiveIntegerField(unique=True, null=True, blank=True)
+    # Version de la fiche détaillée (ETag / Last-Modified), voir ``movies/cache.py``
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Filtre admin "source"
+            models.Index(fields=["source"], name="auteur_source_idx"),
+        ]
 
 
-class Film(models.Model):
+class Film(NotationStats):
     titre = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     date_sortie = models.DateField()
@@ -32,10 +62,97 @@ class Film(models.Model):
     statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default="production")
 
     source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default="admin")
+    tmdb_id = models.PositiveIntegerField(unique=True, null=True, blank=True)
+    # Version de la fiche détaillée (ETag / Last-Modified), voir ``movies/cache.py``
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # L'index sur EXTRACT(YEAR FROM date_sortie) est créé par la migration 0008_indexes (PostgreSQL)
+        indexes = [
+            # Pagination par curseur (date_sortie, id) et ?anne_sortie= (date_sortie__year -> BETWEEN)
+            models.Index(fields=["date_sortie", "id"], name="film_date_sortie_id_idx"),
+            # Filtres admin
+            models.Index(fields=["statut", "date_sortie"], name="film_statut_date_idx"),
+            models.Index(fields=["source", "date_sortie"], name="film_source_date_idx"),
+            models.Index(fields=["evaluation"], name="film_evaluation_idx"),
+        ]
 
     def __str__(self):
         return self.titre
 
+class ClassementFilm(models.Model):
+    """
+        Score bayésien (moyenne pondérée façon IMDb) précalculé par film noté,
+        voir ``movies/classement.py``.
+    """
+    film = models.OneToOneField(Film, on_delete=models.CASCADE, primary_key=True, related_name="classement")
+    score = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return f"{self.film_id} : {self.score:.3f}"
+
+class FacetteFilm(models.Model):
+    """
+        Nombre de films par valeur de facette (année de sortie, statut, source,
+        évaluation), tenu à jour à chaque écriture, voir ``movies/facettes.py``.
+    """
+    DIMENSION_CHOICES = [("annee", "Année de sortie"), ("statut", "Statut"),
+                         ("source", "Source"), ("evaluation", "Évaluation")]
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    valeur = models.CharField(max_length=20, blank=True)
+    nb_films = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("dimension", "valeur")
+
+    def __str__(self):
+        return f"{self.dimension}={self.valeur} : {self.nb_films}"
+
+class FTS5Field(models.TextField):
+    """
+        Colonne cachée d'une table FTS5 portant son nom : cible de ``__match``.
+    """
+
+
+@FTS5Field.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class RechercheFTS5(models.Model):
+    """
+        Table FTS5 de la recherche plein texte sous SQLite, créée hors migrations
+        par ``movies.search.ensure_sqlite_indexes`` ; ``rank`` : bm25 pondéré (plus petit = plus pertinent).
+    """
+    rank = models.FloatField()
+
+    class Meta:
+        abstract = True
+        managed = False
+
+
+class FilmRecherche(RechercheFTS5):
+    film = models.OneToOneField(Film, on_delete=models.DO_NOTHING, primary_key=True, db_column="rowid",
+                                related_name="recherche")
+    document = FTS5Field(db_column="movies_film_fts")
+
+    class Meta(RechercheFTS5.Meta):
+        db_table = "movies_film_fts"
+
+
+class AuteurRecherche(RechercheFTS5):
+    auteur = models.OneToOneField(AuteurProfile, on_delete=models.DO_NOTHING, primary_key=True, db_column="rowid",
+                                  related_name="recherche")
+    document = FTS5Field(db_column="movies_auteurprofile_fts")
+
+    class Meta(RechercheFTS5.Meta):
+        db_table = "movies_auteurprofile_fts"
+
 class SpectateurProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="spectateur_profile")
     bio = models.TextField(blank=True, null=True)
@@ -56,6 +173,9 @@ class NotationFilm(models.Model):
 
     class Meta:
         unique_together = ("spectateur", "film")
+        constraints = [
+            models.CheckConstraint(condition=models.Q(note__gte=1, note__lte=5), name="notationfilm_note_1_5"),
+        ]
 
 
 class NotationAuteur(models.Model):
@@ -67,3 +187,17 @@ class NotationAuteur(models.Model):
 
     class Meta:
         unique_together = ("spectateur", "auteur")
+        constraints = [
+            models.CheckConstraint(condition=models.Q(note__gte=1, note__lte=5), name="notationauteur_note_1_5"),
+        ]
+
+
+class TMDbSync(models.Model):
+    """
+        Date du dernier import TMDb réussi, point de départ des imports incrémentaux.
+    """
+    nom = models.CharField(max_length=50, unique=True)
+    date_synchro = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.nom} : {self.date_synchro:%Y-%m-%d %H:%M}"
@@ -0,0 +1,138 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Now
+from django.utils import timezone
+
+from .models import Film, AuteurProfile, NotationFilm, NotationAuteur
+from .classement import refresh_film_score, refresh_film_scores
+from .cache import AUTEURS, AUTEURS_NOTATIONS, FILMS, FILMS_NOTATIONS, invalidate
+
+NOTES = range(1, 6)
+HISTOGRAMME_FIELDS = [f"nb_notes_{i}" for i in NOTES]
+STATS_FIELDS = ["note_moyenne", "nb_notations", *HISTOGRAMME_FIELDS]
+
+# Modèle noté -> (modèle de notation, champ FK vers le modèle noté)
+NOTATIONS = {
+    Film: (NotationFilm, "film"),
+    AuteurProfile: (NotationAuteur, "auteur"),
+}
+
+# Modèle noté -> portée du cache des listes (les agrégats y sont affichés)
+CACHE_SCOPES = {
+    Film: FILMS,
+    AuteurProfile: AUTEURS,
+}
+
+# Idem pour les nouvelles notes, publiées avec retard (voir movies/cache.py)
+NOTATIONS_CACHE_SCOPES = {
+    Film: FILMS_NOTATIONS,
+    AuteurProfile: AUTEURS_NOTATIONS,
+}
+
+
+def _moyenne():
+    total = sum((F(f"nb_notes_{i}") * i for i in NOTES), Value(0))
+    return Cast(total, FloatField()) / F("nb_notations")
+
+
+def _stats_annotations():
+    return {
+        "nb_notations": Count("id"),
+        **{f"nb_notes_{i}": Count("id", filter=Q(note=i)) for i in NOTES},
+    }
+
+
+def _stats_values(row):
+    values = {field: row.get(field, 0) for field in ["nb_notations", *HISTOGRAMME_FIELDS]}
+    total = sum(values[f"nb_notes_{i}"] * i for i in NOTES)
+    values["note_moyenne"] = total / values["nb_notations"] if values["nb_notations"] else None
+    return values
+
+
+def add_note(model, pk, note: int) -> None:
+    """
+        Prend en compte une nouvelle note : incrément atomique des compteurs,
+        puis recalcul de la moyenne à partir de l'histogramme (2 UPDATE, aucune agrégation).
+    """
+    add_notes(model, [(pk, note)])
+
+
+@transaction.atomic
+def add_notes(model, notes) -> None:
+    """
+        Idem pour un lot de couples (pk, note) : toujours 2 UPDATE, les
+        incréments propres à chaque objet passant par des CASE.
+    """
+    counts = defaultdict(Counter)
+    for pk, note in notes:
+        counts[pk][note] += 1
+    if not counts:
+        return
+
+    def increment(field, values):
+        return F(field) + Case(*[When(pk=pk, then=Value(v)) for pk, v in values.items() if v],
+                               default=Value(0), output_field=IntegerField())
+
+    qs = model.objects.filter(pk__in=list(counts))
+    qs.update(
+        nb_notations=increment("nb_notations", {pk: sum(c.values()) for pk, c in counts.items()}),
+        **{f"nb_notes_{note}": increment(f"nb_notes_{note}", {pk: c[note] for pk, c in counts.items()})
+           for note in NOTES if any(c[note] for c in counts.values())},
+    )
+    qs.update(note_moyenne=_moyenne(), updated_at=Now())
+    invalidate(NOTATIONS_CACHE_SCOPES[model])
+    if model is Film:
+        refresh_film_scores(list(counts))
+
+
+def refresh_notation_stats(obj) -> None:
+    """
+        Recalcule les agrégats d'un seul film/auteur (modification ou suppression d'une note).
+    """
+    notation_model, fk = NOTATIONS[type(obj)]
+    row = notation_model.objects.filter(**{fk: obj}).aggregate(**_stats_annotations())
+    values = _stats_values(row)
+    type(obj).objects.filter(pk=obj.pk).update(**values, updated_at=Now())
+    for field, value in values.items():
+        setattr(obj, field, value)
+    invalidate(CACHE_SCOPES[type(obj)])
+    if isinstance(obj, Film):
+        refresh_film_score(obj.pk)
+
+
+@transaction.atomic
+def rebuild_notation_stats(model, batch_size: int = 1000) -> int:
+    """
+        Recalcule les agrégats de tous les objets du modèle en un seul GROUP BY.
+        Seuls les objets dont les agrégats changent sont écrits (et leur ``updated_at``
+        avancé) : un recalcul sans écart ne touche ni les ETag des fiches ni l'export incrémental.
+    """
+    notation_model, fk = NOTATIONS[model]
+    reset = (model.objects.exclude(nb_notations=0)
+             .exclude(pk__in=notation_model.objects.values(fk))
+             .update(note_moyenne=None, nb_notations=0, updated_at=Now(), **{f: 0 for f in HISTOGRAMME_FIELDS}))
+    rows = (notation_model.objects.values(fk)
+            .annotate(**_stats_annotations())
+            .order_by(fk))
+    count = changed = 0
+    now = timezone.now()
+
+    def update(batch):
+        stored = {row.pop("pk"): row for row in model.objects.filter(pk__in=batch).values("pk", *STATS_FIELDS)}
+        objs = [model(pk=pk, updated_at=now, **values) for pk, values in batch.items() if stored.get(pk) != values]
+        model.objects.bulk_update(objs, [*STATS_FIELDS, "updated_at"])
+        return len(objs)
+
+    batch = {}
+    for row in rows.iterator(chunk_size=batch_size):
+        batch[row[fk]] = _stats_values(row)
+        if len(batch) >= batch_size:
+            changed += update(batch)
+            count += len(batch)
+            batch = {}
+    changed += update(batch)
+    if reset or changed:
+        invalidate(CACHE_SCOPES[model])
+    return count + len(batch)
@@ -1,6 +1,173 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+FALSE_VALUES = ("0", "false", "no")
+TRUE_VALUES = ("1", "true", "yes")
+
 
 class SimplePagination(PageNumberPagination):
+    """
+        Pagination par numéro de page ; ``?count=false`` évite le ``COUNT(*)``
+        (la réponse ne contient alors que ``next``/``previous``/``results``).
+    """
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.skip_count = request.query_params.get(self.count_query_param, "").lower() in FALSE_VALUES
+        if not self.skip_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(page_number=request.query_params.get(self.page_query_param), message=""))
+        if self.number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.number, message=""))
+        offset = (self.number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.number, message=""))
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.skip_count:
+            return super().get_paginated_response(data)
+        url = self.request.build_absolute_uri()
+        next_url = replace_query_param(url, self.page_query_param, self.number + 1) if self.has_next else None
+        previous_url = None
+        if self.number == 2:
+            previous_url = remove_query_param(url, self.page_query_param)
+        elif self.number > 2:
+            previous_url = replace_query_param(url, self.page_query_param, self.number - 1)
+        return Response({"next": next_url, "previous": previous_url, "results": data})
+
+
+class KeysetPagination(BasePagination):
+    """
+        Pagination par clé (keyset) : le curseur opaque contient les valeurs
+        d'``ordering`` de la dernière ligne renvoyée, la page suivante est un
+        ``WHERE (a, b) > (x, y) ORDER BY a, b LIMIT n`` sans ``OFFSET`` ni ``COUNT(*)``.
+        Le dernier champ d'``ordering`` doit être unique ; ``-champ`` pour un ordre
+        décroissant. Parcours vers l'avant uniquement.
+    """
+    cursor_query_param = "cursor"
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",)
+    invalid_cursor_message = "Curseur invalide."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    @property
+    def fields(self):
+        return [field.lstrip("-") for field in self.ordering]
+
+    def after(self, position):
+        # (a, b, c) > (x, y, z)  <=>  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        # ("<" pour un champ décroissant "-a")
+        condition = Q()
+        for i, (ordering, field) in enumerate(zip(self.ordering, self.fields)):
+            lookup = "lt" if ordering.startswith("-") else "gt"
+            clause = Q(**{f"{field}__{lookup}": position[i]})
+            for previous, value in zip(self.fields[:i], position[:i]):
+                clause &= Q(**{previous: value})
+            condition |= clause
+        if len(self.ordering) > 1:
+            # Borne sur le premier champ, redondante mais indexable : sans elle, SQLite ne sait pas
+            # utiliser l'index pour un OR et le parcourt depuis le début (coût croissant avec la profondeur)
+            lookup = "lte" if self.ordering[0].startswith("-") else "gte"
+            condition = Q(**{f"{self.fields[0]}__{lookup}": position[0]}) & condition
+        return condition
+
+    def encode_cursor(self, obj) -> str:
+        # Instance ou ligne de .values() (ValuesListMixin)
+        values = [obj[field] if isinstance(obj, dict) else getattr(obj, field) for field in self.fields]
+        raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Curseur modifié à la main : chaque valeur doit être du type du champ d'ordering
+        try:
+            position = [self.model_field(model, field).to_python(value) for field, value in zip(self.fields, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def model_field(model, path):
+        *relations, name = path.split("__")
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+
+class KeysetPaginationMixin:
+    """
+        Active ``KeysetPagination`` sur l'action ``list`` quand la requête
+        contient ``?cursor=`` ou ``?pagination=cursor`` ; sinon ``pagination_class``.
+    """
+    keyset_pagination_class = KeysetPagination
+    keyset_ordering = ("id",)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and self.action == "list":
+            params = self.request.query_params
+            if "cursor" in params or params.get("pagination") == "cursor":
+                self._paginator = self.keyset_pagination_class()
+        return super().paginator
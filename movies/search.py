@@ -0,0 +1,131 @@
+"""
+Recherche plein texte sur les films et les auteurs (``?search=``).
+
+- PostgreSQL : colonne générée ``search_vector`` (tsvector) + index GIN,
+  créés par la migration ``0007_search_vector`` ; stemming français pour
+  ``titre`` / ``description``, tri par ``ts_rank``.
+- SQLite (développement) : table FTS5 externe synchronisée par triggers,
+  créée après ``migrate`` (``ensure_sqlite_indexes``) et jointe par les modèles
+  non gérés ``FilmRecherche`` / ``AuteurRecherche`` ; pas de stemming
+  français, les termes sont recherchés par préfixe, tri par ``bm25``.
+- autres bases : ``icontains`` sans classement.
+"""
+import re
+from dataclasses import dataclass
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections
+from django.db.models import F, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .models import AuteurProfile, Film
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    columns: tuple
+    weights: tuple  # poids bm25 (SQLite) ; PostgreSQL : A, B, ... dans la migration
+    config: str     # configuration tsvector PostgreSQL
+
+
+SEARCH_INDEXES = {
+    Film: SearchIndex(("titre", "description"), (10.0, 1.0), "french"),
+    # Noms propres : pas de stemming
+    AuteurProfile: SearchIndex(("nom",), (1.0,), "simple"),
+}
+
+
+def fts5_query(terms: str) -> str:
+    """
+        Requête FTS5 sûre : chaque mot est cité et recherché par préfixe (ET implicite).
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", terms))
+
+
+def search(queryset, terms: str):
+    """
+        Filtre ``queryset`` sur ``terms`` et l'annote de ``search_rank``
+        (plus grand = plus pertinent), trié par pertinence.
+    """
+    model = queryset.model
+    index = SEARCH_INDEXES[model]
+    table = model._meta.db_table
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "postgresql":
+        query = SearchQuery(terms, config=index.config, search_type="websearch")
+        queryset = (queryset
+                    .annotate(search_vector=RawSQL(f'"{table}"."search_vector"', [],
+                                                   output_field=SearchVectorField()))
+                    .filter(search_vector=query)
+                    .annotate(search_rank=SearchRank(F("search_vector"), query)))
+    elif vendor == "sqlite":
+        match = fts5_query(terms)
+        if not match:
+            return queryset.none()
+        # Jointure avec la table FTS5 (FilmRecherche / AuteurRecherche) : c'est l'index qui pilote la requête
+        queryset = (queryset
+                    .filter(recherche__document__match=match)
+                    .annotate(search_rank=-F("recherche__rank")))
+    else:
+        filters = Q()
+        for column in index.columns:
+            filters |= Q(**{f"{column}__icontains": terms})
+        queryset = queryset.filter(filters).annotate(search_rank=Value(0.0))
+    return queryset.order_by("-search_rank", "pk")
+
+
+def ensure_sqlite_indexes(using="default", rebuild=False, **kwargs):
+    """
+        Crée (si besoin) les tables FTS5 et leurs triggers. Idempotent : relancé
+        après chaque ``migrate``, car SQLite supprime les triggers quand une
+        migration reconstruit la table.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for model, index in SEARCH_INDEXES.items():
+            table = model._meta.db_table
+            columns = ", ".join(index.columns)
+            new = ", ".join(f"new.{c}" for c in index.columns)
+            old = ", ".join(f"old.{c}" for c in index.columns)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [f"{table}_fts"])
+            created = cursor.fetchone() is None
+            statements = [
+                f"""CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+                    {columns}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')""",
+                f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {table}_fts(rowid, {columns}) VALUES (new.id, {new});
+                END""",
+                f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {table}_fts({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old});
+                END""",
+                f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF {columns} ON {table} BEGIN
+                    INSERT INTO {table}_fts({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old});
+                    INSERT INTO {table}_fts(rowid, {columns}) VALUES (new.id, {new});
+                END""",
+            ]
+            for statement in statements:
+                cursor.execute(statement)
+            # Colonne "rank" de la table : bm25 avec les poids de l'index
+            weights = ", ".join(str(w) for w in index.weights)
+            cursor.execute(f"INSERT INTO {table}_fts({table}_fts, rank) VALUES ('rank', %s)", [f"bm25({weights})"])
+            if created or rebuild:
+                cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+        ``?search=`` sur l'index plein texte des modèles de ``SEARCH_INDEXES`` ;
+        sans effet sur les autres vues.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms or queryset.model not in SEARCH_INDEXES:
+            return queryset
+        return search(queryset, terms)
@@ -1,13 +1,131 @@
+from dataclasses import dataclass
+
 from rest_framework import serializers
 from .models import AuteurProfile,Film,SpectateurProfile,NotationFilm,NotationAuteur
 from core.serializers import CustomUserReadSerializer
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from .notations import add_note
 
 User = get_user_model()
 
-class AuteurListSerializer(serializers.ModelSerializer):
+
+@dataclass(frozen=True)
+class Expandable:
+    """
+        Relation rendue imbriquée seulement si elle est demandée par ``?expand=``.
+    """
+    serializer: type
+    many: bool = False
+    select_related: tuple = ()
+    prefetch_related: tuple = ()
+    # Chargement quand la relation n'est pas développée (champ d'ids) ; rien si absent
+    default_prefetch: tuple = ()
+
+
+class DynamicFieldsMixin:
+    """
+        Champs choisis par le client, lus dans le contexte (voir ``RelatedQuerysetMixin``) :
+        - ``fields`` (``?fields=``) : seuls ces champs sont sérialisés ;
+        - ``expand`` (``?expand=``) : les relations d'``expandable_fields`` remplacent
+          (ou complètent) le champ du même nom par le serializer imbriqué.
+        ``related_lookups`` et ``only_fields`` en déduisent les relations et les colonnes à lire.
+    """
+    expandable_fields = {}
+    # Champs sans colonne du même nom (propriété, méthode) -> chemins ORM utilisés
+    field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expanded = self.expanded
+        for name in expanded:
+            spec = self.expandable_fields[name]
+            self.fields[name] = spec.serializer(many=spec.many, read_only=True)
+        requested = self.context.get("fields")
+        if requested:
+            for name in set(self.fields) - set(requested) - expanded:
+                self.fields.pop(name)
+
+    @property
+    def expanded(self) -> set:
+        return set(self.context.get("expand", ())) & set(self.expandable_fields)
+
+    @classmethod
+    def source_paths(cls, expand=(), fields=None) -> dict:
+        """
+            Champ sérialisé -> chemins ORM lus (``user.username`` -> ``user__username``) ;
+            ``None`` si inconnu (méthode non décrite dans ``field_sources``).
+        """
+        serializer = cls(context={"expand": expand, "fields": fields})
+        paths = {}
+        for name, field in serializer.fields.items():
+            if name in cls.field_sources:
+                paths[name] = cls.field_sources[name]
+            elif field.source == "*":
+                paths[name] = None
+            else:
+                paths[name] = ("__".join(field.source_attrs),)
+        return paths
+
+    @classmethod
+    def related_lookups(cls, expand=(), fields=None):
+        """
+            ``select_related`` / ``prefetch_related`` nécessaires aux seuls champs sérialisés.
+        """
+        paths = cls.source_paths(expand, fields)
+        if None in paths.values():
+            roots = None
+        else:
+            roots = {path.split("__")[0] for sources in paths.values() for path in sources}
+
+        def used(lookup):
+            lookup = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+            return roots is None or lookup.split("__")[0] in roots
+
+        select = [lookup for lookup in getattr(cls, "select_related_fields", ()) if used(lookup)]
+        prefetch = [lookup for lookup in getattr(cls, "prefetch_related_fields", ()) if used(lookup)]
+        for name, spec in cls.expandable_fields.items():
+            if name in expand:
+                select.extend(spec.select_related)
+                prefetch.extend(spec.prefetch_related)
+            elif roots is None or name in roots:
+                prefetch.extend(spec.default_prefetch)
+        return select, prefetch
+
+    @classmethod
+    def only_fields(cls, expand=(), fields=None):
+        """
+            Colonnes à lire (``QuerySet.only``) ; ``None`` : toutes.
+        """
+        model = cls.Meta.model
+        columns = {model._meta.pk.name}
+        for sources in cls.source_paths(expand, fields).values():
+            if sources is None:
+                return None
+            for path in sources:
+                try:
+                    field = model._meta.get_field(path.split("__")[0])
+                except FieldDoesNotExist:
+                    return None
+                # Relations multiples : préchargées, aucune colonne à lire
+                if not (field.many_to_many or field.one_to_many):
+                    columns.add(path)
+        return columns
+
+
+class FilmMiniSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Film
+        fields = ("id", "titre", "date_sortie")
+
+class AuteurListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    select_related_fields = ("user",)
+    expandable_fields = {
+        "films": Expandable(FilmMiniSerializer, many=True, prefetch_related=("films",)),
+    }
 
     username = serializers.CharField(source="user.username", read_only=True)
     email = serializers.EmailField()
@@ -15,23 +133,24 @@ class AuteurListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = AuteurProfile
-        fields = ("id", "username", "email", "nom", "date_naissance", "source")
+        fields = ("id", "username", "email", "nom", "date_naissance", "source", "note_moyenne", "nb_notations")
 
-class FilmMiniSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Film
-        fields = ("id", "titre", "date_sortie")
+class AuteurDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    select_related_fields = ("user",)
+    prefetch_related_fields = ("films",)
+    field_sources = {"histogramme": tuple(f"nb_notes_{i}" for i in range(1, 6))}
 
-class AuteurDetailSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
     email = serializers.EmailField(read_only=True)
     nom = serializers.CharField(read_only=True)
 
     films = FilmMiniSerializer(many=True, read_only=True)
+    histogramme = serializers.DictField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model = AuteurProfile
-        fields = ("id", "username", "email", "nom", "date_naissance", "source", "films")
+        fields = ("id", "username", "email", "nom", "date_naissance", "source",
+                  "note_moyenne", "nb_notations", "histogramme", "films")
 
 class AuteurModifSerializer(serializers.ModelSerializer):
 
@@ -41,20 +160,41 @@ class AuteurModifSerializer(serializers.ModelSerializer):
 
 
 
-class FilmListSerializer(serializers.ModelSerializer):
+class FilmListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "auteurs": Expandable(AuteurListSerializer, many=True, prefetch_related=(
+            Prefetch("auteurs", queryset=AuteurProfile.objects.select_related("user")),
+        )),
+    }
+
+    class Meta:
+        model = Film
+        fields = ("id", "titre", "description", "evaluation","statut", "note_moyenne", "nb_notations")
 
+class FilmClassementSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    select_related_fields = ("classement",)
+    expandable_fields = FilmListSerializer.expandable_fields
+    score = serializers.FloatField(source="classement.score", read_only=True)
 
     class Meta:
         model = Film
-        fields = ("id", "titre", "description", "evaluation","statut")
+        fields = ("id", "titre", "date_sortie", "statut", "note_moyenne", "nb_notations", "score")
 
-class FilmDetailSerializer(serializers.ModelSerializer):
+class FilmDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    prefetch_related_fields = (
+        Prefetch("auteurs", queryset=AuteurProfile.objects.select_related("user")),
+    )
+    field_sources = {"histogramme": tuple(f"nb_notes_{i}" for i in range(1, 6))}
     auteurs = AuteurListSerializer(many=True, read_only=True)
+    histogramme = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     class Meta:
         model = Film
-        fields = ("id", "titre", "description", "evaluation","statut",'auteurs')
+        fields = ("id", "titre", "description", "evaluation","statut",
+                  "note_moyenne", "nb_notations", "histogramme", 'auteurs')
 
 class FilmModifSerializer(serializers.ModelSerializer):
+    prefetch_related_fields = ("auteurs",)
+
     class Meta:
         model = Film
         fields = ("id", "titre", "description", "evaluation","statut",'auteurs')
@@ -62,7 +202,40 @@ class FilmModifSerializer(serializers.ModelSerializer):
 class FavoriFilmAddSerializer(serializers.Serializer):
     film_id = serializers.IntegerField()
 
-class SpectateurReadSerializer(serializers.ModelSerializer):
+# Nombre maximal d'éléments par requête groupée
+MAX_BULK = 500
+
+class FavorisBulkSerializer(serializers.Serializer):
+    ajouter = serializers.ListField(child=serializers.IntegerField(), required=False, default=list,
+                                    max_length=MAX_BULK)
+    retirer = serializers.ListField(child=serializers.IntegerField(), required=False, default=list,
+                                    max_length=MAX_BULK)
+
+    def validate(self, attrs):
+        if set(attrs["ajouter"]) & set(attrs["retirer"]):
+            raise serializers.ValidationError("Un film ne peut pas être à la fois ajouté et retiré.")
+        return attrs
+
+class NotationFilmBulkItemSerializer(serializers.Serializer):
+    """
+        Un élément de POST /spectateurs/notations/film/bulk/ (validé sans requête SQL).
+    """
+    film = serializers.IntegerField()
+    note = serializers.IntegerField(min_value=1, max_value=5)
+    commentaire = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class NotationAuteurBulkItemSerializer(serializers.Serializer):
+    auteur = serializers.IntegerField()
+    note = serializers.IntegerField(min_value=1, max_value=5)
+    commentaire = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class SpectateurReadSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    select_related_fields = ("user",)
+    prefetch_related_fields = (
+        "favoris_films",
+        Prefetch("favoris_auteurs", queryset=AuteurProfile.objects.select_related("user")),
+    )
+
     user = CustomUserReadSerializer(read_only=True)
 
     favoris_films = FilmListSerializer(many=True, read_only=True)
@@ -72,6 +245,45 @@ class SpectateurReadSerializer(serializers.ModelSerializer):
         model = SpectateurProfile
         fields = ("id", "user", "bio", "avatar", "favoris_films", "favoris_auteurs")
 
+class SpectateurListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+        Liste des spectateurs : favoris sous forme d'ids et de compteurs,
+        films / auteurs complets avec ``?expand=favoris_films,favoris_auteurs``.
+    """
+    select_related_fields = ("user",)
+    expandable_fields = {
+        "favoris_films": Expandable(
+            FilmListSerializer, many=True,
+            prefetch_related=("favoris_films",),
+            default_prefetch=(Prefetch("favoris_films", queryset=Film.objects.only("id")),),
+        ),
+        "favoris_auteurs": Expandable(
+            AuteurListSerializer, many=True,
+            prefetch_related=(Prefetch("favoris_auteurs", queryset=AuteurProfile.objects.select_related("user")),),
+            default_prefetch=(Prefetch("favoris_auteurs", queryset=AuteurProfile.objects.only("id")),),
+        ),
+    }
+
+    field_sources = {"nb_favoris_films": ("favoris_films",), "nb_favoris_auteurs": ("favoris_auteurs",)}
+
+    username = serializers.CharField(source="user.username", read_only=True)
+    nb_favoris_films = serializers.SerializerMethodField()
+    nb_favoris_auteurs = serializers.SerializerMethodField()
+    favoris_films = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    favoris_auteurs = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = SpectateurProfile
+        fields = ("id", "username", "bio", "avatar", "nb_favoris_films", "nb_favoris_auteurs",
+                  "favoris_films", "favoris_auteurs")
+
+    # Relations préchargées : len() ne déclenche pas de requête
+    def get_nb_favoris_films(self, obj):
+        return len(obj.favoris_films.all())
+
+    def get_nb_favoris_auteurs(self, obj):
+        return len(obj.favoris_auteurs.all())
+
 class SpectateurSignupSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     username = serializers.CharField(
@@ -126,7 +338,8 @@ class RateFilmSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         req = self.context.get("request")
         try:
-            spectateur = SpectateurProfile.objects.get(user=req.user)
+            # Chargé avec l'utilisateur par l'authentification (core.authentication)
+            spectateur = req.user.spectateur_profile
         except SpectateurProfile.DoesNotExist:
             raise serializers.ValidationError("Profil spectateur introuvable.")
 
@@ -136,6 +349,12 @@ class RateFilmSerializer(serializers.ModelSerializer):
         attrs["spectateur"] = spectateur
         return attrs
 
+    @transaction.atomic
+    def create(self, validated_data):
+        instance = super().create(validated_data)
+        add_note(Film, instance.film_id, instance.note)
+        return instance
+
     # def create(self, validated_data):
     #     spectateur = validated_data.pop("spectateur")
     #     film = validated_data["film"]
@@ -161,7 +380,8 @@ class NotationAuteurSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         req = self.context.get("request")
         try:
-            spectateur = SpectateurProfile.objects.get(user=req.user)
+            # Chargé avec l'utilisateur par l'authentification (core.authentication)
+            spectateur = req.user.spectateur_profile
         except SpectateurProfile.DoesNotExist:
             raise serializers.ValidationError("Profil spectateur introuvable.")
 
@@ -170,3 +390,9 @@ class NotationAuteurSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Vous avez déjà noté cette auteur.")
         attrs["spectateur"] = spectateur
         return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        instance = super().create(validated_data)
+        add_note(AuteurProfile, instance.auteur_id, instance.note)
+        return instance
@@ -0,0 +1,105 @@
+"""
+Invalidation du cache des listes (``movies.cache``) sur toute écriture ORM :
+API, admin, shell. Les écritures en masse (``bulk_create``, ``update``) ne
+déclenchent pas de signaux et appellent ``invalidate`` elles-mêmes.
+
+Les facettes des films (``movies/facettes.py``) sont ajustées à chaque
+enregistrement / suppression de film.
+
+Les changements qui modifient la fiche détaillée d'un objet sans l'enregistrer
+(liens film/auteur, username ou nom de l'utilisateur, suppression d'un film) avancent son ``updated_at``.
+"""
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import AUTEURS, AUTOCOMPLETE, FILMS, invalidate
+from .facettes import FACETTE_FIELDS, apply_deltas, diff, film_values
+from .models import AuteurProfile, Film
+
+
+@receiver([post_save, post_delete], sender=Film)
+def film_changed(sender, **kwargs):
+    invalidate(FILMS, AUTOCOMPLETE)
+
+
+@receiver(pre_save, sender=Film)
+def film_facettes_before(sender, instance, update_fields=None, **kwargs):
+    # Valeurs avant enregistrement (None : nouveau film, False : facettes non concernées)
+    if instance.pk is None:
+        instance._facettes_before = None
+    elif update_fields is not None and not set(update_fields) & set(FACETTE_FIELDS):
+        instance._facettes_before = False
+    else:
+        instance._facettes_before = Film.objects.filter(pk=instance.pk).values(*FACETTE_FIELDS).first()
+
+
+@receiver(post_save, sender=Film)
+def film_facettes_after(sender, instance, **kwargs):
+    before = getattr(instance, "_facettes_before", None)
+    if before is not False:
+        apply_deltas(diff(before, film_values(instance)))
+
+
+@receiver(post_delete, sender=Film)
+def film_facettes_deleted(sender, instance, **kwargs):
+    apply_deltas(diff(film_values(instance), None))
+
+
+@receiver(pre_delete, sender=Film)
+def film_deleted(sender, instance, **kwargs):
+    # La fiche de chaque auteur liste ses films
+    AuteurProfile.objects.filter(films=instance).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=AuteurProfile)
+def auteur_changed(sender, **kwargs):
+    invalidate(AUTEURS, AUTOCOMPLETE)
+
+
+@receiver(pre_delete, sender=AuteurProfile)
+def auteur_deleted(sender, instance, **kwargs):
+    Film.objects.filter(auteurs=instance).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Film.auteurs.through)
+def film_auteurs_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action == "pre_clear":
+        # pk_set n'est pas fourni pour clear() : on relève les objets liés avant suppression
+        instance._cleared_pks = set(getattr(instance, "auteurs" if not reverse else "films")
+                                    .values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action == "post_clear":
+        pk_set = getattr(instance, "_cleared_pks", set())
+    now = timezone.now()
+    type(instance).objects.filter(pk=instance.pk).update(updated_at=now)
+    if pk_set:
+        model.objects.filter(pk__in=pk_set).update(updated_at=now)
+    invalidate(FILMS, AUTEURS)
+
+
+# Champs de l'utilisateur affichés avec les auteurs
+USER_FIELDS = ("username", "first_name", "last_name")
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def user_before(sender, instance, update_fields=None, **kwargs):
+    # Un nouvel utilisateur n'a pas encore de profil auteur ; la connexion
+    # (update_fields=["last_login"]) ne touche à aucun champ affiché
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(USER_FIELDS)):
+        instance._user_fields_changed = False
+        return
+    before = sender.objects.filter(pk=instance.pk).values_list(*USER_FIELDS).first()
+    instance._user_fields_changed = before != tuple(getattr(instance, field) for field in USER_FIELDS)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    # Les fiches et la liste des auteurs affichent le username
+    if getattr(instance, "_user_fields_changed", False):
+        instance._user_fields_changed = False
+        AuteurProfile.objects.filter(user=instance).update(updated_at=timezone.now())
+        invalidate(AUTEURS, AUTOCOMPLETE)
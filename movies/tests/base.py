@@ -0,0 +1,98 @@
+import json
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from movies.classement import rebuild_classement
+from movies.facettes import rebuild_facettes
+from movies.models import AuteurProfile, Film, NotationAuteur, NotationFilm, SpectateurProfile
+from movies.notations import rebuild_notation_stats
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ApiTestCase(APITestCase):
+    """
+        Outils communs : authentification par JWT, cache vidé à chaque test,
+        lecture des réponses en flux.
+    """
+    password = "Secret123!"
+
+    def setUp(self):
+        # Les listes sont mises en cache : chaque test part d'un cache vide
+        cache.clear()
+
+    def authenticate(self, user):
+        if user is None:
+            self.client.credentials()
+        else:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    @staticmethod
+    def read_stream(response):
+        content = b"".join(response.streaming_content)
+        content_type = response["Content-Type"]
+        if content_type == "application/json":
+            return json.loads(content)
+        if content_type == "application/x-ndjson":
+            return [json.loads(line) for line in content.splitlines()]
+        if content_type.startswith("text/"):
+            return content.decode()
+        return content
+
+    def get(self, url, user=None, status=200, **kwargs):
+        self.authenticate(user)
+        response = self.client.get(url, **kwargs)
+        if response.streaming:
+            response.data = self.read_stream(response)
+        self.assertEqual(response.status_code, status, getattr(response, "content", b"")[:500])
+        return response
+
+
+class CatalogTestCase(ApiTestCase):
+    """
+        Petit catalogue aux valeurs connues pour les tests fonctionnels :
+        3 films, 2 auteurs (dont un sans utilisateur), 2 spectateurs notés.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", cls.password)
+        cls.user_auteur = User.objects.create_user("agnes", password=cls.password, role="auteur")
+
+        cls.varda = AuteurProfile.objects.create(nom="Agnès Varda", user=cls.user_auteur,
+                                                 date_naissance=date(1928, 5, 30))
+        cls.demy = AuteurProfile.objects.create(nom="Jacques Demy", date_naissance=date(1931, 6, 5),
+                                                source="tmdb")
+        cls.cleo = Film.objects.create(titre="Cléo de 5 à 7", description="Une chanteuse attend un diagnostic",
+                                       date_sortie=date(1962, 4, 11), statut="sorti")
+        cls.parapluies = Film.objects.create(titre="Les Parapluies de Cherbourg", description="Comédie musicale",
+                                             date_sortie=date(1964, 2, 19), statut="sorti", source="tmdb")
+        cls.sans_toit = Film.objects.create(titre="Sans toit ni loi", description="Une vagabonde en hiver",
+                                            date_sortie=date(1985, 12, 4), statut="salle")
+        cls.cleo.auteurs.add(cls.varda)
+        cls.parapluies.auteurs.add(cls.demy)
+        cls.sans_toit.auteurs.add(cls.varda, cls.demy)
+
+        cls.alice = SpectateurProfile.objects.create(
+            user=User.objects.create_user("alice", password=cls.password, role="spectateur"), bio="cinéphile")
+        cls.bob = SpectateurProfile.objects.create(
+            user=User.objects.create_user("bob", password=cls.password, role="spectateur"), bio="")
+        cls.alice.favoris_films.add(cls.cleo, cls.sans_toit)
+        cls.alice.favoris_auteurs.add(cls.varda)
+
+        NotationFilm.objects.bulk_create([
+            NotationFilm(spectateur=cls.alice, film=cls.cleo, note=5),
+            NotationFilm(spectateur=cls.bob, film=cls.cleo, note=4),
+            NotationFilm(spectateur=cls.alice, film=cls.parapluies, note=3),
+        ])
+        NotationAuteur.objects.create(spectateur=cls.alice, auteur=cls.varda, note=5)
+        rebuild_notation_stats(Film)
+        rebuild_notation_stats(AuteurProfile)
+        rebuild_classement()
+        rebuild_facettes()
@@ -0,0 +1,32 @@
+from .base import CatalogTestCase
+
+
+class FilmAdminTests(CatalogTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def test_filtres_facettes(self):
+        response = self.client.get("/admin/movies/film/", {"statut__exact": "sorti"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 2)
+        self.assertContains(response, "Sorti (2)")
+        self.assertContains(response, "1985 (1)")
+
+    def titres(self, terms):
+        response = self.client.get("/admin/movies/film/", {"q": terms})
+        self.assertEqual(response.status_code, 200)
+        return sorted(film.titre for film in response.context["cl"].result_list)
+
+    def test_recherche_plein_texte(self):
+        self.assertEqual(self.titres("chanteuse"), ["Cléo de 5 à 7"])
+        self.assertEqual(self.titres("parapluies"), ["Les Parapluies de Cherbourg"])
+
+    def test_recherche_auteur(self):
+        # Par le username / nom de l'utilisateur auteur, en plus de l'index plein texte
+        self.assertEqual(self.titres("agnes"), ["Cléo de 5 à 7", "Sans toit ni loi"])
+        self.user_auteur.first_name, self.user_auteur.last_name = "Agnès", "Varda"
+        self.user_auteur.save()
+        self.assertEqual(self.titres("agnès varda"), ["Cléo de 5 à 7", "Sans toit ni loi"])
+        self.assertEqual(self.titres("varda inconnu"), [])
@@ -0,0 +1,403 @@
+import io
+import os
+import random
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.authentication import StatelessJWTAuthentication
+from core.serializers import TokenObtainPairSerializer
+from movies import autocomplete
+from movies.classement import moyenne_globale, rebuild_classement
+from movies.facettes import rebuild_facettes
+from movies.models import AuteurProfile, Film, SpectateurProfile, NotationFilm, NotationAuteur
+from movies.notations import rebuild_notation_stats
+from .base import ApiTestCase, User
+
+NB_FILMS = 2000
+NB_AUTEURS = 500
+NB_SPECTATEURS = 300
+NB_NOTATIONS_FILMS = 6000
+NB_NOTATIONS_AUTEURS = 1500
+NB_FAVORIS = 25
+
+# Plafond de temps par requête (ms), multipliable pour les machines lentes
+TIME_FACTOR = float(os.getenv("PERF_BUDGET_TIME_FACTOR", 1))
+DEFAULT_MS = 300
+
+
+@tag("budget")
+class BudgetTestCase(ApiTestCase):
+    """
+        Base des tests de performance : un catalogue réaliste est créé une fois
+        par classe, chaque appel d'API est borné en nombre de requêtes SQL et en durée.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        password = make_password(cls.password)
+
+        users = User.objects.bulk_create(
+            [User(username=f"auteur{i}", password=password, role="auteur") for i in range(NB_AUTEURS // 5)]
+            + [User(username=f"spectateur{i}", password=password, role="spectateur") for i in range(NB_SPECTATEURS)]
+        )
+        auteur_users, spectateur_users = users[:NB_AUTEURS // 5], users[NB_AUTEURS // 5:]
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", cls.password)
+
+        cls.auteurs = AuteurProfile.objects.bulk_create([
+            AuteurProfile(nom=f"Auteur {i}", user=auteur_users[i] if i < len(auteur_users) else None,
+                          date_naissance=date(1940, 1, 1) + timedelta(days=rng.randrange(20000)),
+                          source=rng.choice(["admin", "tmdb"]))
+            for i in range(NB_AUTEURS)
+        ])
+        cls.films = Film.objects.bulk_create([
+            Film(titre=f"Film {i}", description=f"Description du film {i}",
+                 date_sortie=date(1970, 1, 1) + timedelta(days=rng.randrange(20000)),
+                 statut=rng.choice(["production", "salle", "sorti"]),
+                 source=rng.choice(["admin", "tmdb"]))
+            for i in range(NB_FILMS)
+        ])
+        Film.auteurs.through.objects.bulk_create([
+            Film.auteurs.through(film_id=f.id, auteurprofile_id=a.id)
+            for f in cls.films for a in rng.sample(cls.auteurs, 3)
+        ])
+
+        cls.spectateurs = SpectateurProfile.objects.bulk_create(
+            [SpectateurProfile(user=u, bio="bio") for u in spectateur_users]
+        )
+        SpectateurProfile.favoris_films.through.objects.bulk_create([
+            SpectateurProfile.favoris_films.through(spectateurprofile_id=s.id, film_id=f.id)
+            for s in cls.spectateurs for f in rng.sample(cls.films, NB_FAVORIS)
+        ])
+        SpectateurProfile.favoris_auteurs.through.objects.bulk_create([
+            SpectateurProfile.favoris_auteurs.through(spectateurprofile_id=s.id, auteurprofile_id=a.id)
+            for s in cls.spectateurs for a in rng.sample(cls.auteurs, NB_FAVORIS)
+        ])
+
+        pairs = {(rng.choice(cls.spectateurs).id, rng.choice(cls.films).id) for _ in range(NB_NOTATIONS_FILMS)}
+        NotationFilm.objects.bulk_create(
+            [NotationFilm(spectateur_id=s, film_id=f, note=rng.randint(1, 5)) for s, f in pairs]
+        )
+        pairs = {(rng.choice(cls.spectateurs).id, rng.choice(cls.auteurs).id) for _ in range(NB_NOTATIONS_AUTEURS)}
+        NotationAuteur.objects.bulk_create(
+            [NotationAuteur(spectateur_id=s, auteur_id=a, note=rng.randint(1, 5)) for s, a in pairs]
+        )
+        rebuild_notation_stats(Film)
+        rebuild_notation_stats(AuteurProfile)
+        rebuild_classement()
+        rebuild_facettes()
+
+        cls.spectateur = cls.spectateurs[0]
+        cls.film = cls.films[0]
+        cls.auteur = cls.auteurs[0]
+        # Film et auteur que le spectateur principal n'a pas encore notés
+        cls.film_libre = Film.objects.exclude(notations__spectateur=cls.spectateur).first()
+        cls.auteur_libre = AuteurProfile.objects.exclude(notations__spectateur=cls.spectateur).first()
+
+    def assertBudget(self, method, url, queries, ms=DEFAULT_MS, user=None, status=200, **kwargs):
+        """
+            Exécute la requête et vérifie le code HTTP, le nombre maximal
+            de requêtes SQL et la durée maximale.
+        """
+        self.authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(url, format="json", **kwargs)
+            if response.streaming:
+                # Les requêtes SQL d'une réponse en flux ont lieu pendant sa lecture
+                response.data = self.read_stream(response)
+            elapsed = (time.perf_counter() - start) * 1000
+        self.assertEqual(response.status_code, status, getattr(response, "content", b"")[:500])
+        self.assertLessEqual(
+            len(ctx.captured_queries), queries,
+            f"{method.upper()} {url} : {len(ctx.captured_queries)} requêtes SQL (budget {queries})\n"
+            + "\n".join(q["sql"] for q in ctx.captured_queries),
+        )
+        self.assertLess(elapsed, ms * TIME_FACTOR, f"{method.upper()} {url} : {elapsed:.0f} ms (plafond {ms} ms)")
+        return response
+
+
+class FilmBudgetTests(BudgetTestCase):
+
+    def test_list(self):
+        self.assertBudget("get", "/films/", 2)
+
+    def test_list_max_page_size(self):
+        self.assertBudget("get", "/films/?page=20&page_size=100", 2)
+
+    def test_list_sans_count(self):
+        self.assertBudget("get", "/films/?page=50&count=false", 1)
+
+    def test_list_curseur(self):
+        response = self.assertBudget("get", "/films/?pagination=cursor&page_size=100", 1)
+        self.assertBudget("get", response.data["next"], 1)
+
+    def test_recherche(self):
+        response = self.assertBudget("get", "/films/?search=film 1234", 2)
+        self.assertEqual(response.data["results"][0]["titre"], "Film 1234")
+        response = self.assertBudget("get", "/films/?search=description", 2)
+        self.assertEqual(response.data["count"], NB_FILMS)
+
+    def test_facettes(self):
+        response = self.assertBudget("get", "/films/facets/", 1)
+        self.assertEqual(sum(response.data["annee"].values()), NB_FILMS)
+        self.assertEqual(sum(response.data["statut"].values()), NB_FILMS)
+
+        annee = str(self.film.date_sortie.year)
+        statut = "salle" if self.film.statut != "salle" else "sorti"
+        self.assertBudget("patch", f"/films/{self.film.id}/", 10, user=self.admin, data={"statut": statut})
+        film = Film.objects.get(pk=self.film.pk)
+        film.date_sortie = date(1969, 7, 21)
+        film.save()
+        after = self.assertBudget("get", "/films/facets/", 1).data
+        self.assertEqual(after["annee"]["1969"], 1)
+        self.assertEqual(after["annee"].get(annee, 0), response.data["annee"][annee] - 1)
+        self.assertEqual(after["statut"][statut], response.data["statut"][statut] + 1)
+
+    def test_list_annee(self):
+        self.assertBudget("get", f"/films/?anne_sortie={self.film.date_sortie.year}", 3, user=self.spectateur.user)
+
+    def test_retrieve(self):
+        self.assertBudget("get", f"/films/{self.film.id}/", 4, user=self.spectateur.user)
+
+    def test_retrieve_conditionnel(self):
+        response = self.assertBudget("get", f"/films/{self.film.id}/", 4, user=self.spectateur.user)
+        self.assertBudget("get", f"/films/{self.film.id}/", 2, user=self.spectateur.user, status=304,
+                          HTTP_IF_NONE_MATCH=response["ETag"])
+
+        # Un auteur du film est renommé : la fiche du film change
+        auteur = self.film.auteurs.filter(user__isnull=False).first() or self.film.auteurs.first()
+        auteur.nom = "Nouveau nom"
+        auteur.save()
+        self.assertBudget("get", f"/films/{self.film.id}/", 4, user=self.spectateur.user,
+                          HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_top(self):
+        self.assertBudget("get", "/films/top/?page_size=100", 2)
+        self.assertBudget("get", "/films/top/?statut=sorti", 2)
+
+    def test_update(self):
+        self.assertBudget("patch", f"/films/{self.film.id}/", 10, user=self.admin, data={"statut": "sorti"})
+
+    def test_list_cache(self):
+        response = self.assertBudget("get", "/films/?page=3", 2)
+        self.assertBudget("get", "/films/?page=3", 0)
+        self.assertBudget("get", "/films/?page=3", 0, status=304, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertBudget("get", "/films/?page=3", 0, status=304, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertBudget("patch", f"/films/{self.film.id}/", 6, user=self.admin, data={"titre": "Nouveau titre"})
+        self.assertBudget("get", "/films/?page=3", 2, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+class AuteurBudgetTests(BudgetTestCase):
+
+    def test_list(self):
+        self.assertBudget("get", "/auteurs/?page_size=100", 2)
+
+    def test_recherche(self):
+        response = self.assertBudget("get", "/auteurs/?search=auteur 42", 2)
+        self.assertEqual(response.data["results"][0]["nom"], "Auteur 42")
+
+    def test_list_curseur(self):
+        response = self.assertBudget("get", "/auteurs/?pagination=cursor", 1)
+        self.assertBudget("get", response.data["next"], 1)
+
+    def test_retrieve(self):
+        self.assertBudget("get", f"/auteurs/{self.auteur.id}/", 4, user=self.spectateur.user)
+
+    def test_retrieve_conditionnel(self):
+        response = self.assertBudget("get", f"/auteurs/{self.auteur.id}/", 4, user=self.spectateur.user)
+        self.assertBudget("get", f"/auteurs/{self.auteur.id}/", 2, user=self.spectateur.user, status=304,
+                          HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+
+        # Un film est retiré de la filmographie : la fiche de l'auteur change
+        self.auteur.films.remove(self.auteur.films.first())
+        self.assertBudget("get", f"/auteurs/{self.auteur.id}/", 4, user=self.spectateur.user,
+                          HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_update(self):
+        self.assertBudget("patch", f"/auteurs/{self.auteur.id}/", 3, user=self.admin, data={"nom": "Nouveau nom"})
+
+
+class AutocompleteBudgetTests(BudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Index construits à la première recherche ; reconstruction synchrone : le
+        # thread d'arrière-plan ne verrait pas les données de la transaction du test
+        autocomplete._indexes.clear()
+        autocomplete._rebuilding.clear()
+        patcher = mock.patch.object(autocomplete, "rebuild_later", side_effect=autocomplete.rebuild)
+        self.rebuild_later = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_autocomplete(self):
+        self.assertBudget("get", "/autocomplete/?q=film", 2)
+        response = self.assertBudget("get", "/autocomplete/?q=film 123", 0)
+        self.assertEqual(response.json()["films"][0]["titre"], "Film 123")
+        response = self.assertBudget("get", "/autocomplete/?q=aut&type=auteurs&limit=5", 0)
+        self.assertEqual(len(response.json()["auteurs"]), 5)
+        self.assertNotIn("films", response.json())
+
+    def test_autocomplete_invalidation(self):
+        self.assertBudget("get", "/autocomplete/?q=zorglub", 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Film.objects.filter(pk=self.film.pk).update(titre="Zorglub")
+            Film.objects.get(pk=self.film.pk).save()
+        response = self.assertBudget("get", "/autocomplete/?q=zorg", 2)
+        self.assertEqual(response.json()["films"], [{"id": self.film.id, "titre": "Zorglub",
+                                                     "annee": self.film.date_sortie.year}])
+
+    def test_reconstruction_en_arriere_plan(self):
+        self.assertBudget("get", "/autocomplete/?q=zorglub", 2)
+        self.rebuild_later.side_effect = None
+        with self.captureOnCommitCallbacks(execute=True):
+            Film.objects.filter(pk=self.film.pk).update(titre="Zorglub")
+            Film.objects.get(pk=self.film.pk).save()
+        # Index précédent servi sans requête SQL, une seule reconstruction lancée par index
+        for _ in range(3):
+            response = self.assertBudget("get", "/autocomplete/?q=zorg", 0)
+            self.assertEqual(response.json()["films"], [])
+        self.assertEqual(sorted(call.args[0] for call in self.rebuild_later.call_args_list), ["auteurs", "films"])
+
+
+class SpectateurBudgetTests(BudgetTestCase):
+
+    def test_list_admin(self):
+        response = self.assertBudget("get", "/spectateurs/?page_size=100", 4, user=self.admin)
+        row = response.data["results"][0]
+        self.assertEqual(row["nb_favoris_films"], NB_FAVORIS)
+        self.assertEqual(set(row["favoris_films"]),
+                         set(self.spectateurs[0].favoris_films.values_list("id", flat=True)))
+        self.assertBudget("get", response.data["next"], 4, user=self.admin)
+
+    def test_list_admin_expand(self):
+        response = self.assertBudget("get", "/spectateurs/?expand=favoris_films,favoris_auteurs", 4,
+                                     user=self.admin)
+        row = response.data["results"][0]
+        self.assertEqual(len(row["favoris_films"]), NB_FAVORIS)
+        self.assertIn("titre", row["favoris_films"][0])
+        self.assertIn("nom", row["favoris_auteurs"][0])
+
+    def test_retrieve_admin(self):
+        self.assertBudget("get", f"/spectateurs/{self.spectateur.id}/", 4, user=self.admin)
+
+    def test_me(self):
+        self.assertBudget("get", "/spectateurs/me/", 3, user=self.spectateur.user)
+
+    def test_favoris(self):
+        ids = list(self.spectateur.favoris_films.order_by("-id").values_list("id", flat=True))
+        response = self.assertBudget("get", "/spectateurs/favoris/?page_size=5", 2, user=self.spectateur.user)
+        self.assertEqual([f["id"] for f in response.data["results"]], ids[:5])
+        self.assertNotIn("auteurs", response.data["results"][0])
+        response = self.assertBudget("get", response.data["next"], 2, user=self.spectateur.user)
+        self.assertEqual([f["id"] for f in response.data["results"]], ids[5:10])
+
+    def test_favoris_expand_stream(self):
+        response = self.assertBudget("get", "/spectateurs/favoris/?expand=auteurs", 3, user=self.spectateur.user)
+        self.assertEqual(len(response.data["results"][0]["auteurs"]), 3)
+        # Flux au format de la fiche film : auteurs préchargés une fois par lot
+        response = self.assertBudget("get", "/spectateurs/favoris/?stream=true", 3, user=self.spectateur.user)
+        self.assertEqual(len(response.data), NB_FAVORIS)
+        self.assertEqual(len(response.data[0]["auteurs"]), 3)
+
+    def test_favoris_add(self):
+        self.assertBudget("post", "/spectateurs/favoris/", 3, user=self.spectateur.user, status=204,
+                          data={"film_id": self.film_libre.id})
+
+    def test_favoris_remove(self):
+        film_id = self.spectateur.favoris_films.values_list("id", flat=True).first()
+        self.assertBudget("delete", f"/spectateurs/favoris/{film_id}/", 3, user=self.spectateur.user, status=204)
+
+    def test_favoris_bulk(self):
+        deja = list(self.spectateur.favoris_films.values_list("id", flat=True)[:2])
+        nouveaux = list(Film.objects.exclude(favoris_spectateurs=self.spectateur).values_list("id", flat=True)[:200])
+        response = self.assertBudget("post", "/spectateurs/favoris/bulk/", 7, user=self.spectateur.user,
+                                     data={"ajouter": nouveaux + [deja[0], 999999], "retirer": [deja[1]]})
+        statuts = [r["statut"] for r in response.data["resultats"]]
+        self.assertEqual(statuts, ["ajouté"] * 200 + ["déjà présent", "introuvable", "retiré"])
+        self.assertEqual(self.spectateur.favoris_films.count(), NB_FAVORIS + 200 - 1)
+
+    def test_noter_films_bulk(self):
+        moyenne_globale()
+        libres = list(Film.objects.exclude(notations__spectateur=self.spectateur).values_list("id", flat=True)[:100])
+        deja = NotationFilm.objects.filter(spectateur=self.spectateur).values_list("film_id", flat=True).first()
+        data = [{"film": f, "note": 1 + f % 5} for f in libres] + [{"film": deja, "note": 3}, {"film": libres[0], "note": 9}]
+        response = self.assertBudget("post", "/spectateurs/notations/film/bulk/", 12, user=self.spectateur.user,
+                                     data=data)
+        statuts = [r["statut"] for r in response.data["resultats"]]
+        self.assertEqual(statuts, ["créé"] * 100 + ["erreur", "erreur"])
+        film = Film.objects.get(pk=libres[0])
+        self.assertEqual(film.nb_notations, film.notations.count())
+
+    def test_noter_film(self):
+        moyenne_globale()  # mise en cache pour une heure en production
+        self.assertBudget("post", "/spectateurs/notations/film/", 12, user=self.spectateur.user, status=201,
+                          data={"film": self.film_libre.id, "note": 4})
+
+    def test_noter_auteur(self):
+        self.assertBudget("post", "/spectateurs/notations/auteur/", 10, user=self.spectateur.user, status=201,
+                          data={"auteur": self.auteur_libre.id, "note": 4})
+
+
+class QueryPlanTests(BudgetTestCase):
+
+    def test_aucun_parcours_complet(self):
+        call_command("check_query_plans", fail=True, stdout=io.StringIO())
+
+
+class AuthBudgetTests(BudgetTestCase):
+
+    def test_ping(self):
+        self.assertBudget("get", "/ping/", 0)
+
+    def test_signup(self):
+        self.assertBudget("post", "/auth/signup/", 6, status=201,
+                          data={"username": "nouveau", "email": "nouveau@example.com", "password": "Secret123!"})
+
+    def test_token(self):
+        self.assertBudget("post", "/auth/token/", 2,
+                          data={"username": self.spectateur.user.username, "password": self.password})
+
+    def test_token_refresh_verify_logout(self):
+        refresh = RefreshToken.for_user(self.spectateur.user)
+        self.assertBudget("post", "/auth/token/refresh/", 1, data={"refresh": str(refresh)})
+        self.assertBudget("post", "/auth/token/verify/", 0, data={"token": str(refresh.access_token)})
+        self.assertBudget("post", "/auth/logout/", 0, data={"refresh": str(refresh)})
+
+
+@mock.patch.object(APIView, "authentication_classes", [StatelessJWTAuthentication])
+class StatelessAuthBudgetTests(BudgetTestCase):
+    """
+        JWT_STATELESS : aucune requête d'authentification, l'utilisateur vient des claims.
+    """
+
+    def authenticate(self, user):
+        self.client.credentials()
+        if user is not None:
+            access = TokenObtainPairSerializer.get_token(user).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_me(self):
+        self.assertBudget("get", "/spectateurs/me/", 3, user=self.spectateur.user)
+
+    def test_favoris(self):
+        self.assertBudget("get", "/spectateurs/favoris/", 1, user=self.spectateur.user)
+
+    def test_noter_film(self):
+        moyenne_globale()
+        self.assertBudget("post", "/spectateurs/notations/film/", 11, user=self.spectateur.user, status=201,
+                          data={"film": self.film_libre.id, "note": 4})
+
+    def test_admin(self):
+        self.assertBudget("get", "/spectateurs/", 3, user=self.admin)
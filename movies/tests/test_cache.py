@@ -0,0 +1,57 @@
+from movies.cache import AUTEURS, AUTOCOMPLETE, get_version
+from movies.models import AuteurProfile
+from .base import CatalogTestCase
+
+
+class InvalidationTests(CatalogTestCase):
+    """
+        Invalidation du cache des listes et ``updated_at`` des fiches par les signaux.
+    """
+
+    def versions(self):
+        return get_version(AUTEURS), get_version(AUTOCOMPLETE)
+
+    def updated_at(self):
+        return AuteurProfile.objects.get(pk=self.varda.pk).updated_at
+
+    def test_connexion(self):
+        # La connexion (admin, session) ne modifie que last_login : ni invalidation, ni nouvel ETag
+        before, updated_at = self.versions(), self.updated_at()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(self.client.login(username="agnes", password=self.password))
+        self.user_auteur.refresh_from_db()
+        self.assertIsNotNone(self.user_auteur.last_login)
+        self.assertEqual((self.versions(), self.updated_at()), (before, updated_at))
+
+        # Enregistrement complet sans changement de nom : idem
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user_auteur.save()
+        self.assertEqual((self.versions(), self.updated_at()), (before, updated_at))
+
+    def test_renommage(self):
+        before, updated_at = self.versions(), self.updated_at()
+        self.user_auteur.username = "varda"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user_auteur.save(update_fields=["username"])
+        self.assertNotEqual(self.versions()[0], before[0])
+        self.assertNotEqual(self.versions()[1], before[1])
+        self.assertGreater(self.updated_at(), updated_at)
+        rows = {row["id"]: row for row in self.get("/auteurs/?fields=id,username").data["results"]}
+        self.assertEqual(rows[self.varda.id]["username"], "varda")
+
+
+class ConditionalRetrieveTests(CatalogTestCase):
+    """
+        ``ETag`` des fiches : un par représentation (``?fields=`` / ``?expand=``).
+    """
+
+    def test_etag_par_representation(self):
+        url, user = f"/films/{self.cleo.id}/", self.alice.user
+        etag = self.get(url, user=user)["ETag"]
+        self.get(url, user=user, HTTP_IF_NONE_MATCH=etag, status=304)
+        # Autre représentation : l'ETag de la fiche complète ne vaut pas pour elle
+        response = self.get(f"{url}?fields=id,titre", user=user, HTTP_IF_NONE_MATCH=etag, status=200)
+        self.assertEqual(response.data, {"id": self.cleo.id, "titre": "Cléo de 5 à 7"})
+        self.assertNotEqual(response["ETag"], etag)
+        # Mêmes paramètres, normalisés : même ETag
+        self.get(f"{url}?fields=titre,%20id,titre", user=user, HTTP_IF_NONE_MATCH=response["ETag"], status=304)
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+
+from movies.classement import rebuild_classement
+from movies.models import ClassementFilm, Film, NotationFilm, SpectateurProfile
+from movies.notations import rebuild_notation_stats
+from .base import CatalogTestCase
+
+User = get_user_model()
+
+
+class TopFilmsTests(CatalogTestCase):
+    """
+        ``/films/top/`` : films notés classés par score bayésien.
+    """
+
+    def scores(self):
+        return dict(ClassementFilm.objects.values_list("film_id", "score"))
+
+    def test_scores(self):
+        # C = moyenne de toutes les notes (5, 4, 3) = 4 ; m = CLASSEMENT_VOTES_MIN = 10
+        self.assertEqual(self.scores(), {self.cleo.id: (2 * 4.5 + 10 * 4) / 12,
+                                         self.parapluies.id: (1 * 3 + 10 * 4) / 11})
+        rows = self.get("/films/top/").data["results"]
+        self.assertEqual([(row["titre"], row["score"]) for row in rows], [
+            ("Cléo de 5 à 7", 49 / 12), ("Les Parapluies de Cherbourg", 43 / 11),
+        ])
+
+    def test_peu_de_votes(self):
+        # Même moyenne (5) : le film aux 8 votes passe devant le film au vote unique
+        peu = Film.objects.create(titre="Peu", date_sortie="2000-01-01")
+        beaucoup = Film.objects.create(titre="Beaucoup", date_sortie="2000-01-01")
+        spectateurs = [SpectateurProfile.objects.create(user=User.objects.create_user(f"s{i}"))
+                       for i in range(8)]
+        NotationFilm.objects.bulk_create([NotationFilm(spectateur=spectateurs[0], film=peu, note=5)] + [
+            NotationFilm(spectateur=spectateur, film=beaucoup, note=5) for spectateur in spectateurs
+        ])
+        rebuild_notation_stats(Film)
+        rebuild_classement()
+        rows = self.get("/films/top/?fields=titre,note_moyenne,nb_notations").data["results"]
+        self.assertEqual(rows, [
+            {"titre": "Beaucoup", "note_moyenne": 5.0, "nb_notations": 8},
+            {"titre": "Peu", "note_moyenne": 5.0, "nb_notations": 1},
+            {"titre": "Cléo de 5 à 7", "note_moyenne": 4.5, "nb_notations": 2},
+            {"titre": "Les Parapluies de Cherbourg", "note_moyenne": 3.0, "nb_notations": 1},
+        ])
+
+    def test_notation_incrementale(self):
+        # Score du film noté mis à jour à la notation, identique à un recalcul complet
+        self.authenticate(self.bob.user)
+        response = self.client.post("/spectateurs/notations/film/", {"film": self.sans_toit.id, "note": 5})
+        self.assertEqual(response.status_code, 201, response.content)
+        score = self.scores()[self.sans_toit.id]
+        # C = (5 + 4 + 3 + 5) / 4
+        self.assertAlmostEqual(score, (5 + 10 * 4.25) / 11)
+        rebuild_classement()
+        self.assertAlmostEqual(self.scores()[self.sans_toit.id], score)
+        self.assertEqual(self.get("/films/top/").data["results"][0]["titre"], "Sans toit ni loi")
+
+    def test_filtres(self):
+        rows = self.get("/films/top/?anne_sortie=1964&fields=titre").data["results"]
+        self.assertEqual(rows, [{"titre": "Les Parapluies de Cherbourg"}])
+        rows = self.get("/films/top/?statut=salle").data["results"]
+        self.assertEqual(rows, [])
+
+    def test_annee_invalide(self):
+        response = self.get("/films/top/?anne_sortie=abc", status=400)
+        self.assertEqual(list(response.data), ["anne_sortie"])
+        self.get("/films/?anne_sortie=1962x", user=self.alice.user, status=400)
@@ -0,0 +1,64 @@
+import csv
+import io
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from movies.export import pyarrow
+from movies.models import Film, NotationFilm
+from .base import CatalogTestCase
+
+
+class ExportTests(CatalogTestCase):
+
+    def test_ndjson(self):
+        lignes = self.get("/export/films.ndjson", user=self.admin).data
+        self.assertEqual([ligne["titre"] for ligne in lignes],
+                         ["Cléo de 5 à 7", "Les Parapluies de Cherbourg", "Sans toit ni loi"])
+        self.assertEqual(lignes[0]["date_sortie"], "1962-04-11")
+        self.assertEqual(lignes[0]["note_moyenne"], 4.5)
+        self.get("/export/films.ndjson", user=self.alice.user, status=403)
+        self.get("/export/inconnue.ndjson", user=self.admin, status=404)
+
+    def test_since(self):
+        since = timezone.now()
+        Film.objects.filter(pk=self.cleo.pk).update(updated_at=timezone.now())
+        url = f"/export/notations_films.csv?since={since.isoformat()}".replace("+", "%2B")
+        rows = list(csv.DictReader(io.StringIO(self.get(url, user=self.admin).data)))
+        self.assertEqual(sorted((row["film_id"], row["note"]) for row in rows),
+                         [(str(self.cleo.pk), "4"), (str(self.cleo.pk), "5")])
+
+    def test_since_invalide(self):
+        for since in ("hier", "2024-13-45", "2024-02-30T10:00:00"):
+            with self.subTest(since=since):
+                response = self.get(f"/export/films.ndjson?since={since}", user=self.admin, status=400)
+                self.assertEqual(list(response.data), ["since"])
+                with tempfile.TemporaryDirectory() as tmp, self.assertRaises(CommandError):
+                    call_command("export_catalog", tmp, since=since, stdout=io.StringIO())
+
+    def test_commande(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command("export_catalog", tmp, format="csv", stdout=io.StringIO())
+            with open(Path(tmp) / "film_auteurs.csv") as f:
+                self.assertEqual(list(csv.reader(f)), [
+                    ["film_id", "auteur_id"],
+                    [str(self.cleo.pk), str(self.varda.pk)],
+                    [str(self.parapluies.pk), str(self.demy.pk)],
+                    [str(self.sans_toit.pk), str(self.varda.pk)],
+                    [str(self.sans_toit.pk), str(self.demy.pk)],
+                ])
+            call_command("export_catalog", tmp, format="csv", incremental=True, stdout=io.StringIO())
+            with open(Path(tmp) / "films.csv") as f:
+                self.assertEqual(f.read().strip(), "id,tmdb_id,titre,description,date_sortie,statut,"
+                                                   "evaluation,source,note_moyenne,nb_notations,updated_at")
+
+    @skipUnless(pyarrow, "pyarrow non installé")
+    def test_parquet(self):
+        data = self.get("/export/notations_films.parquet", user=self.admin).data
+        table = pyarrow.parquet.read_table(pyarrow.BufferReader(data))
+        self.assertEqual(table.num_rows, NotationFilm.objects.count())
+        self.assertEqual(table.schema.field("note").type, pyarrow.int64())
+        self.assertEqual(sorted(table.column("note").to_pylist()), [3, 4, 5])
@@ -0,0 +1,59 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .base import CatalogTestCase
+
+
+class DynamicFieldsTests(CatalogTestCase):
+    """
+        ``?fields=`` / ``?expand=`` (DynamicFieldsMixin).
+    """
+
+    def test_fields_liste(self):
+        rows = self.get("/films/?fields=id,titre").data["results"]
+        self.assertCountEqual(rows, [
+            {"id": self.cleo.id, "titre": "Cléo de 5 à 7"},
+            {"id": self.parapluies.id, "titre": "Les Parapluies de Cherbourg"},
+            {"id": self.sans_toit.id, "titre": "Sans toit ni loi"},
+        ])
+        # Noms inconnus ignorés
+        rows = self.get("/auteurs/?pagination=cursor&fields=nom,inconnu").data["results"]
+        self.assertEqual(rows, [{"nom": "Agnès Varda"}, {"nom": "Jacques Demy"}])
+
+    def test_fields_detail(self):
+        # Ni auteurs préchargés, ni colonnes inutiles
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(f"/films/{self.cleo.id}/?fields=id,titre,histogramme", user=self.alice.user)
+        self.assertEqual(response.data, {
+            "id": self.cleo.id, "titre": "Cléo de 5 à 7",
+            "histogramme": {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1},
+        })
+        self.assertNotIn("description", queries[-1]["sql"])
+        self.assertFalse(any("movies_film_auteurs" in q["sql"] for q in queries[2:]))
+
+    def test_fields_relation(self):
+        rows = {row["id"]: row for row in self.get("/auteurs/?fields=id,username").data["results"]}
+        self.assertEqual(rows, {self.varda.id: {"id": self.varda.id, "username": "agnes"},
+                                self.demy.id: {"id": self.demy.id}})
+        rows = self.get("/films/top/?fields=id,score").data["results"]
+        self.assertEqual([set(row) for row in rows], [{"id", "score"}] * 2)
+        self.assertEqual(rows[0]["id"], self.cleo.id)
+
+    def test_expand(self):
+        rows = {row["id"]: row for row in self.get("/auteurs/?expand=films&fields=id,films").data["results"]}
+        self.assertCountEqual(rows[self.varda.id]["films"], [
+            {"id": self.cleo.id, "titre": "Cléo de 5 à 7", "date_sortie": "1962-04-11"},
+            {"id": self.sans_toit.id, "titre": "Sans toit ni loi", "date_sortie": "1985-12-04"},
+        ])
+        rows = self.get("/films/top/?expand=auteurs").data["results"]
+        self.assertEqual(rows[0]["auteurs"], [
+            {"id": self.varda.id, "username": "agnes", "email": None, "nom": "Agnès Varda",
+             "date_naissance": "1928-05-30", "source": "admin", "note_moyenne": 5.0, "nb_notations": 1},
+        ])
+
+    def test_fields_spectateur(self):
+        response = self.get("/spectateurs/me/?fields=id,bio", user=self.alice.user)
+        self.assertEqual(response.data, {"id": self.alice.id, "bio": "cinéphile"})
+        rows = self.get("/spectateurs/?fields=id,nb_favoris_films", user=self.admin).data["results"]
+        self.assertEqual(rows, [{"id": self.alice.id, "nb_favoris_films": 2},
+                                {"id": self.bob.id, "nb_favoris_films": 0}])
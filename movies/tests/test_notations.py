@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from movies import cache as api_cache
+from movies.models import AuteurProfile, Film
+from movies.notations import STATS_FIELDS, rebuild_notation_stats
+from .base import CatalogTestCase
+
+
+class NotationStatsTests(CatalogTestCase):
+    """
+        Agrégats (note moyenne, nombre, histogramme) tenus à jour à chaque notation.
+    """
+
+    def stats(self, model):
+        return {row.pop("id"): row for row in model.objects.order_by("id").values("id", *STATS_FIELDS)}
+
+    def post(self, url, data):
+        self.authenticate(self.bob.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
+        self.assertIn(response.status_code, (200, 201), response.content)
+        return response
+
+    def assertRebuildIdentique(self, model):
+        stats = self.stats(model)
+        rebuild_notation_stats(model)
+        self.assertEqual(self.stats(model), stats)
+
+    def test_valeurs_initiales(self):
+        cleo = Film.objects.get(pk=self.cleo.pk)
+        self.assertEqual((cleo.note_moyenne, cleo.nb_notations), (4.5, 2))
+        self.assertEqual(cleo.histogramme, {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1})
+        sans_toit = Film.objects.get(pk=self.sans_toit.pk)
+        self.assertEqual((sans_toit.note_moyenne, sans_toit.nb_notations), (None, 0))
+
+    def test_notation(self):
+        self.post("/spectateurs/notations/film/", {"film": self.parapluies.id, "note": 4})
+        film = Film.objects.get(pk=self.parapluies.pk)
+        self.assertEqual((film.note_moyenne, film.nb_notations), (3.5, 2))
+        self.assertEqual(film.histogramme, {"1": 0, "2": 0, "3": 1, "4": 1, "5": 0})
+        self.post("/spectateurs/notations/auteur/", {"auteur": self.demy.id, "note": 2})
+        demy = AuteurProfile.objects.get(pk=self.demy.pk)
+        self.assertEqual((demy.note_moyenne, demy.nb_notations, demy.nb_notes_2), (2.0, 1, 1))
+        self.assertRebuildIdentique(Film)
+        self.assertRebuildIdentique(AuteurProfile)
+
+    def test_notation_bulk(self):
+        response = self.post("/spectateurs/notations/film/bulk/", [
+            {"film": self.parapluies.id, "note": 1},
+            {"film": self.sans_toit.id, "note": 5},
+            {"film": self.cleo.id, "note": 1},  # déjà noté par bob
+        ])
+        self.assertEqual([r["statut"] for r in response.data["resultats"]], ["créé", "créé", "erreur"])
+        stats = self.stats(Film)
+        self.assertEqual(stats[self.parapluies.id], {"note_moyenne": 2.0, "nb_notations": 2, "nb_notes_1": 1,
+                                                     "nb_notes_2": 0, "nb_notes_3": 1, "nb_notes_4": 0,
+                                                     "nb_notes_5": 0})
+        self.assertEqual((stats[self.sans_toit.id]["note_moyenne"], stats[self.sans_toit.id]["nb_notes_5"]), (5.0, 1))
+        self.assertEqual(stats[self.cleo.id]["nb_notations"], 2)
+        self.assertRebuildIdentique(Film)
+
+    def test_rebuild_sans_ecart(self):
+        # Seules les fiches dont les agrégats changent sont réécrites (ETag, export incrémental)
+        updated_at = dict(Film.objects.values_list("id", "updated_at"))
+        versions = api_cache.get_version(api_cache.FILMS)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(rebuild_notation_stats(Film), 2)
+        self.assertEqual(dict(Film.objects.values_list("id", "updated_at")), updated_at)
+        self.assertEqual(api_cache.get_version(api_cache.FILMS), versions)
+
+        Film.objects.filter(pk=self.cleo.pk).update(nb_notes_4=0, nb_notes_5=2)
+        Film.objects.filter(pk=self.sans_toit.pk).update(nb_notations=3)
+        updated_at = dict(Film.objects.values_list("id", "updated_at"))
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_notation_stats(Film)
+        after = dict(Film.objects.values_list("id", "updated_at"))
+        self.assertEqual(after[self.parapluies.id], updated_at[self.parapluies.id])
+        self.assertGreater(after[self.cleo.id], updated_at[self.cleo.id])
+        self.assertGreater(after[self.sans_toit.id], updated_at[self.sans_toit.id])
+        self.assertNotEqual(api_cache.get_version(api_cache.FILMS), versions)
+        self.assertRebuildIdentique(Film)
+        self.assertEqual(self.stats(Film)[self.sans_toit.id]["nb_notations"], 0)
+
+    @override_settings(NOTATIONS_CACHE_DELAY=60)
+    def test_cache_des_listes(self):
+        # Une nouvelle note n'invalide pas toute la liste : publiée au plus tard après le délai
+        url = "/films/?fields=id,nb_notations"
+        self.assertEqual([row["nb_notations"] for row in self.get(url).data["results"]], [2, 1, 0])
+        films_version = api_cache.get_version(api_cache.FILMS)
+        now = api_cache.time.time()
+        self.post("/spectateurs/notations/film/", {"film": self.sans_toit.id, "note": 5})
+        self.assertEqual(api_cache.get_version(api_cache.FILMS), films_version)
+        self.assertEqual([row["nb_notations"] for row in self.get(url).data["results"]], [2, 1, 0])
+
+        with mock.patch.object(api_cache, "time", mock.Mock(time=lambda: now + 61)):
+            response = self.get(url)
+        self.assertEqual([row["nb_notations"] for row in response.data["results"]], [2, 1, 1])
+        # L'ETag change à chaque publication, pas à chaque note
+        self.get(url, HTTP_IF_NONE_MATCH=response["ETag"], status=304)
+        self.post("/spectateurs/notations/film/", {"film": self.parapluies.id, "note": 5})
+        with mock.patch.object(api_cache, "time", mock.Mock(time=lambda: now + 122)):
+            self.get(url, HTTP_IF_NONE_MATCH=response["ETag"], status=200)
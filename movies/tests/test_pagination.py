@@ -0,0 +1,45 @@
+import base64
+import datetime
+import json
+from unittest import skipUnless
+
+from django.db import connection
+
+from movies.models import Film
+from movies.paginations import KeysetPagination
+from .base import CatalogTestCase
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+class KeysetPaginationTests(CatalogTestCase):
+
+    def test_parcours(self):
+        response = self.get("/films/?pagination=cursor&page_size=2&fields=titre")
+        self.assertEqual(response.data["results"], [{"titre": "Cléo de 5 à 7"},
+                                                    {"titre": "Les Parapluies de Cherbourg"}])
+        response = self.get(response.data["next"])
+        self.assertEqual(response.data, {"next": None, "results": [{"titre": "Sans toit ni loi"}]})
+        response = self.get(f"/films/?cursor={cursor(['1964-02-19', self.parapluies.id])}&fields=titre")
+        self.assertEqual(response.data["results"], [{"titre": "Sans toit ni loi"}])
+
+    def test_curseur_invalide(self):
+        for values in (["abc", 1], [None, None], ["2000-01-01", "x"], ["2000-01-01", [1]], [1], {}):
+            with self.subTest(values=values):
+                response = self.get(f"/films/?cursor={cursor(values)}", status=404)
+                self.assertEqual(response.data["detail"], "Curseur invalide.")
+        self.get("/films/?cursor=%%%", status=404)
+        self.get(f"/auteurs/?cursor={cursor(['x'])}", status=404)
+
+    @skipUnless(connection.vendor == "sqlite", "plan SQLite")
+    def test_plan_du_curseur(self):
+        # La page suivante part de l'index (date_sortie, id) au curseur, sans le parcourir depuis le début
+        paginator = KeysetPagination()
+        for ordering in (("date_sortie", "id"), ("-date_sortie", "-id")):
+            with self.subTest(ordering=ordering):
+                paginator.ordering = ordering
+                queryset = Film.objects.filter(paginator.after([datetime.date(1964, 2, 19), self.parapluies.id]))
+                plan = queryset.order_by(*ordering)[:10].explain()
+                self.assertIn("SEARCH movies_film USING INDEX film_date_sortie_id_idx (date_sortie", plan)
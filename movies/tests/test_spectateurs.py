@@ -0,0 +1,20 @@
+from .base import CatalogTestCase
+
+
+class FavorisTests(CatalogTestCase):
+
+    def test_pagination(self):
+        response = self.get("/spectateurs/favoris/?page_size=1", user=self.alice.user)
+        self.assertEqual([f["titre"] for f in response.data["results"]], ["Sans toit ni loi"])
+        response = self.get(response.data["next"], user=self.alice.user)
+        self.assertEqual([f["titre"] for f in response.data["results"]], ["Cléo de 5 à 7"])
+        self.assertIsNone(response.data["next"])
+
+    def test_stream(self):
+        films = self.get("/spectateurs/favoris/?stream=true", user=self.alice.user).data
+        self.assertEqual([f["id"] for f in films], [self.sans_toit.id, self.cleo.id])
+        self.assertEqual(films[1]["note_moyenne"], 4.5)
+        # Format de la fiche film, auteurs inclus
+        self.assertEqual(list(films[1]), ["id", "titre", "description", "evaluation", "statut",
+                                          "note_moyenne", "nb_notations", "histogramme", "auteurs"])
+        self.assertEqual([a["id"] for a in films[1]["auteurs"]], [self.varda.id])
@@ -0,0 +1,331 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+import requests
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from benchmarks.fake_tmdb import SyntheticCatalog, start_in_thread
+from movies.models import AuteurProfile, Film, TMDbSync
+from movies.tmdb import cache as tmdb_cache
+from movies.tmdb import client as tmdb_client
+from movies.tmdb.cache import CacheMiss, CachingAdapter, SQLiteCache
+from movies.tmdb.checkpoint import ImportCheckpoint
+from movies.tmdb.client import TMDbClient, TokenBucket
+from movies.tmdb.dumps import batched, filter_rows, read_dump
+from movies.tmdb.writer import BulkWriter
+
+PAGES = 3
+
+
+class Clock:
+    """
+        Horloge simulée : ``sleep`` avance ``time``/``monotonic`` sans attendre.
+    """
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    time = monotonic
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+
+class DeletedCatalog(SyntheticCatalog):
+    """
+        Catalogue synthétique dont certains films / personnes ont été supprimés (404),
+        avec un flux /changes fixe.
+    """
+    deleted_movies = {1003, 99999}
+    deleted_people = {7}
+    changes = {"movie": [], "person": []}
+
+    def movie(self, movie_id):
+        return None if movie_id in self.deleted_movies else super().movie(movie_id)
+
+    def person(self, person_id):
+        return None if person_id in self.deleted_people else super().person(person_id)
+
+    def credits(self, movie_id):
+        data = super().credits(movie_id)
+        if movie_id == 1001:
+            data["crew"].append({"id": 7, "name": "Scénariste supprimé", "department": "Writing"})
+        return data
+
+    def respond(self, path, query):
+        kind = path.strip("/").split("/")[-2]
+        if path.endswith("/changes"):
+            return {"page": 1, "total_pages": 1, "results": [{"id": i} for i in self.changes[kind]]}
+        return super().respond(path, query)
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def test_debit(self):
+        clock = Clock()
+        with mock.patch.object(tmdb_client, "time", clock):
+            bucket = TokenBucket(rate=4, capacity=2)
+            for _ in range(10):
+                bucket.acquire()
+        # Rafale de 2 jetons, puis 4 jetons par seconde
+        self.assertEqual(clock.slept, 2.0)
+
+
+class ChangesWindowTests(SimpleTestCase):
+
+    def test_fenetres_et_pages(self):
+        client = TMDbClient("token")
+        calls = []
+
+        def get(path, **params):
+            calls.append((path, params["start_date"], params["end_date"], params["page"]))
+            return {"total_pages": 2, "results": [{"id": int(params["page"])}, {"id": 42}, {}]}
+
+        with mock.patch.object(client, "get", side_effect=get):
+            ids = client.changes("movie", date(2024, 1, 1), date(2024, 1, 20))
+        self.assertEqual(ids, [1, 42, 2])
+        self.assertEqual(calls, [
+            ("/movie/changes", "2024-01-01", "2024-01-14", "1"),
+            ("/movie/changes", "2024-01-01", "2024-01-14", "2"),
+            ("/movie/changes", "2024-01-15", "2024-01-20", "1"),
+            ("/movie/changes", "2024-01-15", "2024-01-20", "2"),
+        ])
+
+
+def http_response(status, body=b"{}", headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    resp._content = body
+    return resp
+
+
+class ResponseCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.clock = Clock()
+        patcher = mock.patch.object(tmdb_cache, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def session(self, cache, **kwargs):
+        session = requests.Session()
+        session.mount("http://", CachingAdapter(cache, **kwargs))
+        return session
+
+    def test_ttl_et_etag(self):
+        cache = SQLiteCache(Path(self.tmp.name) / "cache.sqlite3")
+        session = self.session(cache, ttl=60)
+        url = "http://tmdb.test/3/movie/1"
+        with mock.patch("requests.adapters.HTTPAdapter.send",
+                        return_value=http_response(200, b'{"id": 1}', {"ETag": '"v1"'})) as send:
+            self.assertEqual(session.get(url).json(), {"id": 1})
+            # Entrée fraîche : aucun accès réseau
+            self.clock.sleep(30)
+            self.assertTrue(session.get(url).from_cache)
+            self.assertEqual(send.call_count, 1)
+
+        # Entrée périmée : revalidée par If-None-Match, le 304 renvoie le corps en cache
+        self.clock.sleep(60)
+        with mock.patch("requests.adapters.HTTPAdapter.send", return_value=http_response(304)) as send:
+            self.assertEqual(session.get(url).json(), {"id": 1})
+            self.assertEqual(send.call_args.args[0].headers["If-None-Match"], '"v1"')
+            self.assertEqual(session.get(url).json(), {"id": 1})
+            self.assertEqual(send.call_count, 1)
+
+    def test_changes_toujours_revalides(self):
+        cache = SQLiteCache(Path(self.tmp.name) / "cache.sqlite3")
+        session = self.session(cache, ttl=3600)
+        with mock.patch("requests.adapters.HTTPAdapter.send", return_value=http_response(200)) as send:
+            session.get("http://tmdb.test/3/movie/changes")
+            session.get("http://tmdb.test/3/movie/changes")
+        self.assertEqual(send.call_count, 2)
+
+    def test_eviction_lru(self):
+        cache = SQLiteCache(Path(self.tmp.name) / "cache.sqlite3", max_size=350)
+        for key in "abc":
+            cache.set(key, 200, {}, b"x" * 100)
+            self.clock.sleep(1)
+        cache.get("a")
+        self.clock.sleep(1)
+        cache.set("d", 200, {}, b"x" * 100)
+        # "b" est l'entrée la moins récemment lue
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual([key for key in "acd" if cache.get(key)], ["a", "c", "d"])
+        # La taille est relue à l'ouverture du fichier
+        self.assertEqual(SQLiteCache(Path(self.tmp.name) / "cache.sqlite3").get("a")["body"], b"x" * 100)
+
+    def test_offline(self):
+        cache = SQLiteCache(Path(self.tmp.name) / "cache.sqlite3")
+        cache.set("http://tmdb.test/3/movie/1", 200, {}, b'{"id": 1}')
+        cache.set("http://tmdb.test/3/movie/2", 404, {}, b'{"status_code": 34}')
+        session = self.session(cache, ttl=0, offline=True)
+        with mock.patch("requests.adapters.HTTPAdapter.send") as send:
+            self.assertEqual(session.get("http://tmdb.test/3/movie/1").json(), {"id": 1})
+            self.assertEqual(session.get("http://tmdb.test/3/movie/2").status_code, 404)
+            with self.assertRaises(CacheMiss):
+                session.get("http://tmdb.test/3/movie/3")
+        send.assert_not_called()
+
+
+class DumpTests(SimpleTestCase):
+
+    def test_lecture_en_flux(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "movie_ids.json.gz"
+            with gzip.open(path, "wt", encoding="utf-8") as fh:
+                for row in [{"id": 1, "popularity": 5}, {"id": 2, "adult": True}, {},
+                            {"id": 3, "popularity": 0.1}, {"id": 4, "popularity": 2}]:
+                    fh.write(json.dumps(row) + "\n\n")
+            rows = filter_rows(read_dump(path), min_popularity=1)
+            self.assertEqual([[r["id"] for r in batch] for batch in batched(rows, 1)], [[1], [4]])
+
+
+class BulkWriterTests(TestCase):
+
+    movie = {"id": 10, "title": "Titre", "overview": "Résumé", "release_date": "2001-04-25"}
+
+    def test_upsert_et_liens(self):
+        writer = BulkWriter()
+        writer.add(self.movie, [({"id": 1, "name": "Auteur 1"}, {"birthday": "1950-01-02"}),
+                                ({"id": 2, "name": "Auteur 2"}, {})])
+        writer.add({"id": 11, "title": "Sans date"}, [])
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(writer.skipped, 1)
+
+        writer.add({**self.movie, "title": "Nouveau titre"}, [({"id": 2, "name": "Auteur 2"}, {})])
+        writer.flush()
+        film = Film.objects.get()
+        self.assertEqual((film.tmdb_id, film.titre, film.source), (10, "Nouveau titre", "tmdb"))
+        self.assertEqual(sorted(film.auteurs.values_list("tmdb_id", "nom", "date_naissance")),
+                         [(1, "Auteur 1", date(1950, 1, 2)), (2, "Auteur 2", None)])
+
+    def test_lignes_anciennes(self):
+        # Import antérieur à tmdb_id : nom tronqué à 9 caractères, aucun identifiant
+        film = Film.objects.create(titre="Titre", date_sortie=date(2001, 4, 25), source="tmdb")
+        auteur = AuteurProfile.objects.create(nom="Scénariste Un"[:9], source="tmdb")
+        autre = AuteurProfile.objects.create(nom="Homonyme", source="tmdb")
+        film.auteurs.add(auteur)
+
+        writer = BulkWriter()
+        writer.add(self.movie, [({"id": 1, "name": "Scénariste Un"}, {})])
+        writer.flush()
+        film.refresh_from_db()
+        auteur.refresh_from_db()
+        self.assertEqual((Film.objects.count(), film.tmdb_id, film.description), (1, 10, "Résumé"))
+        self.assertEqual((AuteurProfile.objects.count(), auteur.tmdb_id, auteur.nom), (2, 1, "Scénariste Un"))
+        self.assertEqual(list(film.auteurs.all()), [auteur])
+        self.assertIsNone(AuteurProfile.objects.get(pk=autre.pk).tmdb_id)
+
+
+@mock.patch.dict(os.environ, {"TMDB_BEARER_TOKEN": "token"})
+class ImportCommandTests(TestCase):
+    """
+        ``import_tmdb`` contre le serveur TMDb local (``benchmarks.fake_tmdb``).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.catalog = DeletedCatalog(PAGES)
+        cls.server, cls.api_base = start_in_thread(cls.catalog)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.catalog.changes = {"movie": [], "person": []}
+
+    def call(self, *args, **options):
+        out = io.StringIO()
+        options.setdefault("cache", str(self.tmp / "cache.sqlite3"))
+        call_command("import_tmdb", *args, api_base=self.api_base, checkpoint=str(self.tmp / "checkpoint.json"),
+                     rate=1000, stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_complet(self):
+        out = self.call()
+        self.assertEqual(Film.objects.count(), PAGES * 20)
+        film = Film.objects.get(tmdb_id=1001)
+        self.assertEqual((film.titre, film.date_sortie), ("Film 1-1", date(1972, 2, 2)))
+        writers = [c["id"] for c in self.catalog.credits(1001)["crew"] if c["department"] == "Writing"]
+        self.assertCountEqual(film.auteurs.values_list("tmdb_id", flat=True), writers)
+        # Personne supprimée : auteur gardé avec le nom du générique
+        self.assertEqual(AuteurProfile.objects.get(tmdb_id=7).nom, "Scénariste supprimé")
+        self.assertIn("1 auteur(s) introuvable(s)", out)
+        self.assertFalse((self.tmp / "checkpoint.json").exists())
+        self.assertTrue(TMDbSync.objects.filter(nom="tmdb").exists())
+
+    def test_reprise(self):
+        ImportCheckpoint(self.tmp / "checkpoint.json").complete_page(2)
+        out = self.call()
+        self.assertIn(f"Reprise à la page 3/{PAGES}", out)
+        self.assertEqual(set(Film.objects.values_list("tmdb_id", flat=True)), {3000 + i for i in range(20)})
+        # Point de reprise d'une autre source : ignoré
+        ImportCheckpoint(self.tmp / "checkpoint.json", source="dump:autre").complete_page(2)
+        self.call()
+        self.assertEqual(Film.objects.count(), PAGES * 20)
+
+    def test_rejeu_hors_ligne(self):
+        self.call()
+        hits = self.server.hits
+        Film.objects.all().delete()
+        AuteurProfile.objects.all().delete()
+        with mock.patch.dict(os.environ, {"TMDB_BEARER_TOKEN": ""}):
+            self.call(offline=True)
+        self.assertEqual(self.server.hits, hits)
+        self.assertEqual(Film.objects.count(), PAGES * 20)
+        with self.assertRaises(CacheMiss):
+            self.call(offline=True, cache=str(self.tmp / "vide.sqlite3"))
+
+    def test_dump(self):
+        path = self.tmp / "movie_ids.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            for movie_id in (1001, 1002, 99999, 1003, 2004):
+                fh.write(json.dumps({"id": movie_id, "original_title": "x", "popularity": 1}) + "\n")
+        out = self.call(dump=str(path), batch_size=2)
+        self.assertEqual(sorted(Film.objects.values_list("tmdb_id", flat=True)), [1001, 1002, 2004])
+        self.assertIn("2 film(s) introuvable(s)", out)
+        self.assertIn("lot 3 :", out)
+
+    def test_changes(self):
+        self.call()
+        Film.objects.filter(tmdb_id=1002).update(titre="Ancien titre")
+        Film.objects.create(titre="Supprimé", date_sortie=date(2000, 1, 1), source="tmdb", tmdb_id=99999)
+        AuteurProfile.objects.filter(tmdb_id=7).update(nom="Ancien nom")
+        # Films inconnus du catalogue local (5) ignorés, film supprimé (99999) conservé
+        self.catalog.changes = {"movie": [1002, 5, 99999], "person": [7]}
+        out = self.call(changes=True, since=date(2024, 1, 1), no_cache=True)
+        self.assertEqual(Film.objects.get(tmdb_id=1002).titre, "Film 1-2")
+        self.assertTrue(Film.objects.filter(tmdb_id=99999).exists())
+        self.assertEqual(AuteurProfile.objects.get(tmdb_id=7).nom, "Ancien nom")
+        self.assertIn("1 film(s) introuvable(s)", out)
+        self.assertIn("1 auteur(s) introuvable(s)", out)
+
+    def test_match_legacy(self):
+        Film.objects.create(titre="Film 2-3", date_sortie=date(1975, 4, 3), source="tmdb")
+        Film.objects.create(titre="Inconnu de TMDb", date_sortie=date(1975, 4, 3), source="tmdb")
+        out = self.call("--match-legacy")
+        self.assertIn("1/2 film(s) rattachés à TMDb", out)
+        self.assertEqual(Film.objects.get(titre="Film 2-3").tmdb_id, 2003)
+        self.assertFalse(TMDbSync.objects.exists())
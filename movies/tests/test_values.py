@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.core.cache import cache
+
+from movies.views import AuteurViewSet, FilmViewSet
+from .base import CatalogTestCase
+
+
+class ValuesSerializationTests(CatalogTestCase):
+    """
+        Listes sérialisées depuis .values() (ValuesListMixin) : JSON identique au serializer.
+    """
+    urls = (
+        "/films/?page_size=100", "/films/?page=2&page_size=2&count=false", "/films/?search=parapluies",
+        "/films/?pagination=cursor&page_size=2", "/films/?anne_sortie=1962",
+        "/auteurs/?page_size=100", "/auteurs/?search=demy", "/auteurs/?pagination=cursor",
+    )
+
+    def test_json_identique(self):
+        self.authenticate(self.alice.user)
+        for url in self.urls:
+            with self.subTest(url=url):
+                fast = self.client.get(url).content
+                cache.clear()
+                with mock.patch.object(FilmViewSet, "values_serialization", False), \
+                        mock.patch.object(AuteurViewSet, "values_serialization", False):
+                    slow = self.client.get(url).content
+                cache.clear()
+                self.assertEqual(fast, slow)
+
+    def test_liste_films(self):
+        rows = {row["id"]: row for row in self.get("/films/").data["results"]}
+        self.assertEqual(rows[self.cleo.id], {
+            "id": self.cleo.id, "titre": "Cléo de 5 à 7", "description": "Une chanteuse attend un diagnostic",
+            "evaluation": None, "statut": "sorti", "note_moyenne": 4.5, "nb_notations": 2,
+        })
+        self.assertEqual(rows[self.sans_toit.id]["note_moyenne"], None)
+
+    def test_auteur_sans_utilisateur(self):
+        # Clé "username" absente, comme avec le serializer
+        rows = {row["id"]: row for row in self.get("/auteurs/").data["results"]}
+        self.assertEqual(rows[self.varda.id]["username"], "agnes")
+        self.assertNotIn("username", rows[self.demy.id])
+        self.assertEqual(rows[self.demy.id]["nom"], "Jacques Demy")
@@ -0,0 +1,3 @@
+"""
+Outils d'accès à l'API TMDb utilisés par la commande ``import_tmdb``.
+"""
@@ -0,0 +1,164 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from http import HTTPStatus
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DAY = 24 * 3600
+DEFAULT_TTL = 30 * DAY
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+# Réponses mises en cache : une 404 (film ou personne supprimé de TMDb) n'est pas redemandée
+CACHED_STATUS = (200, 404)
+
+# Durée de fraîcheur par type d'URL (secondes) ; la première règle qui correspond s'applique.
+# Les flux /changes dépendent de la date du jour : toujours revalidés.
+TTL_RULES = [
+    (re.compile(r"/changes(\?|$)"), 0),
+    (re.compile(r"/discover/"), DAY),
+]
+
+
+class CacheMiss(requests.ConnectionError):
+    """Réponse absente du cache alors que le mode hors ligne est actif."""
+
+
+class BaseResponseCache:
+    """
+        Interface d'un stockage de réponses HTTP. Une entrée est un dict
+        ``{"status", "headers", "body", "stored_at"}``.
+    """
+
+    def get(self, key: str) -> dict | None:
+        raise NotImplementedError
+
+    def set(self, key: str, status: int, headers: dict, body: bytes) -> None:
+        raise NotImplementedError
+
+    def touch(self, key: str) -> None:
+        """Marque une entrée comme fraîche après une revalidation (304)."""
+        raise NotImplementedError
+
+
+class SQLiteCache(BaseResponseCache):
+    """
+        Cache de réponses dans un fichier SQLite, partageable entre threads.
+        Au-delà de ``max_size`` octets, les entrées les moins récemment lues sont évincées.
+    """
+
+    def __init__(self, path, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB,"
+            " stored_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return {"status": row[0], "headers": json.loads(row[1]), "body": row[2], "stored_at": row[3]}
+
+    def set(self, key, status, headers, body):
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT LENGTH(body) FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(dict(headers)), body, now, now),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_size:
+                self._evict()
+
+    def touch(self, key):
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def _evict(self):
+        # On libère 10 % de marge pour ne pas évincer à chaque écriture
+        target = self.max_size * 0.9
+        rows = self._db.execute("SELECT key, LENGTH(body) FROM responses ORDER BY accessed_at")
+        evicted = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+        Adaptateur ``requests`` qui sert les GET depuis un ``BaseResponseCache``.
+        Une entrée périmée est revalidée avec ``If-None-Match`` / ``If-Modified-Since`` ;
+        en mode ``offline`` seul le cache est utilisé (rejeu d'un import enregistré).
+    """
+
+    def __init__(self, cache: BaseResponseCache, ttl: int = DEFAULT_TTL, offline: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.ttl = ttl
+        self.offline = offline
+
+    def ttl_for(self, url: str) -> int:
+        for pattern, ttl in TTL_RULES:
+            if pattern.search(url):
+                return min(ttl, self.ttl)
+        return self.ttl
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        key = request.url
+        entry = self.cache.get(key)
+        if entry is not None and (self.offline or time.time() - entry["stored_at"] < self.ttl_for(key)):
+            return self.build_cached_response(request, entry)
+        if self.offline:
+            raise CacheMiss(f"Réponse absente du cache : {key}", request=request)
+
+        if entry is not None:
+            headers = CaseInsensitiveDict(entry["headers"])
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        resp = super().send(request, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            return self.build_cached_response(request, entry)
+        if resp.status_code in CACHED_STATUS:
+            self.cache.set(key, resp.status_code, resp.headers, resp.content)
+        return resp
+
+    @staticmethod
+    def build_cached_response(request, entry):
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = HTTPStatus(entry["status"]).phrase
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp.headers.pop("Content-Encoding", None)
+        resp._content = entry["body"]
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.from_cache = True
+        return resp
@@ -0,0 +1,40 @@
+import json
+import os
+from pathlib import Path
+
+
+class ImportCheckpoint:
+    """
+        Point de reprise d'un import : dernière page ``/discover/movie``
+        (ou dernier lot d'un export, selon ``source``) dont tous les films
+        ont été écrits en base.
+        Le fichier est réécrit de façon atomique à chaque lot.
+    """
+
+    def __init__(self, path, source: str = "discover"):
+        self.path = Path(path)
+        self.source = source
+        self.page = 0
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            # Un point de reprise laissé par une autre source est ignoré
+            if data.get("source", "discover") == source:
+                self.page = data.get("page", 0)
+
+    @property
+    def next_page(self) -> int:
+        return self.page + 1
+
+    def complete_page(self, page: int) -> None:
+        self.page = page
+        self.save()
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"source": self.source, "page": self.page}))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.page = 0
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,124 @@
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import BaseResponseCache, CachingAdapter, DEFAULT_TTL
+
+API_BASE = "https://api.themoviedb.org/3"
+
+# Fenêtre maximale acceptée par les endpoints /changes
+CHANGES_MAX_DAYS = 14
+
+# TMDb tolère ~50 requêtes/s et 20 connexions simultanées par IP :
+# on garde une marge pour ne pas déclencher de 429.
+DEFAULT_RATE = 40
+DEFAULT_WORKERS = 8
+MAX_RETRIES = 5
+
+
+class TokenBucket:
+    """
+        Limiteur de débit thread-safe : ``rate`` jetons par seconde,
+        avec une rafale maximale de ``capacity`` jetons.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TMDbClient:
+    """
+        Client HTTP minimal pour TMDb, partageable entre plusieurs threads.
+        Chaque appel consomme un jeton du limiteur ; les réponses 429 sont
+        rejouées après le délai ``Retry-After`` indiqué par l'API.
+        Avec un ``cache``, les GET passent par un ``CachingAdapter`` monté sur la session.
+    """
+
+    def __init__(self, token: str, rate: float = DEFAULT_RATE, pool_size: int = DEFAULT_WORKERS,
+                 session: requests.Session | None = None, cache: BaseResponseCache | None = None,
+                 cache_ttl: int = DEFAULT_TTL, offline: bool = False, api_base: str = API_BASE):
+        self.api_base = api_base.rstrip("/")
+        self.session = session or requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {token}", "Accept": "application/json"})
+        if cache is not None:
+            adapter = CachingAdapter(cache, ttl=cache_ttl, offline=offline,
+                                     pool_connections=pool_size, pool_maxsize=pool_size)
+        else:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.bucket = TokenBucket(rate)
+
+    def get(self, path: str, **params) -> dict:
+        for attempt in range(MAX_RETRIES):
+            self.bucket.acquire()
+            resp = self.session.get(f"{self.api_base}{path}", params=params or None)
+            if resp.status_code == 429 and attempt < MAX_RETRIES - 1:
+                time.sleep(float(resp.headers.get("Retry-After") or 1))
+                continue
+            resp.raise_for_status()
+            return resp.json()
+
+    def get_or_none(self, path: str, **params) -> dict | None:
+        """
+            ``get`` d'une ressource qui a pu être supprimée de TMDb : ``None`` sur une 404.
+        """
+        try:
+            return self.get(path, **params)
+        except requests.HTTPError as exc:
+            if exc.response is not None and exc.response.status_code == 404:
+                return None
+            raise
+
+    def discover(self, page: int) -> dict:
+        return self.get("/discover/movie", language="fr-FR", page=str(page))
+
+    def movie(self, movie_id: int) -> dict | None:
+        return self.get_or_none(f"/movie/{movie_id}", language="fr-FR")
+
+    def search_movie(self, query: str, year: int | None = None) -> dict:
+        params = {"primary_release_year": str(year)} if year else {}
+        return self.get("/search/movie", query=query, language="fr-FR", **params)
+
+    def credits(self, movie_id: int) -> dict | None:
+        return self.get_or_none(f"/movie/{movie_id}/credits")
+
+    def person(self, person_id: int) -> dict | None:
+        return self.get_or_none(f"/person/{person_id}")
+
+    def changes(self, kind: str, start_date, end_date) -> list[int]:
+        """
+            Identifiants modifiés entre deux dates via ``/movie/changes`` ou
+            ``/person/changes`` (toutes les pages, fenêtres de 14 jours maximum).
+        """
+        ids = []
+        while start_date <= end_date:
+            window_end = min(end_date, start_date + timedelta(days=CHANGES_MAX_DAYS - 1))
+            page, total_pages = 1, 1
+            while page <= total_pages:
+                data = self.get(f"/{kind}/changes", start_date=start_date.isoformat(),
+                                end_date=window_end.isoformat(), page=str(page))
+                ids.extend(r["id"] for r in data.get("results", []) if r.get("id"))
+                total_pages = data.get("total_pages") or 1
+                page += 1
+            start_date = window_end + timedelta(days=1)
+        return list(dict.fromkeys(ids))
@@ -0,0 +1,34 @@
+"""
+Lecture en flux des exports quotidiens TMDb
+(``movie_ids_MM_DD_YYYY.json.gz`` : un objet JSON par ligne).
+Chaque étape est un générateur : le fichier n'est jamais chargé en mémoire.
+"""
+import gzip
+import json
+from itertools import islice
+
+
+def read_dump(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def filter_rows(rows, min_popularity: float = 0, include_adult: bool = False):
+    for row in rows:
+        if not row.get("id"):
+            continue
+        if row.get("adult") and not include_adult:
+            continue
+        if (row.get("popularity") or 0) < min_popularity:
+            continue
+        yield row
+
+
+def batched(iterable, size: int):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
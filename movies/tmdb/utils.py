@@ -0,0 +1,15 @@
+from dateutil import parser
+
+
+def to_iso_date(date_str: str) -> str | None:
+    """
+        Convert a date string to YYYY-MM-DD format.
+        Return None if parsing is not possible.
+    """
+    if not date_str or not isinstance(date_str, str):
+        return None
+    try:
+        dt = parser.parse(date_str, dayfirst=False, yearfirst=False)
+        return dt.strftime("%Y-%m-%d")
+    except (ValueError, OverflowError):
+        return None
@@ -0,0 +1,162 @@
+from collections import Counter, defaultdict
+from functools import cached_property
+
+from django.db import transaction
+
+from movies.cache import AUTEURS, AUTOCOMPLETE, FILMS, invalidate
+from movies.facettes import FACETTE_FIELDS, apply_deltas, diff, film_values
+from movies.models import Film, AuteurProfile
+from .utils import to_iso_date
+
+DEFAULT_BATCH_SIZE = 500
+
+# Lignes importées avant l'ajout de tmdb_id
+LEGACY = {"source": "tmdb", "tmdb_id__isnull": True}
+
+
+class BulkWriter:
+    """
+        Tampon d'écriture pour l'import TMDb.
+        Les films et auteurs sont upsertés par ``tmdb_id`` via
+        ``bulk_create(update_conflicts=True)``, puis les liens film/auteur
+        sont insérés en une seule requête ; chaque lot tient dans une transaction.
+    """
+
+    FILM_FIELDS = ["titre", "description", "date_sortie", "source", "updated_at"]
+    AUTEUR_FIELDS = ["nom", "date_naissance", "source", "updated_at"]
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.films = {}
+        self.auteurs = {}
+        self.links = set()
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.films)
+
+    @property
+    def full(self) -> bool:
+        return len(self.films) >= self.batch_size
+
+    def add_film(self, movie: dict) -> bool:
+        date_sortie = to_iso_date(movie.get("release_date"))
+        if not date_sortie:
+            # date_sortie est obligatoire sur Film
+            self.skipped += 1
+            return False
+        self.films[movie["id"]] = Film(
+            tmdb_id=movie["id"],
+            titre=movie.get("title") or movie.get("original_title") or "",
+            description=movie.get("overview") or "n/a",
+            date_sortie=date_sortie,
+            source="tmdb",
+        )
+        return True
+
+    def add_auteur(self, person: dict, name: str | None = None) -> None:
+        self.auteurs[person["id"]] = AuteurProfile(
+            tmdb_id=person["id"],
+            nom=name or person.get("name"),
+            date_naissance=to_iso_date(person.get("birthday")),
+            source="tmdb",
+        )
+
+    def add(self, movie: dict, authors) -> None:
+        """
+            ``authors`` : liste de couples (membre de l'équipe "Writing", détail de la personne).
+        """
+        if not self.add_film(movie):
+            return
+        for crew, person in authors:
+            self.add_auteur({**person, "id": crew["id"]}, crew.get("name"))
+            self.links.add((movie["id"], crew["id"]))
+
+    @cached_property
+    def has_legacy(self) -> bool:
+        return Film.objects.filter(**LEGACY).exists()
+
+    def adopt_legacy(self) -> None:
+        """
+            Films et auteurs importés avant l'ajout de ``tmdb_id`` (``source="tmdb"``,
+            ``tmdb_id`` vide) : rattachés à l'identifiant du tampon qui leur correspond,
+            pour être mis à jour par l'upsert au lieu d'être dupliqués.
+            Films : même titre et même date de sortie ; auteurs : liés à l'un de ces
+            films, même nom (ou ses 9 premiers caractères, tronqués par l'ancien import).
+        """
+        if not self.has_legacy or not self.films:
+            return
+        wanted = {(film.titre, film.date_sortie): tmdb_id for tmdb_id, film in self.films.items()}
+        taken = set(Film.objects.filter(tmdb_id__in=self.films).values_list("tmdb_id", flat=True))
+        adopted = {}
+        for film in Film.objects.filter(titre__in={titre for titre, _ in wanted}, **LEGACY).only("pk", "titre", "date_sortie"):
+            tmdb_id = wanted.get((film.titre, film.date_sortie.isoformat()))
+            if tmdb_id is not None and tmdb_id not in taken:
+                adopted[tmdb_id] = film.pk
+                taken.add(tmdb_id)
+        if not adopted:
+            return
+        Film.objects.bulk_update([Film(pk=pk, tmdb_id=tmdb_id) for tmdb_id, pk in adopted.items()], ["tmdb_id"])
+
+        legacy_auteurs = defaultdict(list)
+        for film_id, auteur_id, nom in (Film.auteurs.through.objects
+                                        .filter(film_id__in=adopted.values(), auteurprofile__source="tmdb",
+                                                auteurprofile__tmdb_id__isnull=True)
+                                        .values_list("film_id", "auteurprofile_id", "auteurprofile__nom")):
+            legacy_auteurs[film_id].append((auteur_id, nom))
+        taken = set(AuteurProfile.objects.filter(tmdb_id__in=self.auteurs).values_list("tmdb_id", flat=True))
+        auteurs = {}
+        for movie_id, person_id in sorted(self.links):
+            name = self.auteurs[person_id].nom or ""
+            if movie_id not in adopted or person_id in taken:
+                continue
+            for auteur_id, nom in legacy_auteurs[adopted[movie_id]]:
+                if auteur_id not in auteurs and nom in (name, name[:9]):
+                    auteurs[auteur_id] = person_id
+                    taken.add(person_id)
+                    break
+        AuteurProfile.objects.bulk_update(
+            [AuteurProfile(pk=pk, tmdb_id=tmdb_id) for pk, tmdb_id in auteurs.items()], ["tmdb_id"],
+        )
+
+    @transaction.atomic
+    def flush(self) -> int:
+        if not self.films and not self.auteurs:
+            return 0
+        self.adopt_legacy()
+        if self.films:
+            # Facettes : l'upsert ne remplace que date_sortie / source des films existants
+            before = {row.pop("tmdb_id"): row for row in
+                      Film.objects.filter(tmdb_id__in=self.films).values("tmdb_id", *FACETTE_FIELDS)}
+            deltas = Counter()
+            for tmdb_id, film in self.films.items():
+                old = before.get(tmdb_id)
+                new = {**old, "date_sortie": film.date_sortie, "source": film.source} if old else film_values(film)
+                deltas.update(diff(old, new))
+            Film.objects.bulk_create(
+                self.films.values(), batch_size=self.batch_size,
+                update_conflicts=True, unique_fields=["tmdb_id"], update_fields=self.FILM_FIELDS,
+            )
+            apply_deltas(deltas)
+        if self.auteurs:
+            AuteurProfile.objects.bulk_create(
+                self.auteurs.values(), batch_size=self.batch_size,
+                update_conflicts=True, unique_fields=["tmdb_id"], update_fields=self.AUTEUR_FIELDS,
+            )
+        if self.links:
+            # Les pk ne sont pas renvoyées par tous les backends en cas de conflit :
+            # on les relit en une requête par modèle.
+            film_ids = dict(Film.objects.filter(tmdb_id__in={f for f, _ in self.links})
+                            .values_list("tmdb_id", "id"))
+            auteur_ids = dict(AuteurProfile.objects.filter(tmdb_id__in={a for _, a in self.links})
+                              .values_list("tmdb_id", "id"))
+            Through = Film.auteurs.through
+            Through.objects.bulk_create(
+                [Through(film_id=film_ids[f], auteurprofile_id=auteur_ids[a]) for f, a in self.links],
+                batch_size=self.batch_size, ignore_conflicts=True,
+            )
+        # bulk_create n'émet aucun signal : invalidation explicite du cache des listes
+        invalidate(FILMS, AUTEURS, AUTOCOMPLETE)
+        count = len(self.films)
+        self.films, self.auteurs, self.links = {}, {}, set()
+        return count
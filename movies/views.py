@@ -1,13 +1,21 @@
 # apps/users/views.py (extrait)
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import AllowAny,IsAuthenticated,IsAdminUser
-from .paginations import SimplePagination
-from .models import AuteurProfile,Film,SpectateurProfile
+from .paginations import SimplePagination, KeysetPagination, KeysetPaginationMixin, TRUE_VALUES
+from .mixins import RelatedQuerysetMixin, SpectateurMixin, ValuesListMixin
+from .facettes import get_facettes
+from .cache import AUTEURS, AUTEURS_NOTATIONS, FILMS, FILMS_NOTATIONS, CachedListMixin, ConditionalRetrieveMixin
+from .models import AuteurProfile,Film,SpectateurProfile,NotationFilm,NotationAuteur
+from .notations import add_notes
+from django.db import IntegrityError, transaction
 from .serializers import (AuteurListSerializer, AuteurDetailSerializer,
                           AuteurModifSerializer,FilmListSerializer,FilmDetailSerializer,FilmModifSerializer,
-                          SpectateurReadSerializer,FavoriFilmAddSerializer,RateFilmSerializer,NotationAuteurSerializer)
+                          FilmClassementSerializer,
+                          SpectateurReadSerializer,SpectateurListSerializer,FavoriFilmAddSerializer,RateFilmSerializer,NotationAuteurSerializer,
+                          FavorisBulkSerializer,NotationFilmBulkItemSerializer,NotationAuteurBulkItemSerializer,
+                          MAX_BULK)
 from rest_framework.exceptions import ValidationError
-from django.db.models import Q
+from django.db.models import Q, prefetch_related_objects
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
@@ -15,14 +23,26 @@ from rest_framework.decorators import action
 from rest_framework import mixins, viewsets
 from rest_framework.permissions import AllowAny
 from .serializers import SpectateurSignupSerializer
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from . import autocomplete as autocomplete_index
+from core.renderers import IgnoreAcceptNegotiation, streaming_json_response
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, content_negotiation_class, permission_classes
+from rest_framework.exceptions import NotFound
+from .export import FORMATS, TABLES, export, parse_since, pyarrow
 
-class AuteurViewSet(ModelViewSet):
+class AuteurViewSet(CachedListMixin, ValuesListMixin, ConditionalRetrieveMixin, RelatedQuerysetMixin, KeysetPaginationMixin, ModelViewSet):
 
     queryset = AuteurProfile.objects.all()
     permission_classes = [AllowAny]
     http_method_names = ["get", "head", "options", "put", "patch","delete"]
     ordering_fields = ("id",)
     pagination_class = SimplePagination
+    keyset_ordering = ("id",)
+    cache_scope = AUTEURS
+    notations_scope = AUTEURS_NOTATIONS
+    conditional_related = "films"
 
     def get_permissions(self):
         permission_classes = [AllowAny]
@@ -47,22 +67,35 @@ class AuteurViewSet(ModelViewSet):
         if instance.films.exists():
             raise ValidationError("Impossible de supprimer un auteur qui est associé à au moins un film.")
         return super().perform_destroy(instance)
-class FilmViewSet(ModelViewSet):
+class FilmViewSet(CachedListMixin, ValuesListMixin, ConditionalRetrieveMixin, RelatedQuerysetMixin, KeysetPaginationMixin, ModelViewSet):
 
     queryset = Film.objects.all()
     permission_classes = [AllowAny]
     http_method_names = ["get", "head", "options", "put", "patch","delete"]
     ordering_fields = ("id",)
     pagination_class = SimplePagination
+    keyset_ordering = ("date_sortie", "id")
+    cache_scope = FILMS
+    notations_scope = FILMS_NOTATIONS
+    conditional_related = "auteurs"
 
     def get_queryset(self):
         if self.action in ["list"]:
-            anne_sortie = self.request.query_params.get('anne_sortie') or ""
+            anne_sortie = self.get_anne_sortie()
             filters = Q()
-            if anne_sortie:
+            if anne_sortie is not None:
                 filters &= Q(date_sortie__year=anne_sortie)
-            return Film.objects.filter(filters)
-        return Film.objects.filter()
+            return self.optimize_queryset(Film.objects.filter(filters))
+        return self.optimize_queryset(Film.objects.filter())
+
+    def get_anne_sortie(self):
+        anne_sortie = self.request.query_params.get('anne_sortie')
+        if not anne_sortie:
+            return None
+        try:
+            return int(anne_sortie)
+        except ValueError:
+            raise ValidationError({"anne_sortie": "L'année de sortie doit être un nombre entier."})
     def get_permissions(self):
         permission_classes = [AllowAny]
 
@@ -71,6 +104,8 @@ class FilmViewSet(ModelViewSet):
                 permission_classes = [IsAuthenticated]
             else:
                 permission_classes =  [AllowAny]
+        elif self.action in ('top', 'facets'):
+            permission_classes = [AllowAny]
         elif self.action == 'retrieve':
             permission_classes = [IsAuthenticated]
         else :
@@ -84,27 +119,64 @@ class FilmViewSet(ModelViewSet):
             return  FilmDetailSerializer
         elif self.action in ("update", "partial_update"):
             return  FilmModifSerializer
-class SpectateurViewSet(ModelViewSet):
+        elif self.action == 'top':
+            return FilmClassementSerializer
+
+    @action(detail=False, methods=["get"])
+    def top(self, request):
+        """
+            GET /films/top/?anne_sortie=&statut=  -> films classés par score bayésien (précalculé)
+        """
+        qs = self.optimize_queryset(Film.objects.filter(classement__isnull=False)
+                                    .order_by("-classement__score", "id"))
+        anne_sortie = self.get_anne_sortie()
+        if anne_sortie is not None:
+            qs = qs.filter(date_sortie__year=anne_sortie)
+        statut = request.query_params.get('statut')
+        if statut:
+            qs = qs.filter(statut=statut)
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """
+            GET /films/facets/  -> {"annee": {"2024": 12, ...}, "statut": {...}, "source": {...}, "evaluation": {...}}
+        """
+        return Response(get_facettes())
+class SpectateurViewSet(SpectateurMixin, RelatedQuerysetMixin, ModelViewSet):
     """
     Routes principales (JWT requis sauf admin):
     - GET  /api/spectateurs/me/                      -> profil courant
-    - GET  /api/spectateurs/favoris/                 -> films favoris (courant)
+    - GET  /api/spectateurs/favoris/                 -> films favoris (courant), paginés ; ?expand=auteurs
     - POST /api/spectateurs/favoris/                 -> ajouter un favori {film_id}
     - DELETE /api/spectateurs/favoris/{film_id}/     -> retirer un favori
     - POST /api/spectateurs/notations/film           -> noter un film {film_id, note, commentaire?}
     - POST /api/spectateurs/notations/auteur         -> noter un auteur {auteur, note, commentaire?}
+    - POST /api/spectateurs/favoris/bulk/            -> ajouter / retirer plusieurs favoris
+    - POST /api/spectateurs/notations/film/bulk/     -> noter plusieurs films
+    - POST /api/spectateurs/notations/auteur/bulk/   -> noter plusieurs auteurs
 
     Admin uniquement:
-    - GET /api/spectateurs/                          -> lister tous les spectateurs
+    - GET /api/spectateurs/                          -> lister tous les spectateurs (paginé, ids des favoris ;
+                                                        ?expand=favoris_films,favoris_auteurs)
     - GET /api/spectateurs/{id}/                     -> détail d’un spectateur (autre que soi)
     """
-    queryset = (SpectateurProfile.objects
-                .select_related("user")
-                .prefetch_related("favoris_films", "favoris_auteurs"))
+    queryset = SpectateurProfile.objects.all()
     serializer_class = SpectateurReadSerializer
+    pagination_class = KeysetPagination
 
     http_method_names = ["get", "head", "options", "post", "delete",'put','patch']
 
+    @property
+    def keyset_ordering(self):
+        # Favoris : films les plus récents d'abord
+        return ("-id",) if self.action == "favoris" else ("id",)
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return SpectateurListSerializer
+        return super().get_serializer_class()
+
     def get_permissions(self):
 
         if self.action in ("list", "retrieve"):
@@ -114,38 +186,97 @@ class SpectateurViewSet(ModelViewSet):
     # ---------- Profil courant ----------
     @action(detail=False, methods=["get"])
     def me(self, request):
-        sp = get_object_or_404(SpectateurProfile, user=request.user)
+        sp = self.get_spectateur()
+        if sp.get_deferred_fields():
+            # Profil partiel (authentification sans état) : chargé avec ses relations
+            sp = self.get_queryset().get(pk=sp.pk)
+        else:
+            _, prefetch = self.get_serializer_class().related_lookups(self.get_expand(), self.get_fields())
+            prefetch_related_objects([sp], *prefetch)
         return Response(self.get_serializer(sp).data)
 
     # ---------- Favoris (films) ----------
     @action(detail=False, methods=["get"])
     def favoris(self, request):
-        sp = get_object_or_404(SpectateurProfile, user=request.user)
-        films = sp.favoris_films.all().order_by("-id")
-        return Response(FilmDetailSerializer(films, many=True).data)
+        """
+            GET /api/spectateurs/favoris/?cursor=&page_size=&expand=auteurs
+            -> films favoris, pagination par clé ; ?stream=true : liste complète, envoyée en flux,
+            au format de la fiche film (auteurs inclus) comme l'ancienne réponse non paginée
+        """
+        sp = self.get_spectateur()
+        context = self.get_serializer_context()
+        if request.query_params.get("stream", "").lower() in TRUE_VALUES:
+            films = self.optimize_queryset(sp.favoris_films.all(), FilmDetailSerializer)
+            return streaming_json_response(films.order_by("-id"), FilmDetailSerializer, context=context)
+        films = self.optimize_queryset(sp.favoris_films.all(), FilmListSerializer)
+        page = self.paginate_queryset(films)
+        return self.get_paginated_response(FilmListSerializer(page, many=True, context=context).data)
 
     @favoris.mapping.post
     def favoris_add(self, request):
-        sp = get_object_or_404(SpectateurProfile, user=request.user)
+        sp = self.get_spectateur()
         payload = FavoriFilmAddSerializer(data=request.data)
-        print(payload)
         payload.is_valid(raise_exception=True)
-        print(payload.validated_data["film_id"])
         film = get_object_or_404(Film, pk=payload.validated_data["film_id"])
         sp.favoris_films.add(film)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=["delete"], url_path=r"favoris/(?P<film_id>\d+)")
     def favoris_remove(self, request, film_id=None):
-        sp = get_object_or_404(SpectateurProfile, user=request.user)
+        sp = self.get_spectateur()
         film = get_object_or_404(Film, pk=film_id)
         sp.favoris_films.remove(film)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=["post"], url_path="favoris/bulk")
+    def favoris_bulk(self, request):
+        """
+            POST /api/spectateurs/favoris/bulk/ {"ajouter": [film_id, ...], "retirer": [film_id, ...]}
+            -> un résultat par film : ajouté / déjà présent / retiré / absent / introuvable
+        """
+        sp = self.get_spectateur()
+        payload = FavorisBulkSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        ajouter, retirer = payload.validated_data["ajouter"], payload.validated_data["retirer"]
+
+        Through = SpectateurProfile.favoris_films.through
+        ids = set(ajouter) | set(retirer)
+        existants = set(Film.objects.filter(pk__in=ids).values_list("id", flat=True))
+        favoris = set(Through.objects.filter(spectateurprofile=sp, film_id__in=ids).values_list("film_id", flat=True))
+
+        resultats, a_ajouter, a_retirer = [], [], []
+        for film_id in ajouter:
+            if film_id not in existants:
+                statut = "introuvable"
+            elif film_id in favoris:
+                statut = "déjà présent"
+            else:
+                statut = "ajouté"
+                favoris.add(film_id)
+                a_ajouter.append(film_id)
+            resultats.append({"film_id": film_id, "statut": statut})
+        for film_id in retirer:
+            if film_id not in existants:
+                statut = "introuvable"
+            elif film_id not in favoris:
+                statut = "absent"
+            else:
+                statut = "retiré"
+                favoris.discard(film_id)
+                a_retirer.append(film_id)
+            resultats.append({"film_id": film_id, "statut": statut})
+
+        with transaction.atomic():
+            Through.objects.bulk_create([Through(spectateurprofile=sp, film_id=f) for f in a_ajouter],
+                                        ignore_conflicts=True)
+            if a_retirer:
+                Through.objects.filter(spectateurprofile=sp, film_id__in=a_retirer).delete()
+        return Response({"resultats": resultats})
+
     # ---------- Notations ----------
     @action(detail=False, methods=["post"], url_path="notations/film")
     def noter_film(self, request):
-        sp = get_object_or_404(SpectateurProfile, user=request.user)
+        sp = self.get_spectateur()
         data = request.data.copy()
         data["spectateur"] = sp.id
         ser = RateFilmSerializer(data=data,context={'request': request})
@@ -155,7 +286,7 @@ class SpectateurViewSet(ModelViewSet):
 
     @action(detail=False, methods=["post"], url_path="notations/auteur")
     def noter_auteur(self, request):
-        sp = get_object_or_404(SpectateurProfile, user=request.user)
+        sp = self.get_spectateur()
         data = request.data.copy()
         data["spectateur"] = sp.id
         ser = NotationAuteurSerializer(data=data,context={'request': request})
@@ -164,6 +295,69 @@ class SpectateurViewSet(ModelViewSet):
         return Response(ser.data, status=status.HTTP_201_CREATED)
 
 
+    @action(detail=False, methods=["post"], url_path="notations/film/bulk")
+    def noter_films(self, request):
+        """
+            POST /api/spectateurs/notations/film/bulk/ [{film, note, commentaire?}, ...]
+        """
+        return self._noter_bulk(request, Film, NotationFilm, "film", NotationFilmBulkItemSerializer,
+                                "Vous avez déjà noté ce film.")
+
+    @action(detail=False, methods=["post"], url_path="notations/auteur/bulk")
+    def noter_auteurs(self, request):
+        """
+            POST /api/spectateurs/notations/auteur/bulk/ [{auteur, note, commentaire?}, ...]
+        """
+        return self._noter_bulk(request, AuteurProfile, NotationAuteur, "auteur", NotationAuteurBulkItemSerializer,
+                                "Vous avez déjà noté cette auteur.")
+
+    def _noter_bulk(self, request, model, notation_model, field, item_serializer, deja_note):
+        """
+            Valide toutes les notations en 2 requêtes (cibles existantes, notes existantes),
+            puis les écrit en un bulk_create et une mise à jour groupée des agrégats.
+            Un résultat par élément, dans l'ordre de la requête.
+        """
+        sp = self.get_spectateur()
+        if not isinstance(request.data, list):
+            raise ValidationError("Une liste de notations est attendue.")
+        if len(request.data) > MAX_BULK:
+            raise ValidationError(f"{MAX_BULK} notations au maximum par requête.")
+
+        items = []
+        for data in request.data:
+            item = item_serializer(data=data)
+            items.append((True, item.validated_data) if item.is_valid() else (False, item.errors))
+        ids = {item[field] for valid, item in items if valid}
+        existants = set(model.objects.filter(pk__in=ids).values_list("id", flat=True))
+        deja = set(notation_model.objects.filter(spectateur=sp, **{f"{field}__in": ids})
+                   .values_list(field, flat=True))
+
+        resultats, notations = [], []
+        for index, (valid, item) in enumerate(items):
+            if not valid:
+                resultats.append({"index": index, "statut": "erreur", "erreurs": item})
+            elif item[field] not in existants:
+                resultats.append({"index": index, field: item[field], "statut": "erreur",
+                                  "erreurs": {field: ["Objet introuvable."]}})
+            elif item[field] in deja:
+                resultats.append({"index": index, field: item[field], "statut": "erreur",
+                                  "erreurs": {"non_field_errors": [deja_note]}})
+            else:
+                deja.add(item[field])
+                notations.append(notation_model(spectateur=sp, note=item["note"],
+                                                commentaire=item.get("commentaire"),
+                                                **{f"{field}_id": item[field]}))
+                resultats.append({"index": index, field: item[field], "statut": "créé"})
+
+        try:
+            with transaction.atomic():
+                notation_model.objects.bulk_create(notations)
+                add_notes(model, [(getattr(n, f"{field}_id"), n.note) for n in notations])
+        except IntegrityError:
+            raise ValidationError("Notations modifiées simultanément, veuillez réessayer.")
+        return Response({"resultats": resultats})
+
+
 class SpectateurSignupViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     """
         POST /api/auth/signup/  -> crée un utilisateur 'spectateur' + SpectateurProfile
@@ -171,3 +365,41 @@ class SpectateurSignupViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     permission_classes = [AllowAny]
     serializer_class = SpectateurSignupSerializer
     queryset = []
+
+
+@require_GET
+def autocomplete(request):
+    """
+        GET /api/autocomplete/?q=les mis&limit=10&type=films|auteurs
+        -> {"films": [{id, titre, annee}], "auteurs": [{id, nom}]} (index en mémoire, sans requête SQL)
+    """
+    query = request.GET.get("q", "")
+    try:
+        limit = int(request.GET.get("limit", autocomplete_index.DEFAULT_LIMIT))
+    except ValueError:
+        limit = autocomplete_index.DEFAULT_LIMIT
+    types = [t for t in request.GET.getlist("type") if t in autocomplete_index.SOURCES] or autocomplete_index.SOURCES
+    return JsonResponse(autocomplete_index.autocomplete(query, limit, types))
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+@content_negotiation_class(IgnoreAcceptNegotiation)
+def export_table(request, table, extension):
+    """
+        GET /export/<table>.<ndjson|csv|parquet>?since=<ISO 8601>
+        -> table complète (ou modifiée depuis ``since``), envoyée en flux
+        tables : films, auteurs, film_auteurs, notations_films, notations_auteurs
+    """
+    if table not in TABLES or extension not in FORMATS:
+        raise NotFound("Export inconnu.")
+    if extension == "parquet" and pyarrow is None:
+        raise ValidationError("L'export Parquet nécessite pyarrow.")
+    since = request.query_params.get("since")
+    if since:
+        since = parse_since(since)
+        if since is None:
+            raise ValidationError({"since": "Date invalide (ISO 8601 attendu)."})
+    response = StreamingHttpResponse(export(table, extension, since or None), content_type=FORMATS[extension][1])
+    response["Content-Disposition"] = f'attachment; filename="{table}.{extension}"'
+    return response